@@ -7,98 +7,66 @@ Twitter爬虫 Web 应用
 
 import os
 import json
+import atexit
 import threading
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from twitter_scraper import TwitterScraper
+from driver_pool import DriverPool
+from job_manager import JobManager, QueueFullError
+from job_state import SharedJobState, DEFAULT_JOB_STATE_PATH
+from tweet_store import TweetStore, DEFAULT_STORE_PATH
+from file_index import get_row_index
+from history_index import get_history_index
+from batch_scrape import parse_usernames
+from scrape_metrics import render_prometheus
+from config import get_config, scraper_options, job_concurrency, sse_stream_limit
+from log_config import configure_logging
 import time
 
 app = Flask(__name__)
 CORS(app)
 
-# 全局变量用于追踪爬取状态
-scraping_status = {
-    'is_running': False,
-    'is_paused': False,
-    'is_cancelled': False,
-    'progress': 0,
-    'current_tweets': 0,
-    'target_tweets': 0,
-    'status_message': '',
-    'username': '',
-    'error': None,
-    'output_files': []
-}
-
-def background_scraper(username, max_tweets, headless, save_format):
-    """后台爬取任务"""
-    global scraping_status
-    
-    try:
-        scraping_status['is_running'] = True
-        scraping_status['is_paused'] = False
-        scraping_status['is_cancelled'] = False
-        scraping_status['progress'] = 0
-        scraping_status['current_tweets'] = 0
-        scraping_status['target_tweets'] = max_tweets
-        scraping_status['username'] = username
-        scraping_status['status_message'] = '正在初始化浏览器...'
-        scraping_status['error'] = None
-        scraping_status['output_files'] = []
-        
-        # 自定义进度回调
-        def update_progress(current, total, message):
-            scraping_status['current_tweets'] = current
-            scraping_status['target_tweets'] = total
-            scraping_status['progress'] = int((current / total) * 100) if total > 0 else 0
-            scraping_status['status_message'] = message
-        
-        # 控制检查函数
-        def check_control():
-            """返回 (is_paused, is_cancelled)"""
-            return scraping_status['is_paused'], scraping_status['is_cancelled']
-        
-        # 创建爬虫实例，传入进度回调和控制检查函数
-        scraper = TwitterScraper(headless=headless, progress_callback=update_progress, control_callback=check_control)
-        
-        scraping_status['status_message'] = '正在爬取推文...'
-        
-        # 爬取推文
-        tweets = scraper.scrape_user_tweets(username, max_tweets)
-        
-        # 检查是否被取消
-        if scraping_status['is_cancelled']:
-            scraping_status['error'] = '任务已取消'
-            scraping_status['status_message'] = '任务已取消'
-        elif tweets:
-            scraping_status['status_message'] = '正在保存数据...'
-            scraping_status['current_tweets'] = len(tweets)
-            scraping_status['progress'] = 100
-            
-            # 保存文件
-            output_files = []
-            if save_format in ['json', 'both']:
-                json_file = scraper.save_to_json()
-                output_files.append({'type': 'json', 'path': json_file, 'name': os.path.basename(json_file)})
-            
-            if save_format in ['csv', 'both']:
-                csv_file = scraper.save_to_csv()
-                output_files.append({'type': 'csv', 'path': csv_file, 'name': os.path.basename(csv_file)})
-            
-            scraping_status['output_files'] = output_files
-            scraping_status['status_message'] = f'完成！成功爬取 {len(tweets)} 条推文'
-        else:
-            scraping_status['error'] = '未能爬取到任何推文'
-            scraping_status['status_message'] = '爬取失败'
-        
-        scraper.close()
-        
-    except Exception as e:
-        scraping_status['error'] = str(e)
-        scraping_status['status_message'] = f'错误: {str(e)}'
-    finally:
-        scraping_status['is_running'] = False
+config = get_config()
+configure_logging(config['log_level'], config['log_format'])
+
+# 浏览器驱动池：在任务之间复用已启动的 Chrome
+driver_pool = DriverPool(
+    size=config['driver_pool_size'],
+    idle_timeout=config['driver_idle_timeout'],
+    max_pages=config['driver_max_pages']
+)
+atexit.register(driver_pool.close_all)
+
+# 推文库：所有任务的推文按推文去重写入，历史记录和预览从中查询
+tweet_store = TweetStore(config['tweet_store_path'] or DEFAULT_STORE_PATH) if config['tweet_store'] else None
+
+# 共享任务状态：多个工作进程时，任意进程都能查询和控制其他进程中的任务
+job_state = None
+if config['shared_job_state'] or config['web_workers'] > 1:
+    job_state = SharedJobState(config['job_state_path'] or DEFAULT_JOB_STATE_PATH)
+
+# 任务管理器：每个爬取任务独立的状态和控制，有界并发执行
+job_manager = JobManager(
+    max_workers=job_concurrency(config),
+    max_queued=config['max_queued_jobs'],
+    driver_pool=driver_pool,
+    max_batch_size=config['max_batch_size'],
+    retry_delay=config['job_retry_delay'],
+    scraper_options=scraper_options(config),
+    store=tweet_store,
+    state=job_state,
+    engine=config['scrape_engine']
+)
+if config['scrape_engine'] == 'playwright':
+    # 事件循环线程是守护线程：退出时取消任务（写入已收集的推文和检查点）并关闭浏览器
+    atexit.register(job_manager.shutdown)
+
+# SSE 连接没有新事件时发送心跳注释的间隔（秒），防止代理断开空闲连接
+SSE_KEEPALIVE = 15
+
+# SSE 进度流在任务结束前一直占用一个请求线程（gthread），超过上限的连接返回 503，页面改为轮询 /api/status
+sse_slots = threading.BoundedSemaphore(sse_stream_limit(config))
 
 
 @app.route('/')
@@ -109,85 +77,226 @@ def index():
 
 @app.route('/api/scrape', methods=['POST'])
 def start_scraping():
-    """开始爬取API"""
-    global scraping_status
-    
-    # 检查是否已有任务在运行
-    if scraping_status['is_running']:
-        return jsonify({'error': '已有爬取任务在运行中'}), 400
-    
+    """开始爬取API，返回任务ID"""
     data = request.json
     username = data.get('username', '').strip()
     max_tweets = int(data.get('max_tweets', 50))
     headless = data.get('headless', True)
     save_format = data.get('save_format', 'json')
+    capture_network = bool(data.get('capture_network', False))
+    stream = bool(data.get('stream', config['stream_output']))
+    resume = bool(data.get('resume', False))
+    since_last_run = bool(data.get('since_last_run', False))
     
     if not username:
         return jsonify({'error': '用户名不能为空'}), 400
     
-    # 启动后台线程
-    thread = threading.Thread(
-        target=background_scraper,
-        args=(username, max_tweets, headless, save_format)
-    )
-    thread.daemon = True
-    thread.start()
+    try:
+        job = job_manager.submit(username, max_tweets, headless, save_format, capture_network, stream=stream,
+                                 resume=resume, since_last_run=since_last_run)
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 429
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({'message': '爬取任务已启动', 'username': username})
+    return jsonify({'message': '爬取任务已启动', 'username': username, 'job_id': job.job_id})
+
+
+@app.route('/api/scrape/batch', methods=['POST'])
+def start_batch_scraping():
+    """批量爬取API：usernames 为用户名数组或按行分隔的文本，返回批次ID"""
+    data = request.json
+    usernames = data.get('usernames', [])
+    if isinstance(usernames, str):
+        usernames = usernames.splitlines()
+    usernames = parse_usernames(usernames)
+    max_tweets = int(data.get('max_tweets', 50))
+    headless = data.get('headless', True)
+    save_format = data.get('save_format', 'json')
+    capture_network = bool(data.get('capture_network', False))
+    stream = bool(data.get('stream', config['stream_output']))
+    resume = bool(data.get('resume', False))
+    since_last_run = bool(data.get('since_last_run', False))
+    retries = int(data.get('retries', 1))
+    
+    if not usernames:
+        return jsonify({'error': '用户名列表不能为空'}), 400
+    
+    try:
+        batch = job_manager.submit_batch(usernames, max_tweets, headless, save_format, capture_network, retries,
+                                         stream=stream, resume=resume, since_last_run=since_last_run)
+    except (QueueFullError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'message': '批量爬取任务已启动',
+        'batch_id': batch.batch_id,
+        'total': len(batch.jobs),
+        'job_ids': [job.job_id for job in batch.jobs]
+    })
+
+
+@app.route('/api/batch/<batch_id>', methods=['GET'])
+def get_batch_status(batch_id):
+    """获取批量任务汇总API"""
+    batch = job_manager.get_batch(batch_id)
+    if batch is None:
+        return jsonify({'error': '批次不存在'}), 404
+    return jsonify(batch.summary())
+
+
+@app.route('/api/batch/<batch_id>/cancel', methods=['POST'])
+def cancel_batch(batch_id):
+    """取消批量任务中所有未结束的任务API"""
+    batch = job_manager.get_batch(batch_id)
+    if batch is None:
+        return jsonify({'error': '批次不存在'}), 404
+    job_manager.cancel_batch(batch)
+    return jsonify({'message': '已发送取消信号', 'status': 'cancelling', 'batch_id': batch_id})
+
+
+def find_job(job_id):
+    """按任务ID查找任务，未指定ID时使用最近提交的任务（兼容旧版单任务接口）"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return None, (jsonify({'error': '任务不存在' if job_id else '没有正在运行的任务'}), 404)
+    return job, None
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """获取所有任务状态API"""
+    jobs = [job.snapshot() for job in job_manager.list_jobs()]
+    return jsonify({'jobs': jobs, 'active': job_manager.active_count(), 'max_concurrent': job_manager.max_workers})
 
 
 @app.route('/api/status', methods=['GET'])
-def get_status():
+@app.route('/api/status/<job_id>', methods=['GET'])
+def get_status(job_id=None):
     """获取爬取状态API"""
-    return jsonify(scraping_status)
+    job = job_manager.get(job_id)
+    if job is None:
+        if job_id:
+            return jsonify({'error': '任务不存在'}), 404
+        return jsonify({'is_running': False, 'status_message': '', 'error': None, 'output_files': []})
+    return jsonify(job.snapshot())
+
+
+@app.route('/api/events/<job_id>', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    推送任务进度的 Server-Sent Events 流
+    
+    - status: 状态有变化时推送完整状态（与 /api/status 相同的结构）
+    - tweet: 每条新收集到的推文
+    - end: 任务结束且事件已全部发送，之后服务端关闭连接
+    
+    断线重连时浏览器带上 Last-Event-ID，只补发之后的事件；
+    本进程的进度流已达上限时返回 503，客户端应改为轮询 /api/status
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    if not sse_slots.acquire(blocking=False):
+        return jsonify({'error': '进度流连接数已达上限，请轮询 /api/status'}), 503, {'Retry-After': '5'}
+    last_id = (request.headers.get('Last-Event-ID', type=int)
+               or request.args.get('last_event_id', 0, type=int) or 0)
+    
+    def format_event(event, data, event_id=None):
+        lines = f"id: {event_id}\n" if event_id is not None else ''
+        return f"{lines}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    def generate():
+        nonlocal last_id
+        yield 'retry: 3000\n\n'
+        # 连接时先发送当前状态，之后只推送变化
+        yield format_event('status', job.snapshot())
+        while True:
+            finished = job.done.is_set()
+            events = job.events.since(last_id, timeout=0 if finished else SSE_KEEPALIVE)
+            for event_id, event, data in events:
+                yield format_event(event, data, event_id)
+                last_id = event_id
+            if finished and not events:
+                yield format_event('end', {'job_id': job.job_id, 'state': job.status['state']})
+                return
+            if not events:
+                yield ': keepalive\n\n'
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # 连接关闭时释放（生成器没开始迭代就断开时也会调用）
+    response.call_on_close(sse_slots.release)
+    return response
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus 文本格式的累计计数器：各阶段耗时、推文数、元素扫描、重复推文、任务结果等"""
+    gauges = [(('jobs_active', ()), job_manager.active_count())]
+    gauges += [(('driver_pool', (('stat', key),)), value) for key, value in driver_pool.stats().items()]
+    return Response(render_prometheus(job_manager.metric_values(), gauges),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/pool', methods=['GET'])
+def get_pool_stats():
+    """获取浏览器驱动池统计API（命中、未命中、启动、回收次数等）"""
+    return jsonify(driver_pool.stats())
 
 
 @app.route('/api/pause', methods=['POST'])
-def pause_scraping():
+@app.route('/api/pause/<job_id>', methods=['POST'])
+def pause_scraping(job_id=None):
     """暂停爬取API"""
-    global scraping_status
+    job, error = find_job(job_id)
+    if error:
+        return error
     
-    if not scraping_status['is_running']:
+    if job.is_finished:
         return jsonify({'error': '没有正在运行的任务'}), 400
     
-    if scraping_status['is_paused']:
+    if job.status['is_paused']:
         return jsonify({'error': '任务已经处于暂停状态'}), 400
     
-    scraping_status['is_paused'] = True
-    scraping_status['status_message'] = '已暂停'
+    job_manager.pause(job)
     
-    return jsonify({'message': '已暂停爬取', 'status': 'paused'})
+    return jsonify({'message': '已暂停爬取', 'status': 'paused', 'job_id': job.job_id})
 
 
 @app.route('/api/resume', methods=['POST'])
-def resume_scraping():
+@app.route('/api/resume/<job_id>', methods=['POST'])
+def resume_scraping(job_id=None):
     """恢复爬取API"""
-    global scraping_status
+    job, error = find_job(job_id)
+    if error:
+        return error
     
-    if not scraping_status['is_running']:
+    if job.is_finished:
         return jsonify({'error': '没有正在运行的任务'}), 400
     
-    if not scraping_status['is_paused']:
+    if not job.status['is_paused']:
         return jsonify({'error': '任务未处于暂停状态'}), 400
     
-    scraping_status['is_paused'] = False
-    scraping_status['status_message'] = '继续爬取中...'
+    job_manager.resume(job)
     
-    return jsonify({'message': '已恢复爬取', 'status': 'running'})
+    return jsonify({'message': '已恢复爬取', 'status': 'running', 'job_id': job.job_id})
 
 
 @app.route('/api/cancel', methods=['POST'])
-def cancel_scraping():
+@app.route('/api/cancel/<job_id>', methods=['POST'])
+def cancel_scraping(job_id=None):
     """取消爬取API"""
-    global scraping_status
+    job, error = find_job(job_id)
+    if error:
+        return error
     
-    if not scraping_status['is_running']:
+    if job.is_finished:
         return jsonify({'error': '没有正在运行的任务'}), 400
     
-    scraping_status['is_cancelled'] = True
-    scraping_status['status_message'] = '正在取消任务...'
+    job_manager.cancel(job)
     
-    return jsonify({'message': '已发送取消信号', 'status': 'cancelling'})
+    return jsonify({'message': '已发送取消信号', 'status': 'cancelling', 'job_id': job.job_id})
 
 
 @app.route('/api/download/<filename>')
@@ -204,70 +313,114 @@ def download_file(filename):
 
 @app.route('/api/preview/<filename>')
 def preview_file(filename):
-    """预览JSON/CSV文件API"""
+    """分页预览JSON/JSONL/CSV文件API：?offset=0&limit=10"""
     data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
     filepath = os.path.join(data_dir, filename)
     
+    if not filename.endswith(('.json', '.jsonl', '.csv')):
+        return jsonify({'error': '只支持预览JSON、JSONL和CSV文件'}), 400
     if os.path.exists(filepath):
         try:
-            if filename.endswith('.json'):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # 只返回前10条用于预览
-                    return jsonify({'tweets': data[:10], 'total': len(data), 'format': 'json'})
-            elif filename.endswith('.csv'):
-                import csv
-                tweets = []
-                with open(filepath, 'r', encoding='utf-8-sig') as f:
-                    reader = csv.DictReader(f)
-                    for i, row in enumerate(reader):
-                        if i >= 10:  # 只读取前10条
-                            break
-                        tweets.append(row)
-                
-                # 计算总行数
-                with open(filepath, 'r', encoding='utf-8-sig') as f:
-                    total = sum(1 for line in f) - 1  # 减去表头
-                
-                return jsonify({'tweets': tweets, 'total': total, 'format': 'csv'})
-            else:
-                return jsonify({'error': '只支持预览JSON和CSV文件'}), 400
+            offset = max(0, request.args.get('offset', 0, type=int))
+            limit = min(max(1, request.args.get('limit', 10, type=int)), 500)
+            # 行索引每个文件只建立一次（按 mtime 缓存），之后任意一页都只读取该页的推文
+            index = get_row_index(filepath)
+            return jsonify({
+                'tweets': index.read(offset, limit),
+                'total': index.total,
+                'offset': offset,
+                'limit': limit,
+                'format': index.format
+            })
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     else:
         return jsonify({'error': '文件不存在'}), 404
 
 
+def require_store():
+    """推文库未启用时返回错误响应"""
+    if tweet_store is None:
+        return jsonify({'error': '未启用推文库'}), 404
+    return None
+
+
+def store_filters():
+    """从查询参数中取推文库的过滤条件"""
+    return {
+        'since': request.args.get('since') or None,
+        'until': request.args.get('until') or None,
+        'min_likes': request.args.get('min_likes', type=int)
+    }
+
+
+@app.route('/api/accounts')
+def list_accounts():
+    """推文库中的账号API：推文数、时间范围、最近爬取时间"""
+    error = require_store()
+    if error:
+        return error
+    return jsonify({'accounts': tweet_store.accounts()})
+
+
+@app.route('/api/accounts/<username>/tweets')
+def query_account_tweets(username):
+    """分页查询推文库中某个账号的推文API，格式与文件预览一致"""
+    error = require_store()
+    if error:
+        return error
+    filters = store_filters()
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', 10, type=int)), 500)
+    order = request.args.get('order', 'newest')
+    tweets = tweet_store.query_tweets(username, order=order, limit=limit, offset=offset, **filters)
+    total = tweet_store.count_tweets(username, **filters)
+    return jsonify({'tweets': tweets, 'total': total, 'offset': offset, 'limit': limit, 'format': 'sqlite'})
+
+
+@app.route('/api/accounts/<username>/export')
+def export_account_tweets(username):
+    """按需从推文库导出某个账号的推文为 JSON / CSV 文件API"""
+    error = require_store()
+    if error:
+        return error
+    fmt = request.args.get('format', 'json')
+    if fmt not in ('json', 'csv'):
+        return jsonify({'error': '只支持导出JSON和CSV'}), 400
+    filename = f"{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    mimetype = 'application/json' if fmt == 'json' else 'text/csv'
+    chunks = tweet_store.iter_export(fmt, username=username, **store_filters())
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
 @app.route('/api/history')
 def get_history():
-    """获取历史爬取记录"""
+    """
+    获取历史爬取记录：推文库中的账号和 data 目录中的导出文件
+    
+    导出文件来自历史记录索引，支持 ?offset=0&limit=50&username= 分页和按用户名过滤
+    """
     data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    accounts = tweet_store.accounts() if tweet_store is not None else []
     
     if not os.path.exists(data_dir):
-        return jsonify({'files': []})
+        return jsonify({'files': [], 'total': 0, 'accounts': accounts})
     
-    files = []
-    for filename in os.listdir(data_dir):
-        if filename.endswith(('.json', '.csv')):
-            filepath = os.path.join(data_dir, filename)
-            stat = os.stat(filepath)
-            files.append({
-                'name': filename,
-                'size': stat.st_size,
-                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'type': 'JSON' if filename.endswith('.json') else 'CSV'
-            })
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', 50, type=int)), 500)
+    username = request.args.get('username', '').strip().lstrip('@') or None
     
     # 按修改时间排序（最新的在前）
-    files.sort(key=lambda x: x['modified'], reverse=True)
+    files, total = get_history_index(data_dir).query(username, offset, limit)
     
-    return jsonify({'files': files})
+    return jsonify({'files': files, 'total': total, 'offset': offset, 'limit': limit, 'accounts': accounts})
 
 
 if __name__ == '__main__':
     print("=== Twitter爬虫 Web 应用 ===")
     print("启动服务器...")
-    print("访问地址: http://localhost:8887")
-    print("按 Ctrl+C 停止服务器")
-    app.run(debug=True, host='0.0.0.0', port=8887)
+    print(f"访问地址: http://localhost:{config['web_port']}")
+    print("按 Ctrl+C 停止服务器（生产部署请使用 python3 serve.py）")
+    app.run(debug=config['web_debug'], host=config['web_host'], port=config['web_port'], threaded=True)
 
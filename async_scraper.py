@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步爬取引擎（asyncio + Playwright）
+与 TwitterScraper 相同的 scrape_user_tweets 约定（参数、进度 / 控制 / 推文回调、流式输出、检查点、
+增量爬取），但所有浏览器操作和等待都是协程：一个事件循环驱动多个浏览器上下文，
+等待新内容时不占用线程，单个进程可以同时爬取几十个账号
+
+- BrowserHost：一个 Playwright 实例，每种 (无头模式, 配置档) 启动一个 Chromium，
+  每个爬取任务使用独立的浏览器上下文（Cookie、User-Agent 互相隔离，开销远小于启动浏览器）
+- AsyncTwitterScraper：TwitterScraper 的异步版本，去重、保存、检查点等与浏览器无关的逻辑直接继承
+- EventLoopThread：在后台线程中运行事件循环，供 JobManager 等同步代码提交协程
+
+Playwright 是可选依赖，只有选择 playwright 引擎时才需要：
+    pip install playwright && playwright install chromium
+
+命令行:
+    python3 async_scraper.py elonmusk BillGates --max-tweets 50 --headless
+"""
+
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+import concurrent.futures
+from typing import Dict, List, Optional
+
+try:
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+except ImportError:  # 可选依赖：只有使用 playwright 引擎时才需要
+    async_playwright = None
+    PlaywrightTimeoutError = asyncio.TimeoutError
+
+from fake_useragent import UserAgent
+
+from twitter_scraper import (TwitterScraper, MAX_SCROLL_ATTEMPTS, BATCH_EXTRACT_SCRIPT, TWEET_COUNT_SCRIPT,
+                             PAGE_STATE_SCRIPT, WAIT_FOR_CHANGE_SCRIPT, SCROLL_TO_LAST_TWEET_SCRIPT)
+from timeline_capture import NetworkCapture, TIMELINE_URL_PATTERN
+from timeline_html import TIMELINE_SNAPSHOT_SCRIPT
+from browser_profile import (HIDE_WEBDRIVER_SCRIPT, RESOURCE_USAGE_SCRIPT, window_size, launch_arguments,
+                             cdp_setup_commands, merge_performance_metrics)
+from tweet_record import Tweet
+from scrape_metrics import ScrapeMetrics
+from log_config import configure_logging
+
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('selenium', 'playwright')
+
+TWEET_SELECTOR = '[data-testid="tweet"]'
+
+
+def page_function(script: str, is_async: bool = False) -> str:
+    """
+    把 Selenium execute_script / execute_async_script 的脚本体包装为 page.evaluate 的函数，
+    两种引擎共用同一份页面脚本；参数以列表传入（arguments[i]），异步脚本的回调由 Promise 提供
+    """
+    if is_async:
+        return "(args) => new Promise(done => (function() {\n%s\n}).apply(null, args.concat([done])))" % script
+    return "(args) => (function() {\n%s\n}).apply(null, args)" % script
+
+
+BATCH_EXTRACT_FUNCTION = page_function(BATCH_EXTRACT_SCRIPT)
+TWEET_COUNT_FUNCTION = page_function(TWEET_COUNT_SCRIPT)
+PAGE_STATE_FUNCTION = page_function(PAGE_STATE_SCRIPT)
+SCROLL_TO_LAST_TWEET_FUNCTION = page_function(SCROLL_TO_LAST_TWEET_SCRIPT)
+SCROLL_TO_BOTTOM_FUNCTION = page_function("window.scrollTo(0, document.body.scrollHeight);")
+SCROLL_BACK_FUNCTION = page_function("window.scrollBy(0, -300);")
+TIMELINE_SNAPSHOT_FUNCTION = page_function(TIMELINE_SNAPSHOT_SCRIPT)
+RESOURCE_USAGE_FUNCTION = page_function(RESOURCE_USAGE_SCRIPT)
+WAIT_FOR_CHANGE_FUNCTION = page_function(WAIT_FOR_CHANGE_SCRIPT, is_async=True)
+
+
+def require_playwright():
+    """没有安装 Playwright 时给出安装提示"""
+    if async_playwright is None:
+        raise RuntimeError("playwright 引擎需要安装 Playwright: pip install playwright && playwright install chromium")
+
+
+class PageResponseCapture(NetworkCapture):
+    """
+    网络捕获的异步版本：监听页面的 response 事件，时间线响应的 JSON 在事件回调中读取，
+    poll() 返回上次之后收到的响应（接口与 NetworkCapture 相同，不需要性能日志）
+    """
+
+    def __init__(self, record_dir: Optional[str] = None):
+        super().__init__(record_dir)
+        self._payloads = []
+
+    def attach(self, page):
+        page.on('response', self._on_response)
+
+    async def _on_response(self, response):
+        if not TIMELINE_URL_PATTERN.search(response.url):
+            return
+        try:
+            payload = await response.json()
+        except Exception as e:
+            logger.debug("读取时间线响应失败: %s", e)
+            return
+        self._payloads.append(payload)
+        self.responses_captured += 1
+        self._record(payload)
+
+    def poll(self, driver=None) -> List[Dict]:
+        payloads, self._payloads = self._payloads, []
+        return payloads
+
+
+class BrowserHost:
+    """
+    一个事件循环共享的 Playwright 浏览器
+
+    每种 (无头模式, 配置档) 只启动一个 Chromium，按需启动，断开后重新启动；
+    open_page() 为每个爬取任务创建独立的浏览器上下文和页面，任务结束时关闭上下文即可
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._browsers = {}
+        self._lock = None
+        self._user_agents = None
+        self.contexts_opened = 0
+
+    async def _browser(self, headless: bool, profile: str):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._playwright is None:
+                require_playwright()
+                self._playwright = await async_playwright().start()
+                self._user_agents = UserAgent()
+            key = (headless, profile)
+            browser = self._browsers.get(key)
+            if browser is None or not browser.is_connected():
+                logger.info("正在启动 Chromium（%s，%s 配置档）...", '无头' if headless else '有界面', profile)
+                browser = await self._playwright.chromium.launch(
+                    headless=headless, args=launch_arguments(profile),
+                    ignore_default_args=['--enable-automation'])
+                self._browsers[key] = browser
+            return browser
+
+    async def open_page(self, headless: bool, profile: str) -> tuple:
+        """
+        创建一个浏览器上下文和页面
+
+        Returns:
+            (上下文, 页面, 页面的 CDP 会话)
+        """
+        browser = await self._browser(headless, profile)
+        width, height = window_size(profile)
+        context = await browser.new_context(user_agent=self._user_agents.random,
+                                            viewport={'width': width, 'height': height})
+        try:
+            await context.add_init_script(HIDE_WEBDRIVER_SCRIPT)
+            page = await context.new_page()
+            cdp = await context.new_cdp_session(page)
+            for method, params in cdp_setup_commands(profile):
+                await cdp.send(method, params)
+        except Exception:
+            await context.close()
+            raise
+        self.contexts_opened += 1
+        return context, page, cdp
+
+    async def close(self):
+        """关闭所有浏览器和 Playwright"""
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug("关闭浏览器失败: %s", e)
+        self._browsers = {}
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+class AsyncTwitterScraper(TwitterScraper):
+    """
+    异步爬虫：scrape_user_tweets、close 等与浏览器通信的方法为协程，其余与 TwitterScraper 相同
+
+    driver 为 Playwright 页面；提取顺序为 网络捕获 → HTML 快照（在线程池中解析，不阻塞事件循环）
+    → 页面内批量提取脚本。逐元素提取依赖 Selenium WebElement，异步引擎没有这一回退路径；
+    driver_pool 和 chromedriver_path 不适用（浏览器由 BrowserHost 共享）
+    """
+
+    def __init__(self, browser_host: Optional[BrowserHost] = None, **kwargs):
+        """
+        Args:
+            browser_host: 共享的 BrowserHost；不指定时本爬虫自己启动一个，close() 时关闭
+            **kwargs: 与 TwitterScraper 相同
+        """
+        super().__init__(**kwargs)
+        if self.network_capture:
+            self.network_capture = PageResponseCapture(self.network_capture.record_dir)
+        self.browser_host = browser_host
+        self._owns_host = browser_host is None
+        self.context = None
+        self.cdp = None
+        self._parse_seconds = 0.0
+
+    async def setup_driver(self):
+        """创建本任务的浏览器上下文和页面"""
+        if self.browser_host is None:
+            self.browser_host = BrowserHost()
+        self.log.info("正在创建浏览器上下文...")
+        self.context, self.driver, self.cdp = await self.browser_host.open_page(self.headless, self.driver_profile)
+        if self.network_capture:
+            self.network_capture.attach(self.driver)
+        return self.driver
+
+    async def _evaluate(self, function: str, *args):
+        return await self.driver.evaluate(function, list(args))
+
+    async def random_delay(self, min_delay: Optional[float] = None, max_delay: Optional[float] = None):
+        """随机延迟"""
+        await asyncio.sleep(self._delay_seconds(min_delay, max_delay))
+
+    async def wait(self, phase: str, min_delay: float, max_delay: float, baseline: Optional[tuple] = None) -> Optional[bool]:
+        """统一的等待入口（见 TwitterScraper.wait），等待期间事件循环运行其他任务"""
+        start = time.monotonic()
+        changed = None
+        with self.metrics.timer('wait'):
+            if self.wait_mode == 'adaptive':
+                if baseline is not None:
+                    changed = await self.wait_for_page_change(baseline, self.wait_timeout)
+                remaining = random.uniform(*self.jitter_floor) - (time.monotonic() - start)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+            else:
+                await self.random_delay(min_delay, max_delay)
+
+        self._record_wait(phase, start, changed)
+        return changed
+
+    async def wait_for_page_change(self, baseline: tuple, timeout: float) -> bool:
+        """等待推文节点数或页面高度相对 baseline 发生变化，超时返回 False"""
+        base_count, base_height = baseline
+        if self._async_wait_supported:
+            try:
+                return bool(await self._evaluate(WAIT_FOR_CHANGE_FUNCTION, base_count, base_height,
+                                                 int(timeout * 1000)))
+            except Exception as e:
+                self.log.warning("MutationObserver 等待不可用，改为轮询: %s", e)
+                self._async_wait_supported = False
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if tuple(await self._evaluate(PAGE_STATE_FUNCTION)) != (base_count, base_height):
+                return True
+            await asyncio.sleep(0.2)
+        return False
+
+    async def scroll_page(self, scrolls: int = 3):
+        """模拟滚动页面加载更多内容"""
+        for i in range(scrolls):
+            self.metrics.count('scrolls')
+            last_count, last_height = await self._evaluate(PAGE_STATE_FUNCTION)
+            if not await self._evaluate(SCROLL_TO_LAST_TWEET_FUNCTION):
+                await self._evaluate(SCROLL_TO_BOTTOM_FUNCTION)
+            changed = await self.wait('scroll', 2, 4, baseline=(last_count, last_height))
+            if changed is False:
+                break
+            if i < scrolls - 1:
+                await self._evaluate(SCROLL_BACK_FUNCTION)
+                await self.wait('scroll_back', 0.5, 1)
+
+    async def _scroll_for_more(self, settle: bool) -> int:
+        """滚动加载更多推文，返回滚动后页面上的推文元素数"""
+        with self.metrics.timer('scroll'):
+            await self.scroll_page(3)
+            if settle:
+                await self.wait('settle', 3, 5)
+            return await self._evaluate(TWEET_COUNT_FUNCTION)
+
+    async def extract_tweets_batch(self, only_new: bool = False) -> Optional[List[Tweet]]:
+        """批量提取当前页面上的推文（单次 evaluate），失败时返回 None"""
+        try:
+            result = await self._evaluate(BATCH_EXTRACT_FUNCTION, only_new)
+        except Exception as e:
+            self.log.warning("批量提取推文失败: %s", e)
+            return None
+        return self._tweets_from_batch(result)
+
+    async def _capture_html(self) -> Optional[tuple]:
+        try:
+            return 'html', await self._evaluate(TIMELINE_SNAPSHOT_FUNCTION, True), None
+        except Exception as e:
+            self.log.warning("取回 HTML 快照失败，将回退到脚本提取: %s", e)
+            return None
+
+    async def _capture_snapshot(self, use_network: bool) -> tuple:
+        """取回本轮的原始数据（见 TwitterScraper._capture_snapshot）"""
+        if use_network:
+            payloads = self.network_capture.poll()
+            if self.network_capture.responses_captured:
+                return ('network', payloads, await self._evaluate(TWEET_COUNT_FUNCTION)), True
+            self.log.warning("⚠️  未捕获到时间线响应，本次回退到 DOM 提取")
+        if self.html_parser:
+            return await self._capture_html(), False
+        return None, False
+
+    @staticmethod
+    def _in_executor(function, *args):
+        """
+        在线程池中执行同步调用：写输出文件和 fsync、推文库、检查点、控制标志和进度回调
+        （有共享状态时读写 SQLite）都会阻塞，放在事件循环中会让同一循环上的其他任务停顿
+        """
+        return asyncio.get_event_loop().run_in_executor(None, function, *args)
+
+    def _parse_in_executor(self, snapshot: tuple):
+        """在线程池中解析快照（lxml 解析是 CPU 密集的，放在事件循环中会拖慢其他任务）"""
+        return self._in_executor(self._timed_parse, snapshot)
+
+    def _timed_parse(self, snapshot: tuple) -> Optional[tuple]:
+        start = time.perf_counter()
+        try:
+            return self._parse_snapshot(snapshot)
+        finally:
+            self._parse_seconds += time.perf_counter() - start
+
+    async def _extract_dom_tweets(self, processed_keys: set) -> tuple:
+        """从 DOM 提取新增推文：配置了 HTML 解析器时优先解析页面快照，其次批量提取"""
+        scanned_before = self.scan_stats['elements_scanned']
+        if self.html_parser:
+            snapshot = await self._capture_html()
+            parsed = await self._parse_in_executor(snapshot) if snapshot is not None else None
+            if parsed is not None:
+                return self._take_new(parsed[0], processed_keys, parsed[2]), parsed[1]
+        page_tweets = await self.extract_tweets_batch(only_new=True)
+        if page_tweets is None:
+            return [], 0
+        return page_tweets, self.scan_stats['elements_scanned'] - scanned_before
+
+    async def _wait_if_paused(self) -> bool:
+        """检查控制标志，暂停时等待恢复；返回是否已取消"""
+        if not self.control_callback:
+            return False
+        is_paused, is_cancelled = await self._in_executor(self.control_callback)
+        with self.metrics.timer('paused'):
+            while is_paused and not is_cancelled:
+                self.log.info("⏸️  任务已暂停，等待恢复...")
+                await asyncio.sleep(1)
+                is_paused, is_cancelled = await self._in_executor(self.control_callback)
+        if is_cancelled:
+            self.log.warning("❌ 爬取任务已被取消")
+        return is_cancelled
+
+    async def scrape_user_tweets(self, username: str, max_tweets: int = 50, resume: bool = False,
+                                 since_last_run: bool = False) -> List[Tweet]:
+        """爬取指定用户的推文（协程，参数和返回值与 TwitterScraper.scrape_user_tweets 相同）"""
+        self.metrics = ScrapeMetrics()
+        self.metrics.start()
+        self._parse_seconds = 0.0
+        if not self.driver:
+            with self.metrics.timer('driver_setup'):
+                await self.setup_driver()
+
+        # 准备、每轮保存和收尾都有文件和数据库读写，在线程池中执行
+        await self._in_executor(self._begin_run, username, resume, since_last_run)
+
+        url = f"{self.base_url}/{username}"
+        self.log.info("正在访问: %s", url)
+
+        try:
+            with self.metrics.timer('page_load'):
+                await self.driver.goto(url, wait_until='domcontentloaded')
+                await self.wait('page_load', 3, 6)
+                await self.driver.wait_for_selector(TWEET_SELECTOR, timeout=20000)
+
+            if self.progress_callback:
+                await self._in_executor(self.progress_callback, 0, max_tweets, "页面加载完成，开始爬取推文...")
+
+            rounds = 0
+            scroll_attempts = 0
+            processed_keys = set()
+            use_network = self.network_capture is not None
+            cancelled = False
+            fast_forward = False
+
+            while self.tweets_collected < max_tweets and scroll_attempts < MAX_SCROLL_ATTEMPTS:
+                if await self._wait_if_paused():
+                    cancelled = True
+                    break
+
+                rounds += 1
+                self.current_round = rounds
+                self.metrics.count('rounds')
+                self.log.debug("=== 第 %d 轮爬取 === 已收集 %d/%d 条推文", rounds, self.tweets_collected, max_tweets)
+
+                # 流水线模式：快照在线程池中解析的同时滚动和等待；否则先提取再滚动
+                scrolled = False
+                with self.metrics.timer('extract'):
+                    snapshot, use_network = await self._capture_snapshot(use_network)
+                    pending = self._parse_in_executor(snapshot) if snapshot is not None else None
+                if pending is not None and self.pipeline:
+                    await self._in_executor(self._log_scroll_start, max_tweets)
+                    new_elements_count = await self._scroll_for_more(settle=not fast_forward)
+                    scrolled = True
+                with self.metrics.timer('extract'):
+                    result = await pending if pending is not None else None
+                    if result is None:
+                        page_tweets, elements_count = await self._extract_dom_tweets(processed_keys)
+                    else:
+                        page_tweets, elements_count = self._take_new(result[0], processed_keys, result[2]), result[1]
+
+                new_tweets, known_tweets = await self._in_executor(self._process_page_tweets, page_tweets, max_tweets)
+                await self._in_executor(self._end_round, rounds, new_tweets, max_tweets)
+                fast_forward = self._next_round_mode(new_tweets, known_tweets, max_tweets)
+                if fast_forward is None:
+                    break
+
+                prev_elements_count = elements_count
+                if not scrolled:
+                    await self._in_executor(self._log_scroll_start, max_tweets)
+                    new_elements_count = await self._scroll_for_more(settle=not fast_forward)
+                if not (fast_forward and new_elements_count > prev_elements_count):
+                    scroll_attempts += 1
+
+            return await self._in_executor(self._complete_run, cancelled, max_tweets)
+
+        except PlaywrightTimeoutError as e:
+            self.error = e
+            self.log.error("页面加载超时，可能用户不存在或网络问题")
+            return []
+        except Exception as e:
+            self.error = e
+            self.log.exception("爬取过程中出现错误: %s", e)
+            return []
+        finally:
+            await self._in_executor(self._close_run)
+            await self._record_browser_usage()
+            self.metrics.count('parse_ms', int(self._parse_seconds * 1000))
+
+    async def _record_browser_usage(self):
+        """记录本次爬取页面的资源用量"""
+        usage = {}
+        if self.driver is not None:
+            try:
+                usage = await self._evaluate(RESOURCE_USAGE_FUNCTION) or {}
+                if self.cdp is not None:
+                    merge_performance_metrics(usage, await self.cdp.send('Performance.getMetrics'))
+            except Exception as e:
+                self.log.debug("读取资源用量失败: %s", e)
+        self._set_browser_usage(usage)
+
+    async def close(self):
+        """关闭本任务的浏览器上下文（自己启动的 BrowserHost 一并关闭）"""
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception as e:
+                self.log.debug("关闭浏览器上下文失败: %s", e)
+            self.context = None
+            self.cdp = None
+            self.log.debug("浏览器上下文已关闭")
+        self.driver = None
+        if self._owns_host and self.browser_host is not None:
+            await self.browser_host.close()
+            self.browser_host = None
+
+
+class EventLoopThread:
+    """
+    在后台线程中运行的事件循环
+
+    同步代码（JobManager、命令行）用 submit() 提交协程函数，最多 max_concurrent 个同时运行，
+    其余在信号量上排队（排队不占用线程）；返回 concurrent.futures.Future
+    """
+
+    def __init__(self, max_concurrent: int, name: str = 'scrape-loop'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.start()
+        self._slots = self.call(self._create_slots(max_concurrent))
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @staticmethod
+    async def _create_slots(max_concurrent: int):
+        return asyncio.Semaphore(max_concurrent)
+
+    async def _limited(self, coroutine_function, args):
+        async with self._slots:
+            return await coroutine_function(*args)
+
+    def submit(self, coroutine_function, *args) -> concurrent.futures.Future:
+        """提交 coroutine_function(*args)，取得运行名额后开始执行"""
+        future = asyncio.run_coroutine_threadsafe(self._limited(coroutine_function, args), self.loop)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def call(self, coroutine, timeout: Optional[float] = None):
+        """在事件循环中运行协程并等待结果（不受并发名额限制）"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def close(self, wait: bool = True, before_stop=None):
+        """
+        等待已提交的协程结束（wait=True），然后停止事件循环
+
+        Args:
+            before_stop: 停止前在事件循环中运行的协程（如关闭 BrowserHost）
+        """
+        if wait:
+            with self._lock:
+                pending = list(self._futures)
+            concurrent.futures.wait(pending)
+        if before_stop is not None:
+            self.call(before_stop)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+async def scrape_accounts(usernames: List[str], max_tweets: int, headless: bool = True,
+                          max_concurrent: int = 10, **options) -> Dict[str, List[Tweet]]:
+    """在一个事件循环中并发爬取多个账号（共享一个浏览器，每个账号一个上下文）"""
+    host = BrowserHost()
+    slots = asyncio.Semaphore(max_concurrent)
+
+    async def scrape(username):
+        async with slots:
+            scraper = AsyncTwitterScraper(browser_host=host, headless=headless, **options)
+            try:
+                return await scraper.scrape_user_tweets(username, max_tweets)
+            finally:
+                await scraper.close()
+
+    try:
+        results = await asyncio.gather(*(scrape(username) for username in usernames))
+    finally:
+        await host.close()
+    return dict(zip(usernames, results))
+
+
+def main():
+    """命令行：在一个事件循环中并发爬取多个账号，打印每个账号的推文数"""
+    parser = argparse.ArgumentParser(description='X（推特）异步推文爬虫（Playwright）')
+    parser.add_argument('usernames', nargs='+', help='用户名（不包含@符号）')
+    parser.add_argument('--max-tweets', type=int, default=50, help='每个账号爬取的推文数量')
+    parser.add_argument('--concurrency', type=int, default=10, help='同时爬取的账号数（浏览器上下文数）')
+    parser.add_argument('--headless', action='store_true', help='使用无头模式')
+    parser.add_argument('--log-level', default='INFO', help='日志级别')
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+    require_playwright()
+
+    start = time.monotonic()
+    results = asyncio.run(
+        scrape_accounts(args.usernames, args.max_tweets, args.headless, args.concurrency,
+                        wait_mode='adaptive', checkpoint_interval=0))
+    for username, tweets in results.items():
+        print(f"@{username}: {len(tweets)} 条推文")
+    print(f"共 {sum(len(t) for t in results.values())} 条推文，耗时 {time.monotonic() - start:.1f} 秒")
+
+
+if __name__ == '__main__':
+    main()
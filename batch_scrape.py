@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量爬取命令行工具
+从文件或命令行读取用户名列表，按配置的并发数分配到多个浏览器并行爬取
+（--engine playwright 时在一个事件循环中并发爬取，每个账号一个浏览器上下文），
+失败的账号自动重试，结束后输出汇总
+
+用法:
+    python3 batch_scrape.py usernames.txt --max-tweets 50 --workers 4 --retries 2 --format csv
+    python3 batch_scrape.py -u elonmusk -u BillGates --headless
+    python3 batch_scrape.py usernames.txt --engine playwright --workers 30 --headless
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from typing import Iterable, List
+
+from config import get_config, scraper_options, job_concurrency
+from log_config import LOG_FORMATS, configure_logging
+from timeline_html import HTML_PARSERS
+from browser_profile import DRIVER_PROFILES
+from driver_pool import DriverPool
+from async_scraper import ENGINES
+from job_manager import JobManager, STATE_COMPLETED
+from tweet_store import TweetStore, DEFAULT_STORE_PATH
+
+
+def parse_usernames(lines: Iterable[str]) -> List[str]:
+    """解析用户名列表：去掉 @ 前缀、空行和 # 注释，按出现顺序去重"""
+    usernames = []
+    seen = set()
+    for line in lines:
+        username = line.split('#', 1)[0].strip().lstrip('@')
+        if username and username.lower() not in seen:
+            seen.add(username.lower())
+            usernames.append(username)
+    return usernames
+
+
+def load_usernames(path: str) -> List[str]:
+    """从文件读取用户名列表（每行一个）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_usernames(f)
+
+
+def save_summary(summary: dict, data_dir: str) -> str:
+    """将批次汇总保存到 data/batches 目录（不混入推文导出文件的历史记录）"""
+    batch_dir = os.path.join(data_dir, 'batches')
+    os.makedirs(batch_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = os.path.join(batch_dir, f"batch_{summary['batch_id']}_{timestamp}.json")
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return filepath
+
+
+def main():
+    """主函数"""
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='X（推特）批量推文爬虫')
+    parser.add_argument('file', nargs='?', help='用户名列表文件，每行一个（# 开头为注释）')
+    parser.add_argument('-u', '--username', action='append', default=[], help='用户名，可重复指定')
+    parser.add_argument('--max-tweets', type=int, default=config['max_tweets'], help='每个账号爬取的推文数量')
+    parser.add_argument('--engine', choices=ENGINES, default=config['scrape_engine'],
+                        help='爬取引擎：selenium 每个并行任务一个浏览器，playwright 一个事件循环驱动所有任务')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='并行任务数（默认 selenium 引擎为 MAX_CONCURRENT_JOBS，playwright 引擎为 MAX_CONCURRENT_CONTEXTS）')
+    parser.add_argument('--retries', type=int, default=1, help='每个账号失败后的重试次数')
+    parser.add_argument('--format', choices=['json', 'csv', 'both', 'store'], default=config['save_format'],
+                        help='保存格式（store 只写入推文库）')
+    parser.add_argument('--headless', action='store_true', default=config['headless'], help='使用无头模式')
+    parser.add_argument('--capture-network', action='store_true', help='使用网络捕获模式')
+    parser.add_argument('--stream', action='store_true', default=config['stream_output'],
+                        help='边爬取边写入 JSON Lines / CSV 文件')
+    parser.add_argument('--since-last-run', action='store_true',
+                        help='增量爬取：只收集各账号上次保存的最新推文之后的推文')
+    parser.add_argument('--resume', action='store_true', help='从各账号上次未完成的检查点继续（自动启用流式输出）')
+    parser.add_argument('--wait-mode', choices=['fixed', 'adaptive'], default=config['wait_mode'],
+                        help='等待模式：fixed 固定随机延迟，adaptive 新内容出现即返回')
+    parser.add_argument('--html-parser', choices=HTML_PARSERS, default=config['html_parser'] or None,
+                        help='每轮取回一次页面 HTML 快照，用指定解析器在本地解析推文（默认使用页面内批量提取脚本）')
+    parser.add_argument('--pipeline', action='store_true', default=config['pipeline_extract'],
+                        help='流水线提取：HTML 快照在解析线程中解析，与滚动和等待重叠（默认使用 lxml）')
+    parser.add_argument('--driver-profile', choices=DRIVER_PROFILES, default=config['driver_profile'],
+                        help='浏览器配置档：full 完整浏览器，lean 不下载图片、视频和字体（可同时运行更多浏览器）')
+    parser.add_argument('--log-level', default=config['log_level'],
+                        help='日志级别：DEBUG 输出每条推文和每次滚动，INFO 输出每轮摘要')
+    parser.add_argument('--log-format', choices=LOG_FORMATS, default=config['log_format'],
+                        help='日志格式：text 单行文本，json 每行一个 JSON 对象')
+    parser.add_argument('-q', '--quiet', action='store_true', help='安静模式：只输出警告、错误和汇总结果')
+    args = parser.parse_args()
+    config['wait_mode'] = args.wait_mode
+    config['html_parser'] = args.html_parser
+    config['pipeline_extract'] = args.pipeline
+    config['driver_profile'] = args.driver_profile
+    config['scrape_engine'] = args.engine
+    workers = args.workers or job_concurrency(config)
+    configure_logging('WARNING' if args.quiet else args.log_level, args.log_format)
+
+    usernames = parse_usernames(args.username)
+    if args.file:
+        usernames = parse_usernames(usernames + load_usernames(args.file))
+    if not usernames:
+        parser.error('请提供用户名列表文件或 -u 用户名')
+
+    print("=== X（推特）批量推文爬虫 ===")
+    print(f"账号数: {len(usernames)}，并行任务: {workers}（{args.engine} 引擎），每个账号 {args.max_tweets} 条，"
+          f"失败重试 {args.retries} 次")
+    print()
+
+    store = TweetStore(config['tweet_store_path'] or DEFAULT_STORE_PATH) if config['tweet_store'] else None
+    if args.format == 'store' and store is None:
+        parser.error('未启用推文库（TWEET_STORE=false），不能使用 --format store')
+
+    # selenium 引擎：每个并行任务保留一个热浏览器，账号之间复用；playwright 引擎共享一个浏览器
+    driver_pool = None
+    if args.engine == 'selenium':
+        driver_pool = DriverPool(size=workers, idle_timeout=config['driver_idle_timeout'],
+                                 max_pages=config['driver_max_pages'])
+    try:
+        job_manager = JobManager(max_workers=workers, driver_pool=driver_pool,
+                                 max_batch_size=max(len(usernames), 1), retry_delay=config['job_retry_delay'],
+                                 scraper_options=scraper_options(config),
+                                 store=store, engine=args.engine)
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    batch = job_manager.submit_batch(usernames, args.max_tweets, headless=args.headless,
+                                     save_format=args.format, capture_network=args.capture_network,
+                                     retries=args.retries, stream=args.stream,
+                                     resume=args.resume, since_last_run=args.since_last_run)
+    try:
+        for job in batch.jobs:
+            job.done.wait()
+            status = job.status
+            mark = '✅' if status['state'] == STATE_COMPLETED else '❌'
+            print(f"{mark} @{job.username}: {status['status_message']}（尝试 {status['attempts']} 次）")
+    except KeyboardInterrupt:
+        print("\n用户中断了程序，正在取消剩余任务...")
+        job_manager.cancel_batch(batch)
+        batch.wait()
+    finally:
+        job_manager.shutdown()
+        if driver_pool:
+            driver_pool.close_all()
+
+    summary = batch.summary()
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    summary_path = save_summary(summary, data_dir)
+
+    counts = summary['counts']
+    print()
+    print("=== 批量爬取汇总 ===")
+    print(f"成功: {counts['completed']}，失败: {counts['failed']}，取消: {counts['cancelled']}，"
+          f"共 {summary['total_tweets']} 条推文")
+    failed = [a['username'] for a in summary['accounts'] if a['state'] != STATE_COMPLETED]
+    if failed:
+        print(f"未完成的账号: {', '.join(failed)}")
+    print(f"汇总已保存到: {summary_path}")
+
+    sys.exit(0 if counts['completed'] == summary['total'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+互动数解析基准测试
+对比原来的 extract_number_from_text 和 parse_count / parse_counts 在换算表（tests/test_count_parser.py 的 CASES）
+和快照标签上的正确率与耗时；换算表的正确性由测试检查（python -m pytest tests）
+
+用法:
+    python3 benchmarks/bench_counts.py [--repeat 5] [--tweets 1000]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from count_parser import parse_count, parse_counts
+from timeline_html import parse_timeline_html
+from replay import FIXTURE, load_fixture, synthesize_timeline
+from tests.test_count_parser import CASES
+
+def legacy_extract_number(text):
+    """修改前的 extract_number_from_text（用于对比）"""
+    try:
+        text = text.lower().replace(',', '')
+        if 'k' in text:
+            number = float(text.replace('k', '')) * 1000
+        elif 'm' in text:
+            number = float(text.replace('m', '')) * 1000000
+        else:
+            numbers = re.findall(r'\d+', text)
+            number = int(numbers[0]) if numbers else 0
+        return int(number)
+    except Exception:
+        return 0
+
+
+def time_per_tweet(convert, labels, repeat):
+    """每条推文换算三个互动数的耗时（微秒，取最快一次）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for like, retweet, reply in labels:
+            convert(like, retweet, reply)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6 / len(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='互动数解析基准测试')
+    parser.add_argument('--fixture', default=FIXTURE, help='时间线 HTML 快照路径')
+    parser.add_argument('--tweets', type=int, default=1000, help='合成时间线的推文数')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    correct = sum(parse_count(label) == expected for label, expected in CASES)
+    legacy_correct = sum(legacy_extract_number(label or '') == expected for label, expected in CASES)
+    print(f"换算表 {len(CASES)} 项：parse_count 通过 {correct} 项，"
+          f"原实现通过 {legacy_correct} 项\n")
+
+    raw_tweets = parse_timeline_html(synthesize_timeline(load_fixture(args.fixture), args.tweets))
+    labels = [(raw['like_label'], raw['retweet_label'], raw['reply_label']) for raw in raw_tweets]
+
+    def legacy(like, retweet, reply):
+        return tuple(legacy_extract_number(label) if label is not None else 0 for label in (like, retweet, reply))
+
+    def uncached(like, retweet, reply):
+        return tuple(parse_count.__wrapped__(label) for label in (like, retweet, reply))
+
+    legacy_results = [legacy(*item) for item in labels]
+    results = [parse_counts(*item) for item in labels]
+    mismatched = sum(old != new for old, new in zip(legacy_results, results))
+    print(f"快照标签: {len(labels)} 条推文，原实现与 parse_counts 结果不同的推文 {mismatched} 条")
+
+    print(f"{'方式':<22}{'每条推文 µs':>12}")
+    for name, convert in (('原实现', legacy), ('parse_count（不缓存）', uncached), ('parse_counts', parse_counts)):
+        print(f"{name:<22}{time_per_tweet(convert, labels, args.repeat):>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取引擎基准测试
+离线同时爬取多个账号，对比 Selenium 引擎（每个任务一个线程，等待时线程阻塞）和
+异步引擎（一个事件循环驱动所有页面，等待不占用线程）的总耗时、推文/秒和峰值线程数，
+并检查两种引擎对每个账号收集到的推文一致（不一致时以非零状态退出）
+
+两种引擎都使用假浏览器（FakeDriver / FakePage），用 --latency-ms 模拟每次往返的延迟，
+--wait-ms 模拟每次等待新内容的时长（真实爬取中耗时的大部分）
+
+用法:
+    python3 benchmarks/bench_engines.py [--accounts 30] [--tweets 200] [--latency-ms 5] [--wait-ms 200]
+    python3 benchmarks/bench_engines.py --accounts 50 --extract html_lxml
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from twitter_scraper import TwitterScraper
+from async_scraper import AsyncTwitterScraper
+from log_config import configure_logging
+from fake_driver import FakeDriver
+from fake_page import FakePage
+from replay import FIXTURE, load_fixture, synthesize_timeline
+
+# 提取方式：名称 -> 爬虫参数（两种引擎相同）
+EXTRACTIONS = {
+    'batch': {'batch_extract': True},
+    'html_lxml': {'html_parser': 'lxml'},
+    'pipeline_lxml': {'html_parser': 'lxml', 'pipeline': True},
+}
+
+
+class ThreadSampler:
+    """后台线程定期记录进程的线程数，取峰值"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        # 不计入采样线程本身
+        self.peak -= 1
+
+
+def scraper_kwargs(args, data_dir):
+    wait = args.wait_ms / 1000
+    return dict(headless=True, wait_mode='adaptive', wait_timeout=2, jitter_floor=(wait, wait),
+                checkpoint_interval=0, **EXTRACTIONS[args.extract])
+
+
+def prepare(scraper, data_dir, browser):
+    scraper.data_dir = data_dir
+    scraper.checkpoint_dir = os.path.join(data_dir, 'checkpoints')
+    browser.preload()
+    scraper.driver = browser
+
+
+def run_selenium(html, args, data_dir):
+    """每个账号一个线程（与 JobManager 的线程池相同），返回 {账号: 推文 (timestamp, text) 列表}"""
+
+    def scrape(index):
+        scraper = TwitterScraper(**scraper_kwargs(args, data_dir))
+        prepare(scraper, data_dir, FakeDriver(html, latency=args.latency_ms / 1000, visible=args.per_scroll,
+                                              scroll_batch=args.per_scroll))
+        tweets = scraper.scrape_user_tweets(f'account{index}', args.tweets)
+        return [(t.timestamp, t.text) for t in tweets]
+
+    with ThreadPoolExecutor(max_workers=args.accounts) as executor:
+        return dict(enumerate(executor.map(scrape, range(args.accounts))))
+
+
+def run_async(html, args, data_dir):
+    """所有账号在一个事件循环中并发爬取"""
+
+    async def scrape(index):
+        scraper = AsyncTwitterScraper(**scraper_kwargs(args, data_dir))
+        prepare(scraper, data_dir, FakePage(html, latency=args.latency_ms / 1000, visible=args.per_scroll,
+                                            scroll_batch=args.per_scroll))
+        tweets = await scraper.scrape_user_tweets(f'account{index}', args.tweets)
+        return [(t.timestamp, t.text) for t in tweets]
+
+    async def scrape_all():
+        return await asyncio.gather(*(scrape(index) for index in range(args.accounts)))
+
+    return dict(enumerate(asyncio.run(scrape_all())))
+
+
+def measure(run, html, args, data_dir):
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        results = run(html, args, data_dir)
+        elapsed = time.perf_counter() - start
+    return results, elapsed, sampler.peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬取引擎基准测试（Selenium 线程 / asyncio 事件循环）')
+    parser.add_argument('--fixture', default=FIXTURE, help='时间线 HTML 快照路径')
+    parser.add_argument('--accounts', type=int, default=30, help='同时爬取的账号数')
+    parser.add_argument('--tweets', type=int, default=200, help='每个账号的目标推文数')
+    parser.add_argument('--per-scroll', type=int, default=20, help='每次滚动加载的推文数')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='每次浏览器往返的模拟延迟（毫秒）')
+    parser.add_argument('--wait-ms', type=float, default=200.0, help='每次等待的固定时长（毫秒）')
+    parser.add_argument('--extract', choices=list(EXTRACTIONS), default='batch', help='提取方式')
+    args = parser.parse_args()
+
+    configure_logging('WARNING')
+    html = synthesize_timeline(load_fixture(args.fixture), args.tweets)
+    print(f"{args.accounts} 个账号 × {args.tweets} 条推文，提取方式 {args.extract}，"
+          f"往返延迟 {args.latency_ms} ms，每次等待 {args.wait_ms} ms\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name, run in (('selenium', run_selenium), ('async', run_async)):
+            results[name] = measure(run, html, args, data_dir)
+
+    print(f"{'引擎':<10}{'推文':>8}{'耗时(s)':>10}{'推文/秒':>10}{'峰值线程':>10}")
+    for name, (collected, elapsed, peak) in results.items():
+        total = sum(len(tweets) for tweets in collected.values())
+        print(f"{name:<10}{total:>8}{elapsed:>10.2f}{total / elapsed:>10.1f}{peak:>10}")
+
+    mismatched = [index for index in range(args.accounts)
+                  if results['selenium'][0][index] != results['async'][0][index]]
+    if mismatched:
+        print(f"\n❌ {len(mismatched)} 个账号两种引擎收集到的推文不一致")
+        sys.exit(1)
+    print("\n✓ 两种引擎对每个账号收集到的推文一致")
+
+
+if __name__ == '__main__':
+    main()
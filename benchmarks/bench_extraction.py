@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文提取基准测试
+对比逐元素提取（extract_tweet_data）与批量提取（extract_tweets_batch）
+在保存的时间线 HTML 快照上的单条推文成本，以及页面逐轮增长时
+全量重扫与增量扫描（only_new）每轮提取的元素数量
+
+用法:
+    python3 benchmarks/bench_extraction.py [--latency-ms 2] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+
+from twitter_scraper import TwitterScraper
+from fake_driver import FakeDriver
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'profile_timeline.html')
+
+
+def per_element(scraper):
+    """原有路径：find_elements + 每个元素逐字段查询"""
+    elements = scraper.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')
+    return [scraper.extract_tweet_data(el) for el in elements]
+
+
+def batch(scraper):
+    """批量路径：一次 execute_script"""
+    return scraper.extract_tweets_batch()
+
+
+def html_lxml(scraper):
+    """HTML 快照路径：一次取回时间线 HTML，lxml 解析"""
+    scraper.html_parser = 'lxml'
+    return scraper.extract_tweets_from_html()
+
+
+def html_soup(scraper):
+    """HTML 快照路径：html.parser 解析"""
+    scraper.html_parser = 'html.parser'
+    return scraper.extract_tweets_from_html()
+
+
+def run(name, extract, html, latency, repeat):
+    """运行一种提取方式，返回 (推文列表, 每条推文往返次数, 每条推文耗时毫秒)"""
+    scraper = TwitterScraper(headless=True)
+    best = None
+    tweets = []
+    round_trips = 0
+    for _ in range(repeat):
+        scraper.driver = FakeDriver(html, latency=latency)
+        start = time.perf_counter()
+        tweets = extract(scraper)
+        elapsed = time.perf_counter() - start
+        round_trips = scraper.driver.round_trips
+        best = elapsed if best is None else min(best, elapsed)
+    count = max(len(tweets), 1)
+    per_tweet_rt = round_trips / count
+    per_tweet_ms = best * 1000 / count
+    print(f"{name:<12} 推文 {len(tweets):>4}  往返 {round_trips:>5}  "
+          f"每条往返 {per_tweet_rt:6.2f}  每条耗时 {per_tweet_ms:8.3f} ms")
+    return tweets, per_tweet_rt, per_tweet_ms
+
+
+def run_growing_page(html, per_round=10):
+    """模拟页面逐轮增长：对比每轮全量重扫与增量扫描提取的元素数"""
+    print(f"\n页面每轮增加 {per_round} 条推文：")
+    print(f"{'轮次':<6}{'页面元素':>8}{'全量提取':>10}{'增量提取':>10}{'增量跳过':>10}")
+    full = TwitterScraper(headless=True)
+    incremental = TwitterScraper(headless=True)
+    full.driver = FakeDriver(html, visible=per_round)
+    incremental.driver = FakeDriver(html, visible=per_round)
+    round_no = 1
+    while True:
+        full_count = len(full.extract_tweets_batch())
+        skipped_before = incremental.scan_stats['elements_skipped']
+        new_count = len(incremental.extract_tweets_batch(only_new=True))
+        skipped = incremental.scan_stats['elements_skipped'] - skipped_before
+        print(f"{round_no:<6}{full_count:>8}"
+              f"{full_count:>10}{new_count:>10}{skipped:>10}")
+        if not full.driver.load_more(per_round):
+            break
+        incremental.driver.load_more(per_round)
+        round_no += 1
+    print(f"累计提取：全量 {full.scan_stats['elements_extracted']} 个，"
+          f"增量 {incremental.scan_stats['elements_extracted']} 个")
+
+
+def strip_scraped_at(tweets):
+    return [{k: v for k, v in t.items() if k != 'scraped_at'} for t in tweets]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推文提取基准测试')
+    parser.add_argument('--fixture', default=FIXTURE, help='时间线 HTML 快照路径')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='每次 WebDriver 往返的模拟延迟（毫秒）')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    with open(args.fixture, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    latency = args.latency_ms / 1000
+    print(f"快照: {args.fixture}")
+    print(f"模拟往返延迟: {args.latency_ms} ms\n")
+
+    before, before_rt, before_ms = run('逐元素提取', per_element, html, latency, args.repeat)
+    after, after_rt, after_ms = run('批量提取', batch, html, latency, args.repeat)
+    parsed = [run(name, extract, html, latency, args.repeat)[0]
+              for name, extract in (('HTML/lxml', html_lxml), ('HTML/parser', html_soup))]
+
+    if any(strip_scraped_at(before) != strip_scraped_at(tweets) for tweets in [after] + parsed):
+        print("\n❌ 各方式的提取结果不一致")
+        sys.exit(1)
+
+    print(f"\n✓ 提取结果一致；每条推文往返次数 {before_rt:.2f} -> {after_rt:.2f}，"
+          f"耗时加速 {before_ms / after_ms:.1f}x")
+
+    run_growing_page(html)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件预览基准测试
+生成一个大的 JSON / CSV 导出文件（正文含换行），对比原有预览方式
+（json.load 整个文件；CSV 读两遍并按行数计数）与行索引分页预览的耗时、峰值内存和总数是否正确
+
+用法:
+    python3 benchmarks/bench_preview.py [--rows 200000]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_index import build_row_index, get_row_index
+from tweet_sinks import CSV_FIELDNAMES
+
+
+def make_tweets(rows):
+    for i in range(rows):
+        yield {
+            'text': f'第 {i} 条推文\n第二行 "引号" {{json}} [数组]',
+            'timestamp': f'2025-01-01T00:00:{i % 60:02d}.000Z',
+            'time_display': '1月1日',
+            'likes': i, 'retweets': i // 2, 'replies': i // 3,
+            'scraped_at': '2025-01-01T00:00:00'
+        }
+
+
+def write_files(directory, rows):
+    json_path = os.path.join(directory, 'bench.json')
+    csv_path = os.path.join(directory, 'bench.csv')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(list(make_tweets(rows)), f, ensure_ascii=False, indent=2)
+    with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(make_tweets(rows))
+    return json_path, csv_path
+
+
+def old_preview(path):
+    """原有 /api/preview 的做法"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data[:10], len(data)
+    tweets = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            if i >= 10:
+                break
+            tweets.append(row)
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        total = sum(1 for line in f) - 1
+    return tweets, total
+
+
+def measure(func, *args):
+    """返回 (结果, 耗时毫秒, 峰值内存 MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文件预览基准测试')
+    parser.add_argument('--rows', type=int, default=200000, help='生成的推文数')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench_preview_')
+    try:
+        paths = write_files(directory, args.rows)
+        for path in paths:
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"\n=== {os.path.basename(path)}（{size:.1f} MB，{args.rows} 条推文）===")
+
+            (_, old_total), old_ms, old_peak = measure(old_preview, path)
+            print(f"原有预览:     {old_ms:9.1f} ms  峰值内存 {old_peak:7.1f} MB  总数 {old_total}")
+
+            index, build_ms, build_peak = measure(build_row_index, path)
+            print(f"建立行索引:   {build_ms:9.1f} ms  峰值内存 {build_peak:7.1f} MB  总数 {index.total}")
+
+            get_row_index(path)
+            for offset in (0, args.rows // 2, args.rows - 10):
+                _, page_ms, page_peak = measure(lambda: get_row_index(path).read(offset, 10))
+                print(f"第 {offset:>7} 条起一页: {page_ms:6.2f} ms  峰值内存 {page_peak:7.3f} MB")
+
+            mark = '✓' if index.total == args.rows else '❌'
+            print(f"{mark} 行索引总数{'正确' if index.total == args.rows else '错误'}；"
+                  f"原有预览总数{'正确' if old_total == args.rows else '错误（正文中的换行被当作新行）'}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器配置档基准测试（需要本地 Chrome）
+分别用 full 和 lean 配置档爬取同一个账号，对比每个浏览器的下载量、请求数、JS 堆、DOM 节点数、
+浏览器进程树的常驻内存（仅 Linux，读取 /proc）和推文/秒
+
+默认爬取 x.com 上的账号；--replay 改用本地替身服务器（离线快照不含图片和视频，只能验证流程，
+下载量差异需要在真实页面上测量）
+
+用法:
+    python3 benchmarks/bench_profile.py elonmusk --tweets 100
+    python3 benchmarks/bench_profile.py --replay --tweets 200
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from twitter_scraper import TwitterScraper
+from browser_profile import DRIVER_PROFILES
+from log_config import configure_logging
+from replay import FIXTURE, ReplayServer, load_fixture, synthesize_timeline
+
+
+def process_tree_rss(root_pid):
+    """进程及其所有子进程的常驻内存（字节）；不是 Linux 时返回 None"""
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    rss = {}
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{name}/statm', 'r') as f:
+                rss[int(name)] = int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(name))
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+def run_profile(profile, username, args, data_dir, base_url=None):
+    kwargs = {'headless': True, 'wait_mode': 'adaptive', 'checkpoint_interval': 0, 'driver_profile': profile}
+    if base_url:
+        kwargs['base_url'] = base_url
+    scraper = TwitterScraper(**kwargs)
+    scraper.data_dir = data_dir
+    scraper.checkpoint_dir = os.path.join(data_dir, 'checkpoints')
+    try:
+        scraper.scrape_user_tweets(username, args.tweets)
+        rss = process_tree_rss(scraper.driver.service.process.pid) if scraper.driver else None
+    finally:
+        scraper.close()
+    usage = scraper.browser_usage
+    metrics = scraper.metrics.as_dict()
+    return {
+        'tweets': scraper.tweets_collected,
+        'tweets_per_second': metrics['tweets_per_second'],
+        'transfer_kb': usage.get('transfer_bytes', 0) / 1024,
+        'requests': usage.get('requests', 0),
+        'js_heap_mb': usage.get('js_heap_bytes', 0) / 1048576,
+        'dom_nodes': usage.get('dom_nodes', 0),
+        'rss_mb': rss / 1048576 if rss is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='浏览器配置档基准测试（full / lean）')
+    parser.add_argument('username', nargs='?', default='elonmusk', help='爬取的账号')
+    parser.add_argument('--tweets', type=int, default=100, help='每个配置档爬取的推文数')
+    parser.add_argument('--replay', action='store_true', help='使用本地替身服务器（离线）')
+    args = parser.parse_args()
+
+    configure_logging('WARNING')
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        try:
+            if args.replay:
+                html = synthesize_timeline(load_fixture(FIXTURE), args.tweets)
+                with ReplayServer(html) as server:
+                    for profile in DRIVER_PROFILES:
+                        results[profile] = run_profile(profile, args.username, args, data_dir, server.url)
+            else:
+                for profile in DRIVER_PROFILES:
+                    results[profile] = run_profile(profile, args.username, args, data_dir)
+        except FileNotFoundError as e:
+            sys.exit(f"❌ {e}")
+
+    print(f"{'配置档':<8}{'推文':>6}{'推文/秒':>10}{'下载KB':>10}{'请求数':>8}{'JS堆MB':>9}{'DOM节点':>9}{'RSS MB':>9}")
+    for profile, r in results.items():
+        rss = f"{r['rss_mb']:.0f}" if r['rss_mb'] is not None else '-'
+        print(f"{profile:<8}{r['tweets']:>6}{r['tweets_per_second']:>10.2f}{r['transfer_kb']:>10.0f}"
+              f"{r['requests']:>8}{r['js_heap_mb']:>9.1f}{r['dom_nodes']:>9}{rss:>9}")
+    full, lean = results['full'], results['lean']
+    if full['transfer_kb']:
+        print(f"\nlean 下载量为 full 的 {lean['transfer_kb'] / full['transfer_kb']:.0%}")
+    if full['rss_mb'] and lean['rss_mb'] is not None:
+        print(f"lean 浏览器常驻内存为 full 的 {lean['rss_mb'] / full['rss_mb']:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文记录内存基准测试
+对比两种内存布局在 N 条推文下占用的内存（tracemalloc，保留的字节数）：
+- 字典：每条推文一个 dict，每条推文各自的 scraped_at 字符串，去重集合保存 timestamp + 正文的完整字符串；
+- Tweet：__slots__ 记录（tweet_record.py），每轮共用一个 scraped_at，去重集合保存 64 位摘要（key_hash）
+
+用法:
+    python3 benchmarks/bench_records.py [--tweets 5000] [--per-round 20]
+"""
+
+import gc
+import os
+import sys
+import argparse
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoint import key_hash
+from timeline_html import parse_timeline_html
+from tweet_record import Tweet
+from replay import FIXTURE, load_fixture, synthesize_timeline
+
+
+def load_raw_tweets(fixture, total):
+    """合成时间线并解析出原始字段（互动数用固定值，换算不在测量范围内）"""
+    raw_tweets = parse_timeline_html(synthesize_timeline(load_fixture(fixture), total))
+    for raw in raw_tweets:
+        raw['likes'], raw['retweets'], raw['replies'] = 1200, 340, 56
+    return raw_tweets
+
+
+def build_dicts(raw_tweets, per_round):
+    """原来的布局：推文字典 + 完整字符串的去重集合"""
+    records, seen = [], set()
+    for raw in raw_tweets:
+        records.append({
+            'text': raw['text'],
+            'timestamp': raw['timestamp'],
+            'time_display': raw['time_display'],
+            'likes': raw['likes'],
+            'retweets': raw['retweets'],
+            'replies': raw['replies'],
+            'scraped_at': datetime.now().isoformat(),
+        })
+        seen.add(f"{raw['timestamp']}_{raw['text']}")
+    return records, seen
+
+
+def build_tweets(raw_tweets, per_round):
+    """紧凑布局：Tweet 记录 + 64 位摘要的去重集合"""
+    records, seen = [], set()
+    scraped_at = ''
+    for i, raw in enumerate(raw_tweets):
+        if i % per_round == 0:
+            scraped_at = datetime.now().isoformat()
+        records.append(Tweet(raw['text'], raw['timestamp'], raw['time_display'],
+                             raw['likes'], raw['retweets'], raw['replies'], scraped_at))
+        seen.add(key_hash(f"{raw['timestamp']}_{raw['text']}"))
+    return records, seen
+
+
+def measure(build, raw_tweets, per_round):
+    """返回 (记录字节数, 去重集合字节数)；正文字符串由解析结果持有，两种布局共享，不计入"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        records, seen = build(raw_tweets, per_round)
+        after_both = tracemalloc.get_traced_memory()[0]
+        del seen
+        gc.collect()
+        records_only = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del records
+    return records_only - before, after_both - records_only
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推文记录内存基准测试')
+    parser.add_argument('--fixture', default=FIXTURE, help='时间线 HTML 快照路径')
+    parser.add_argument('--tweets', type=int, default=5000, help='推文数')
+    parser.add_argument('--per-round', type=int, default=20, help='每轮推文数（Tweet 布局每轮共用一个 scraped_at）')
+    args = parser.parse_args()
+
+    raw_tweets = load_raw_tweets(args.fixture, args.tweets)
+    count = len(raw_tweets)
+    print(f"快照: {args.fixture}，{count} 条推文\n")
+    print(f"{'布局':<8}{'记录 KB/千条':>14}{'去重 KB/千条':>14}{'合计 KB/千条':>14}")
+    results = {}
+    for name, build in (('字典', build_dicts), ('Tweet', build_tweets)):
+        records, seen = measure(build, raw_tweets, args.per_round)
+        results[name] = records + seen
+        print(f"{name:<8}{records / 1024 * 1000 / count:>14.1f}{seen / 1024 * 1000 / count:>14.1f}"
+              f"{results[name] / 1024 * 1000 / count:>14.1f}")
+    print(f"\nTweet 布局节省 {1 - results['Tweet'] / results['字典']:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端爬取基准测试
+在合成的离线时间线上运行完整的 scrape_user_tweets（提取、去重、滚动循环），
+对比批量提取、逐元素提取、HTML 快照解析（lxml / html.parser）和流水线解析的推文/秒、每条推文的 WebDriver 往返次数和每 1000 条推文的内存占用；
+--save 保存结果作为基线，--compare 与基线对比，超出容差时以非零状态退出，用于离线发现性能回退
+
+默认使用 FakeDriver（不需要浏览器，可用 --latency-ms 模拟往返延迟）；
+--chrome 改为启动本地替身服务器（replay.py）并用无头 Chrome 爬取
+
+用法:
+    python3 benchmarks/bench_scrape.py [--tweets 1000] [--latency-ms 0] [--window 0]
+    python3 benchmarks/bench_scrape.py --strategy html_lxml --strategy pipeline_lxml --window 60 --wait-ms 5
+    python3 benchmarks/bench_scrape.py --save benchmarks/baseline.json
+    python3 benchmarks/bench_scrape.py --compare benchmarks/baseline.json --tolerance 0.2
+    python3 benchmarks/bench_scrape.py --chrome --tweets 300
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from twitter_scraper import TwitterScraper
+from log_config import configure_logging
+from fake_driver import FakeDriver
+from replay import FIXTURE, ReplayServer, load_fixture, synthesize_timeline
+
+USERNAME = 'elonmusk'
+
+# 提取方式：名称 -> TwitterScraper 参数
+STRATEGIES = {
+    'batch': {'batch_extract': True},
+    'per_element': {'batch_extract': False},
+    'html_lxml': {'html_parser': 'lxml'},
+    'html_parser': {'html_parser': 'html.parser'},
+    'pipeline_lxml': {'html_parser': 'lxml', 'pipeline': True},
+}
+
+# 与基线对比的指标：(名称, 越大越好)
+COMPARED_METRICS = (
+    ('tweets_per_second', True),
+    ('round_trips_per_tweet', False),
+    ('kb_per_1000_tweets', False),
+)
+
+
+def make_scraper(options, data_dir, base_url=None, wait=0.0):
+    """不写文件的爬虫：adaptive 模式下滚动后新内容出现即返回，每次等待固定 wait 秒（默认不等待）"""
+    kwargs = dict(headless=True, wait_mode='adaptive', wait_timeout=2, jitter_floor=(wait, wait),
+                  checkpoint_interval=0, **options)
+    if base_url:
+        kwargs['base_url'] = base_url
+    scraper = TwitterScraper(**kwargs)
+    scraper.data_dir = data_dir
+    scraper.checkpoint_dir = os.path.join(data_dir, 'checkpoints')
+    return scraper
+
+
+def scrape_once(html, options, args, data_dir, measure_memory=False, server=None):
+    """运行一次完整爬取，返回 (爬虫, 耗时秒, 分配的内存字节 或 None)"""
+    scraper = make_scraper(options, data_dir, server.url if server else None, args.wait_ms / 1000)
+    if server is None:
+        scraper.driver = FakeDriver(html, latency=args.latency_ms / 1000, visible=args.per_scroll,
+                                    scroll_batch=args.per_scroll, window=args.window)
+        # 快照解析是假驱动自身的开销（真实浏览器中由页面完成），不计入耗时和内存
+        scraper.driver.preload()
+    retained = None
+    try:
+        if measure_memory:
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        scraper.scrape_user_tweets(USERNAME, args.tweets)
+        elapsed = time.perf_counter() - start
+        if measure_memory:
+            # 爬取结束时仍被持有的内存（推文数据、去重集合等），不含快照本身
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+        if server is not None:
+            scraper.close()
+    return scraper, elapsed, retained
+
+
+def run_strategy(name, html, args, data_dir, server=None):
+    """运行一种提取方式（计时取最快一次，内存单独测量一次，避免 tracemalloc 影响计时）"""
+    options = STRATEGIES[name]
+    best = None
+    scraper = None
+    for _ in range(args.repeat):
+        scraper, elapsed, _ = scrape_once(html, options, args, data_dir, server=server)
+        best = elapsed if best is None else min(best, elapsed)
+    collected = max(scraper.tweets_collected, 1)
+    metrics = scraper.metrics.as_dict()
+    phases = metrics['phases']
+    result = {
+        'tweets': scraper.tweets_collected,
+        'rounds': metrics['counters'].get('rounds', 0),
+        'seconds': round(best, 4),
+        'tweets_per_second': round(scraper.tweets_collected / best, 1) if best else 0.0,
+        'extract_ms_per_tweet': round(phases.get('extract', {}).get('seconds', 0) * 1000 / collected, 4),
+        'process_ms_per_tweet': round(phases.get('process', {}).get('seconds', 0) * 1000 / collected, 4),
+        'duplicate_rate': metrics['duplicate_rate'],
+        'round_trips_per_tweet': None,
+        'kb_per_1000_tweets': None,
+    }
+    if server is None:
+        result['round_trips_per_tweet'] = round(scraper.driver.round_trips / collected, 3)
+        _, _, retained = scrape_once(html, options, args, data_dir, measure_memory=True)
+        result['kb_per_1000_tweets'] = round(retained / 1024 * 1000 / collected, 1)
+    return result
+
+
+def format_value(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def print_results(results):
+    print(f"{'方式':<14}{'推文':>6}{'轮数':>6}{'耗时(s)':>10}{'推文/秒':>10}{'往返/条':>9}"
+          f"{'提取ms/条':>11}{'处理ms/条':>11}{'KB/千条':>10}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['tweets']:>6}{r['rounds']:>6}{r['seconds']:>10.3f}{r['tweets_per_second']:>10.1f}"
+              f"{format_value(r['round_trips_per_tweet'], '.2f'):>9}"
+              f"{r['extract_ms_per_tweet']:>11.3f}{r['process_ms_per_tweet']:>11.3f}"
+              f"{format_value(r['kb_per_1000_tweets'], '.1f'):>10}")
+
+
+def compare(results, baseline, tolerance):
+    """返回超出容差的指标说明列表"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            mark = '❌' if worse > tolerance else '✓'
+            print(f"  {mark} {name}.{metric}: {old} -> {new} ({change:+.1%})")
+            if worse > tolerance:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端爬取基准测试（离线回放）')
+    parser.add_argument('--fixture', default=FIXTURE, help='时间线 HTML 快照路径')
+    parser.add_argument('--tweets', type=int, default=1000, help='目标推文数（合成时间线的长度相同）')
+    parser.add_argument('--per-scroll', type=int, default=20, help='每次滚动加载的推文数')
+    parser.add_argument('--window', type=int, default=0,
+                        help='页面上最多保留的推文节点数（模拟虚拟列表），0 表示不限')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='每次 WebDriver 往返的模拟延迟（毫秒）')
+    parser.add_argument('--wait-ms', type=float, default=0.0,
+                        help='每次等待的固定时长（毫秒），流水线解析在等待期间进行')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最快一次）')
+    parser.add_argument('--strategy', choices=list(STRATEGIES), action='append',
+                        help='只运行指定的提取方式，可重复指定（默认全部）')
+    parser.add_argument('--chrome', action='store_true', help='使用本地替身服务器和无头 Chrome')
+    parser.add_argument('--save', help='把结果保存为基线 JSON')
+    parser.add_argument('--compare', help='与基线 JSON 对比')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='允许的性能变差比例（默认 20%%）')
+    args = parser.parse_args()
+
+    # 逐条推文的日志不计入基准
+    configure_logging('WARNING')
+
+    html = synthesize_timeline(load_fixture(args.fixture), args.tweets)
+    strategies = args.strategy or list(STRATEGIES)
+    print(f"快照: {args.fixture}，合成 {args.tweets} 条推文，每次滚动加载 {args.per_scroll} 条")
+    print(f"驱动: {'无头 Chrome + 本地替身服务器' if args.chrome else f'FakeDriver（往返延迟 {args.latency_ms} ms）'}\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        if args.chrome:
+            with ReplayServer(html, page_size=args.per_scroll) as server:
+                for name in strategies:
+                    results[name] = run_strategy(name, html, args, data_dir, server=server)
+        else:
+            for name in strategies:
+                results[name] = run_strategy(name, html, args, data_dir)
+    print_results(results)
+
+    incomplete = [name for name, r in results.items() if r['tweets'] < args.tweets]
+    if incomplete:
+        print(f"\n⚠️  未收集到目标数量: {', '.join(incomplete)}（滚动轮数上限或页面到底）")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'args': {k: v for k, v in vars(args).items() if k not in ('save', 'compare')},
+                       'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存到: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n与基线对比（容差 {args.tolerance:.0%}）：")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ 性能回退: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✓ 没有超出容差的性能回退")
+
+
+if __name__ == '__main__':
+    main()
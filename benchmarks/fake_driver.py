@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线假驱动
+基于保存的 HTML 快照模拟 Selenium WebDriver 的常用接口，
+统计 WebDriver 往返次数，并可为每次往返注入模拟延迟；
+设置 scroll_batch 后每次滚动追加一批推文（模拟无限滚动），可以离线运行完整的 scrape_user_tweets
+"""
+
+import time
+
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
+
+from twitter_scraper import (BATCH_EXTRACT_SCRIPT, TWEET_COUNT_SCRIPT, PAGE_STATE_SCRIPT,
+                             WAIT_FOR_CHANGE_SCRIPT, SCROLL_TO_LAST_TWEET_SCRIPT)
+from timeline_html import TIMELINE_SNAPSHOT_SCRIPT, status_id
+
+
+def inner_text(tag) -> str:
+    """近似浏览器的 innerText：<br> 视为换行"""
+    parts = []
+    for node in tag.descendants:
+        if isinstance(node, str):
+            parts.append(node)
+        elif node.name == 'br':
+            parts.append('\n')
+    return ''.join(parts).strip()
+
+
+class FakeElement:
+    """模拟 WebElement，所有访问都计为一次往返"""
+
+    def __init__(self, driver, tag):
+        self._driver = driver
+        self._tag = tag
+        # 与真实 WebElement 一样，同一 DOM 节点的 id 保持不变
+        self.id = str(id(tag))
+
+    @property
+    def text(self) -> str:
+        self._driver.round_trip()
+        return inner_text(self._tag)
+
+    def get_attribute(self, name: str):
+        self._driver.round_trip()
+        if name == 'innerHTML':
+            return self._tag.decode_contents()
+        if name == 'outerHTML':
+            return str(self._tag)
+        return self._tag.get(name)
+
+    def find_elements(self, by, selector):
+        assert by == By.CSS_SELECTOR
+        self._driver.round_trip()
+        return [FakeElement(self._driver, t) for t in self._tag.select(selector)]
+
+    def find_element(self, by, selector):
+        elements = self.find_elements(by, selector)
+        if not elements:
+            raise NoSuchElementException(selector)
+        return elements[0]
+
+
+class FakeDriver:
+    """
+    模拟 webdriver.Chrome
+
+    Args:
+        html: 页面 HTML
+        latency: 每次 WebDriver 往返注入的模拟延迟（秒）
+        visible: 初始可见的推文数量，其余推文在 load_more() 时追加到页面（None 表示全部可见）
+        scroll_batch: 每次滚动脚本执行后追加的推文数量（模拟无限滚动），0 表示滚动不加载新内容
+        window: 页面上最多保留的推文节点数，超出时移除最早的节点（模拟 X 的虚拟列表），0 表示不限
+    """
+
+    def __init__(self, html: str, latency: float = 0.0, visible: int = None, scroll_batch: int = 0,
+                 window: int = 0):
+        self.soup = BeautifulSoup(html, 'html.parser')
+        self.latency = latency
+        self.scroll_batch = scroll_batch
+        self.window = window
+        self.round_trips = 0
+        self.current_url = None
+        self._container = None
+        self._pending = []
+        # 页面上的推文节点按顺序缓存，快照的字段只解析一次，模拟本身的开销不随页面增长
+        self._articles = self.soup.select('[data-testid="tweet"]')
+        self._fields = {}
+        self._html = {}
+        if visible is not None:
+            if self._articles:
+                self._container = self._articles[0].parent.parent
+            self._pending = [article.parent.extract() for article in self._articles[visible:]]
+            self._articles = self._articles[:visible]
+        self._loaded = len(self._articles)  # 累计加载过的推文数（决定模拟页面高度）
+
+    @property
+    def page_source(self) -> str:
+        return str(self.soup)
+
+    def load_more(self, count: int) -> int:
+        """模拟滚动后加载更多推文，返回实际追加的数量"""
+        added = self._pending[:count]
+        self._pending = self._pending[count:]
+        for cell in added:
+            self._container.append(cell)
+            self._articles.append(cell.find(attrs={'data-testid': 'tweet'}))
+        self._loaded += len(added)
+        if self.window and len(self._articles) > self.window:
+            for article in self._articles[:-self.window]:
+                self._fields.pop(id(article), None)
+                self._html.pop(id(article), None)
+                article.parent.decompose()
+            self._articles = self._articles[-self.window:]
+        return len(added)
+
+    def round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, url: str):
+        self.round_trip()
+        self.current_url = url
+
+    def find_elements(self, by, selector):
+        assert by == By.CSS_SELECTOR
+        self.round_trip()
+        tags = self._articles if selector == '[data-testid="tweet"]' else self.soup.select(selector)
+        return [FakeElement(self, t) for t in tags]
+
+    def find_element(self, by, selector):
+        elements = self.find_elements(by, selector)
+        if not elements:
+            raise NoSuchElementException(selector)
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        self.round_trip()
+        if script == SCROLL_TO_LAST_TWEET_SCRIPT or script.startswith('window.scrollTo('):
+            self._scrolled()
+        if script == BATCH_EXTRACT_SCRIPT:
+            return self._batch_extract(*args)
+        if script == TIMELINE_SNAPSHOT_SCRIPT:
+            return self._snapshot(*args)
+        if script == TWEET_COUNT_SCRIPT:
+            return len(self._articles)
+        if script == PAGE_STATE_SCRIPT:
+            return list(self._page_state())
+        if script == SCROLL_TO_LAST_TWEET_SCRIPT:
+            return bool(self._articles)
+        return None
+
+    def execute_async_script(self, script, *args):
+        self.round_trip()
+        if script == WAIT_FOR_CHANGE_SCRIPT:
+            # 快照不会自行变化：只比较当前状态与基线
+            return self._page_state() != (args[0], args[1])
+        return None
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def _scrolled(self):
+        """滚动到底部附近：按 scroll_batch 追加下一批推文"""
+        if self.scroll_batch and self._pending:
+            self.load_more(self.scroll_batch)
+
+    def _page_state(self):
+        """(推文节点数, 模拟页面高度)"""
+        return len(self._articles), self._loaded * 420
+
+    def _article_fields(self, article):
+        """一个推文节点的 (去重标记, 字段)，每个节点只解析一次"""
+        cached = self._fields.get(id(article))
+        if cached is not None:
+            return cached
+
+        def label(testid):
+            el = article.select_one(f'[data-testid="{testid}"]')
+            return (el.get('aria-label') or '0') if el else None
+
+        time_el = article.select_one('time')
+        link = time_el.find_parent('a') if time_el else None
+        key = (link.get('href') if link else None) or (time_el.get('datetime') if time_el else None) or ''
+        text_el = article.select_one('[data-testid="tweetText"]')
+        fields = {
+            'tweet_id': status_id(link.get('href') if link else None),
+            'text': inner_text(text_el) if text_el else '',
+            'timestamp': (time_el.get('datetime') or '') if time_el else '',
+            'time_display': inner_text(time_el) if time_el else '',
+            'like_label': label('like'),
+            'retweet_label': label('retweet'),
+            'reply_label': label('reply'),
+            'social_context': article.select_one('[data-testid="socialContext"]') is not None,
+        }
+        self._fields[id(article)] = key, fields
+        return key, fields
+
+    def _snapshot(self, only_new=False):
+        """TIMELINE_SNAPSHOT_SCRIPT 的 Python 等价实现（各推文节点的 HTML 与字段一起缓存，不重复序列化）"""
+        parts = []
+        skipped = 0
+        for article in self._articles:
+            key, _ = self._article_fields(article)
+            if only_new and article.get('data-scraper-snapshot') == key:
+                skipped += 1
+                continue
+            article['data-scraper-snapshot'] = key
+            parts.append(self._article_html(article))
+        html = f"<div>{''.join(parts)}</div>" if parts else ''
+        return {'html': html, 'total': len(self._articles), 'skipped': skipped}
+
+    def _article_html(self, article) -> str:
+        html = self._html.get(id(article))
+        if html is None:
+            html = self._html[id(article)] = str(article)
+        return html
+
+    def preload(self):
+        """预先解析所有推文节点（含尚未加载的），基准测试中排除假驱动自身的解析开销"""
+        articles = self._articles + [cell.find(attrs={'data-testid': 'tweet'}) for cell in self._pending]
+        for article in articles:
+            self._article_fields(article)
+            self._article_html(article)
+
+    def _batch_extract(self, only_new=False):
+        """BATCH_EXTRACT_SCRIPT 的 Python 等价实现"""
+        tweets = []
+        skipped = 0
+        for article in self._articles:
+            key, fields = self._article_fields(article)
+            if only_new and article.get('data-scraper-key') == key:
+                skipped += 1
+                continue
+            article['data-scraper-key'] = key
+            tweets.append(dict(fields))
+        return {'tweets': tweets, 'total': len(self._articles), 'skipped': skipped}
+
+    def quit(self):
+        pass
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线假页面
+在 FakeDriver 之上模拟异步引擎用到的 Playwright Page 接口（goto、wait_for_selector、evaluate），
+page.evaluate 收到的包装函数映射回原来的 Selenium 脚本后交给 FakeDriver 执行；
+每次往返的模拟延迟用 asyncio.sleep，等待期间事件循环可以运行其他任务
+"""
+
+import asyncio
+
+from fake_driver import FakeDriver
+from async_scraper import page_function
+from twitter_scraper import (BATCH_EXTRACT_SCRIPT, TWEET_COUNT_SCRIPT, PAGE_STATE_SCRIPT,
+                             WAIT_FOR_CHANGE_SCRIPT, SCROLL_TO_LAST_TWEET_SCRIPT)
+from timeline_html import TIMELINE_SNAPSHOT_SCRIPT
+
+# 包装函数 -> (原脚本, 是否为异步脚本)
+SCRIPTS = {page_function(script): (script, False) for script in (
+    BATCH_EXTRACT_SCRIPT, TWEET_COUNT_SCRIPT, PAGE_STATE_SCRIPT, SCROLL_TO_LAST_TWEET_SCRIPT,
+    TIMELINE_SNAPSHOT_SCRIPT, "window.scrollTo(0, document.body.scrollHeight);", "window.scrollBy(0, -300);")}
+SCRIPTS[page_function(WAIT_FOR_CHANGE_SCRIPT, is_async=True)] = (WAIT_FOR_CHANGE_SCRIPT, True)
+
+
+class FakePage:
+    """
+    模拟 playwright.async_api.Page
+
+    Args:
+        html, visible, scroll_batch, window: 同 FakeDriver
+        latency: 每次往返注入的模拟延迟（秒）
+    """
+
+    def __init__(self, html: str, latency: float = 0.0, visible: int = None, scroll_batch: int = 0,
+                 window: int = 0):
+        self.driver = FakeDriver(html, visible=visible, scroll_batch=scroll_batch, window=window)
+        self.latency = latency
+        self.url = None
+
+    @property
+    def round_trips(self) -> int:
+        return self.driver.round_trips
+
+    def preload(self):
+        self.driver.preload()
+
+    async def _round_trip(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def goto(self, url: str, **kwargs):
+        await self._round_trip()
+        self.driver.get(url)
+        self.url = url
+
+    async def wait_for_selector(self, selector: str, timeout: float = None):
+        await self._round_trip()
+        if not self.driver.find_elements('css selector', selector):
+            raise asyncio.TimeoutError(selector)
+
+    async def evaluate(self, function: str, args=None):
+        await self._round_trip()
+        script, is_async = SCRIPTS.get(function, (None, False))
+        if script is None:
+            return None
+        if is_async:
+            return self.driver.execute_async_script(script, *(args or []))
+        return self.driver.execute_script(script, *(args or []))
+
+    def on(self, event: str, handler):
+        pass
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线回放
+用保存的时间线 HTML 快照合成任意长度的个人主页时间线，供两种方式离线运行完整的爬取流程：
+- FakeDriver（fake_driver.py）：不需要浏览器，每次滚动追加一批推文；
+- ReplayServer：本地 HTTP 替身服务器，页面脚本在滚动到底部附近时分页加载更多推文，
+  TwitterScraper(base_url=server.url) 配合无头 Chrome 使用
+
+用法（手动打开浏览器查看）:
+    python3 benchmarks/replay.py --tweets 500 --port 8901
+    # 访问 http://127.0.0.1:8901/elonmusk
+"""
+
+import os
+import re
+import copy
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import urlparse, parse_qs
+
+from bs4 import BeautifulSoup
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'profile_timeline.html')
+
+STATUS_HREF_PATTERN = re.compile(r'/status/(\d+)')
+
+# 快照中的推文节点是绝对定位的（X 的虚拟列表），替身页面改为正常排列，使页面高度随推文增长
+REPLAY_STYLE = """
+[data-testid="cellInnerDiv"] { position: static !important; transform: none !important; min-height: 120px; }
+"""
+
+# 无限滚动：距离底部不到一屏时请求下一页推文并追加到时间线末尾
+INFINITE_SCROLL_SCRIPT = """
+(() => {
+    const region = document.querySelector('[data-testid="primaryColumn"] section');
+    let offset = %(offset)d, loading = false, done = false;
+    const loadMore = async () => {
+        if (loading || done || window.innerHeight + window.scrollY < document.body.scrollHeight - window.innerHeight) {
+            return;
+        }
+        loading = true;
+        const response = await fetch('%(more_url)s?offset=' + offset);
+        const html = await response.text();
+        if (!html.trim()) {
+            done = true;
+        } else {
+            region.insertAdjacentHTML('beforeend', html);
+            offset = Number(response.headers.get('X-Next-Offset'));
+        }
+        loading = false;
+    };
+    window.addEventListener('scroll', loadMore, {passive: true});
+})();
+"""
+
+
+def load_fixture(path: str = FIXTURE) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def synthesize_timeline(html: str, total: int) -> str:
+    """
+    把快照中的推文循环复制为 total 条：每条复制的推文有不同的状态链接和更早的时间戳，
+    在爬虫看来都是不同的推文（正文相同不影响 timestamp + text 去重）
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    cells = [article.parent for article in soup.select('[data-testid="tweet"]')]
+    if not cells or total <= len(cells):
+        for cell in cells[total:]:
+            cell.decompose()
+        return str(soup)
+
+    container = cells[0].parent
+    newest = max(datetime.fromisoformat(t['datetime'].replace('Z', '+00:00'))
+                 for t in soup.select('time[datetime]'))
+    for cell in cells:
+        cell.extract()
+    for i in range(total):
+        cell = copy.copy(cells[i % len(cells)])
+        stamp = (newest - timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        for time_el in cell.select('time[datetime]'):
+            time_el['datetime'] = stamp
+        for link in cell.select('a[href*="/status/"]'):
+            link['href'] = STATUS_HREF_PATTERN.sub(f'/status/{1972000000000000000 - i}', link['href'])
+        container.append(cell)
+    return str(soup)
+
+
+class ReplayServer:
+    """
+    本地个人主页替身：GET /<用户名> 返回前 page_size 条推文和无限滚动脚本，
+    GET /<用户名>/more?offset=N 返回之后的 page_size 条推文（HTML 片段，空响应表示到底）
+
+    Args:
+        html: 完整时间线 HTML（synthesize_timeline 的结果）
+        page_size: 每页推文数
+        delay: 每次分页请求的模拟网络延迟（秒）
+    """
+
+    def __init__(self, html: str, page_size: int = 20, delay: float = 0.0, host: str = '127.0.0.1',
+                 port: int = 0):
+        soup = BeautifulSoup(html, 'html.parser')
+        cells = [article.parent for article in soup.select('[data-testid="tweet"]')]
+        self.cells: List[str] = [str(cell) for cell in cells]
+        for cell in cells[page_size:]:
+            cell.decompose()
+        style = soup.new_tag('style')
+        style.string = REPLAY_STYLE
+        (soup.head or soup).append(style)
+        self._page = soup
+        self.page_size = page_size
+        self.delay = delay
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _profile_page(self, username: str) -> str:
+        page = copy.copy(self._page)
+        script = page.new_tag('script')
+        script.string = INFINITE_SCROLL_SCRIPT % {'offset': self.page_size, 'more_url': f'/{username}/more'}
+        page.body.append(script)
+        return str(page)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                parsed = urlparse(self.path)
+                parts = [p for p in parsed.path.split('/') if p]
+                headers = {}
+                if len(parts) == 1:
+                    body = server._profile_page(parts[0])
+                elif len(parts) == 2 and parts[1] == 'more':
+                    if server.delay:
+                        time.sleep(server.delay)
+                    offset = int(parse_qs(parsed.query).get('offset', ['0'])[0])
+                    end = offset + server.page_size
+                    body = '\n'.join(server.cells[offset:end])
+                    headers['X-Next-Offset'] = str(min(end, len(server.cells)))
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        """在当前线程中运行（命令行模式）"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self) -> 'ReplayServer':
+        """在后台线程中运行"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线个人主页替身服务器')
+    parser.add_argument('--fixture', default=FIXTURE, help='时间线 HTML 快照路径')
+    parser.add_argument('--tweets', type=int, default=500, help='合成的推文总数')
+    parser.add_argument('--page-size', type=int, default=20, help='每页推文数')
+    parser.add_argument('--delay-ms', type=float, default=0, help='分页请求的模拟网络延迟（毫秒）')
+    parser.add_argument('--port', type=int, default=8901, help='监听端口')
+    args = parser.parse_args()
+
+    html = synthesize_timeline(load_fixture(args.fixture), args.tweets)
+    server = ReplayServer(html, page_size=args.page_size, delay=args.delay_ms / 1000, port=args.port)
+    print(f"替身服务器: {server.url}/<用户名>（{args.tweets} 条推文，每页 {args.page_size} 条），Ctrl+C 退出")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器配置档
+full：完整浏览器（原来的配置）；lean：精简浏览器，只读取推文文本和互动数，
+不下载图片、视频和字体（Chrome 偏好设置 + CDP Network.setBlockedURLs），关闭后台联网、翻译等功能，
+窗口更小；反检测配置（User-Agent、AutomationControlled 等）两种配置档相同
+
+另外提供页面资源用量统计（下载字节数、请求数、JS 堆、DOM 节点数），用于对比两种配置档。
+Selenium 引擎和异步引擎（async_scraper.py）使用相同的启动参数、窗口大小和 CDP 设置
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DRIVER_PROFILES = ('full', 'lean')
+
+FULL_WINDOW_SIZE = '1920,1080'
+# 仍是桌面布局（时间线和侧栏的宽度阈值以上），渲染的节点和合成层更少
+LEAN_WINDOW_SIZE = '1280,900'
+
+# 反检测启动参数（两种配置档、两种引擎相同）
+STEALTH_ARGUMENTS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+]
+
+# 隐藏 navigator.webdriver
+HIDE_WEBDRIVER_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+# 精简配置档不加载的资源：图片、视频、头像、字体（CDP 通配符）
+LEAN_BLOCKED_URLS = [
+    '*://pbs.twimg.com/*',
+    '*://video.twimg.com/*',
+    '*://abs.twimg.com/emoji/*',
+    '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.svg*',
+    '*.mp4*', '*.m3u8*', '*.m4s*', '*.webm*',
+    '*.woff*', '*.ttf*', '*.otf*',
+]
+
+LEAN_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.notifications': 2,
+    'profile.default_content_setting_values.geolocation': 2,
+    'profile.default_content_setting_values.media_stream': 2,
+}
+
+LEAN_ARGUMENTS = [
+    '--blink-settings=imagesEnabled=false',
+    '--mute-audio',
+    '--autoplay-policy=user-gesture-required',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--no-first-run',
+]
+
+# 页面默认只保留 250 条资源计时记录，长时间滚动时调大，资源用量统计才完整
+TIMING_BUFFER_SCRIPT = "performance.setResourceTimingBufferSize(100000);"
+
+RESOURCE_USAGE_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let transfer = 0;
+const byType = {};
+for (const e of entries) {
+    const size = e.transferSize || 0;
+    transfer += size;
+    byType[e.initiatorType] = (byType[e.initiatorType] || 0) + size;
+}
+return {
+    transfer_bytes: transfer,
+    requests: entries.length,
+    transfer_by_type: byType,
+    js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : 0,
+    dom_nodes: document.getElementsByTagName('*').length
+};
+"""
+
+
+def apply_profile(chrome_options, profile: str):
+    """按配置档设置启动参数（反检测参数由调用方设置，两种配置档相同）"""
+    if profile not in DRIVER_PROFILES:
+        raise ValueError(f"不支持的浏览器配置档: {profile}")
+    if profile == 'lean':
+        chrome_options.add_argument(f'--window-size={LEAN_WINDOW_SIZE}')
+        for argument in LEAN_ARGUMENTS:
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option('prefs', LEAN_PREFS)
+    else:
+        chrome_options.add_argument(f'--window-size={FULL_WINDOW_SIZE}')
+
+
+def window_size(profile: str) -> Tuple[int, int]:
+    """配置档的窗口大小 (宽, 高)，异步引擎用作页面视口"""
+    width, height = (LEAN_WINDOW_SIZE if profile == 'lean' else FULL_WINDOW_SIZE).split(',')
+    return int(width), int(height)
+
+
+def launch_arguments(profile: str) -> List[str]:
+    """异步引擎启动 Chromium 的参数（Selenium 引擎由 apply_profile 设置）"""
+    if profile not in DRIVER_PROFILES:
+        raise ValueError(f"不支持的浏览器配置档: {profile}")
+    return STEALTH_ARGUMENTS + (LEAN_ARGUMENTS if profile == 'lean' else [])
+
+
+def cdp_setup_commands(profile: str) -> List[Tuple[str, Dict]]:
+    """启动后依次发送的 CDP 命令：调大资源计时缓冲区；精简配置档屏蔽媒体和字体请求"""
+    commands = [
+        ('Page.addScriptToEvaluateOnNewDocument', {'source': TIMING_BUFFER_SCRIPT}),
+        ('Performance.enable', {}),
+    ]
+    if profile == 'lean':
+        commands += [
+            ('Network.enable', {}),
+            ('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS}),
+        ]
+    return commands
+
+
+def prepare_driver(driver, profile: str):
+    """
+    启动后的 CDP 设置（见 cdp_setup_commands）
+    （屏蔽对该浏览器之后的所有页面生效，驱动池复用时不需要重新设置）
+    """
+    try:
+        for method, params in cdp_setup_commands(profile):
+            driver.execute_cdp_cmd(method, params)
+    except Exception as e:
+        # 非 Chromium 驱动或 CDP 不可用：图片仍由偏好设置关闭
+        logger.warning("浏览器 CDP 设置失败（%s 配置档）: %s", profile, e)
+
+
+def resource_usage(driver) -> Dict:
+    """
+    当前页面的资源用量：下载字节数（Resource Timing 的 transferSize，跨域资源没有开放计时时计为 0，
+    数值偏小）、请求数、按发起类型的下载字节数、JS 堆和 DOM 节点数；取不到时返回空字典
+    """
+    try:
+        usage = driver.execute_script(RESOURCE_USAGE_SCRIPT) or {}
+    except Exception as e:
+        logger.debug("读取资源用量失败: %s", e)
+        return {}
+    try:
+        merge_performance_metrics(usage, driver.execute_cdp_cmd('Performance.getMetrics', {}))
+    except Exception:
+        pass  # 没有 CDP 时使用页面脚本的结果
+    return usage
+
+
+def merge_performance_metrics(usage: Dict, result: Dict):
+    """用 CDP Performance.getMetrics 的结果覆盖页面脚本读到的 JS 堆和 DOM 节点数"""
+    values = {item['name']: item['value'] for item in result.get('metrics', [])}
+    usage['js_heap_bytes'] = int(values.get('JSHeapUsedSize', usage.get('js_heap_bytes', 0)))
+    usage['dom_nodes'] = int(values.get('Nodes', usage.get('dom_nodes', 0)))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取检查点
+定期把已收集推文的去重键、收集数量和到达的最早时间戳写入磁盘，
+任务被取消或浏览器崩溃后可以从检查点继续，跳过已完成的部分；
+另外记录每个用户已保存的最新推文，供增量爬取在到达时停止
+"""
+
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from tweet_sinks import iter_output_records
+
+
+def key_hash(key: str) -> int:
+    """将去重键（推文 ID 或 timestamp + 正文）压缩为 64 位整数摘要（内存中的去重集合使用）"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def key_digest(key: str) -> str:
+    """去重键的 16 位十六进制摘要（写入文件时使用，与 key_hash 相同的摘要）"""
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class ScrapeCheckpoint:
+    """
+    单个用户的爬取检查点
+
+    文件为紧凑的 JSON：去重键只保存摘要，不保存推文内容（推文内容在流式输出文件中）；
+    内存中摘要保存为整数（key_hash），文件中为十六进制
+    """
+
+    def __init__(self, path: str, username: str):
+        self.path = path
+        self.username = username
+        self.seen = set()  # 去重键摘要（key_hash）
+        self.collected = 0
+        self.oldest_timestamp = ''
+        self.newest_timestamp = ''
+        self.output_files: List[str] = []
+        self.completed = False
+        self.updated_at = None
+
+    @classmethod
+    def for_user(cls, checkpoint_dir: str, username: str) -> 'ScrapeCheckpoint':
+        return cls(os.path.join(checkpoint_dir, f"{username.lower()}.json"), username)
+
+    @classmethod
+    def load(cls, checkpoint_dir: str, username: str) -> Optional['ScrapeCheckpoint']:
+        """读取用户的检查点，不存在或已损坏时返回 None"""
+        checkpoint = cls.for_user(checkpoint_dir, username)
+        try:
+            with open(checkpoint.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        checkpoint.seen = {int(digest, 16) for digest in data.get('seen', [])}
+        checkpoint.collected = data.get('collected', 0)
+        checkpoint.oldest_timestamp = data.get('oldest_timestamp', '')
+        checkpoint.newest_timestamp = data.get('newest_timestamp', '')
+        checkpoint.output_files = data.get('output_files', [])
+        checkpoint.completed = data.get('completed', False)
+        checkpoint.updated_at = data.get('updated_at')
+        return checkpoint
+
+    def __contains__(self, digest: int) -> bool:
+        return digest in self.seen
+
+    def add(self, digest: int, tweet: Dict):
+        """记录一条已收集的推文（digest 为去重键的 key_hash）"""
+        self.seen.add(digest)
+        self.collected += 1
+        timestamp = tweet.get('timestamp', '')
+        if timestamp:
+            if not self.oldest_timestamp or timestamp < self.oldest_timestamp:
+                self.oldest_timestamp = timestamp
+            if timestamp > self.newest_timestamp:
+                self.newest_timestamp = timestamp
+
+    def save(self):
+        """原子写入检查点文件（先写临时文件再替换，崩溃时不会留下半个文件）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.updated_at = datetime.now().isoformat()
+        data = {
+            'username': self.username,
+            'collected': self.collected,
+            'oldest_timestamp': self.oldest_timestamp,
+            'newest_timestamp': self.newest_timestamp,
+            'output_files': self.output_files,
+            'completed': self.completed,
+            'updated_at': self.updated_at,
+            'seen': [format(digest, '016x') for digest in sorted(self.seen)]
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+
+# ---------- 增量爬取：上次爬取到的最新推文 ----------
+
+OUTPUT_FILE_PATTERN = r'^{username}_\d{{8}}_\d{{6}}\.(json|jsonl|csv)$'
+
+
+def _watermark_path(checkpoint_dir: str, username: str) -> str:
+    return os.path.join(checkpoint_dir, f"{username.lower()}.latest.json")
+
+
+def save_watermark(checkpoint_dir: str, username: str, timestamp: str, key: str):
+    """记录用户已保存的最新推文（时间戳和去重键摘要），供下次增量爬取使用"""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = _watermark_path(checkpoint_dir, username)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'username': username, 'newest_timestamp': timestamp, 'newest_key': key_digest(key),
+                   'updated_at': datetime.now().isoformat()}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_watermark(checkpoint_dir: str, data_dir: str, username: str) -> Optional[Dict]:
+    """
+    读取用户已保存的最新推文
+
+    优先读取上次爬取写入的记录；没有时扫描 data 目录中该用户以前的输出文件
+
+    Returns:
+        {'newest_timestamp': ..., 'newest_key': 去重键摘要}，没有任何历史数据时返回 None
+    """
+    try:
+        with open(_watermark_path(checkpoint_dir, username), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    pattern = re.compile(OUTPUT_FILE_PATTERN.format(username=re.escape(username)), re.IGNORECASE)
+    newest = ''
+    newest_key = None
+    for filename in os.listdir(data_dir) if os.path.isdir(data_dir) else []:
+        if not pattern.match(filename):
+            continue
+        try:
+            for record in iter_output_records(os.path.join(data_dir, filename)):
+                timestamp = record.get('timestamp') or ''
+                if timestamp > newest:
+                    newest = timestamp
+                    newest_key = record.get('tweet_id') or f"{timestamp}_{record.get('text', '')}"
+        except (OSError, ValueError):
+            continue
+    if not newest:
+        return None
+    return {'newest_timestamp': newest, 'newest_key': key_digest(newest_key)}
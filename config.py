@@ -16,9 +16,76 @@ DEFAULT_CONFIG = {
     'output_directory': './data',
     'window_size': (1920, 1080),
     'scroll_attempts': 10,
-    'page_load_timeout': 20
+    'page_load_timeout': 20,
+    # 浏览器驱动池
+    'driver_pool_size': 2,           # 最多保留的空闲驱动数，0 表示不复用
+    'chromedriver_path': '',         # 固定的 ChromeDriver 路径（离线节点），留空时解析一次并缓存到 data/.state/chromedriver.json
+    'driver_profile': 'full',        # full: 完整浏览器；lean: 不下载图片、视频和字体，关闭不需要的浏览器功能
+    'driver_idle_timeout': 300,      # 空闲驱动保留时间（秒）
+    'driver_max_pages': 20,          # 每个驱动服务多少个任务后回收重建
+    # 任务并发
+    'scrape_engine': 'selenium',     # selenium: 每个任务一个线程和一个 Chrome；playwright: 一个事件循环驱动所有任务（需要安装 Playwright）
+    'max_concurrent_jobs': 3,        # 同时运行的爬取任务数（selenium 引擎）
+    'max_concurrent_contexts': 20,   # 同时运行的爬取任务数（playwright 引擎，每个任务一个浏览器上下文）
+    'max_queued_jobs': 100,          # 最多排队的任务数
+    'max_batch_size': 5000,          # 单个批量任务最多的账号数
+    'job_retry_delay': 10,           # 失败重试前的等待时间（秒），第 n 次重试等待 n 倍
+    # 等待策略
+    'wait_mode': 'fixed',            # fixed: 固定随机延迟；adaptive: 新内容出现即返回
+    'wait_timeout': 5,               # adaptive 模式下等待新内容的最长时间（秒）
+    'wait_jitter_floor': (0, 0),     # adaptive 模式下每次等待的最短随机时长范围（秒）
+    # 提取
+    'html_parser': '',               # 留空：页面内批量提取脚本（默认，最快）；lxml / html.parser：每轮取回新增推文节点的 HTML 在 Python 中解析
+    'pipeline_extract': False,       # 流水线提取：HTML 快照交给解析线程，解析与滚动、等待重叠
+    'parse_workers': 1,              # 流水线提取的解析线程数
+    # 流式输出
+    'stream_output': False,          # 边爬取边写入 JSON Lines / CSV 文件，不在内存中保留全部推文
+    'stream_buffer_size': 20,        # 流式输出缓冲条数，缓冲满时写入磁盘
+    # 推文库
+    'tweet_store': True,             # 所有任务的推文按推文去重写入 SQLite 推文库
+    'tweet_store_path': '',          # 推文库路径，留空为 data/.state/tweets.db
+    # Web 服务
+    'web_host': '0.0.0.0',
+    'web_port': 8887,
+    'web_server': 'auto',            # auto: 有 gunicorn 时使用，否则内置多线程服务器；gunicorn；builtin
+    'web_workers': 1,                # gunicorn 工作进程数（内置服务器固定为 1 个进程）
+    'web_threads': 8,                # 每个工作进程处理请求的线程数
+    'web_max_streams': 0,            # 每个工作进程同时保持的 SSE 进度流数（每个占用一个线程），0 为 web_threads 的一半；超出时页面改为轮询
+    'web_keepalive': 5,              # HTTP keep-alive 空闲连接保留时间（秒）
+    'web_debug': False,              # Flask 调试模式和自动重载（仅开发时使用）
+    # 共享任务状态
+    'shared_job_state': False,       # 多个工作进程时自动启用：任务状态和控制标志写入 SQLite，各进程一致
+    'job_state_path': '',            # 共享任务状态数据库路径，留空为 data/.state/jobs.db
+    # 日志
+    'log_level': 'INFO',             # DEBUG: 每条推文和每次滚动；INFO: 每轮摘要；WARNING: 只输出警告和错误
+    'log_format': 'text'             # text: 单行文本；json: 每行一个 JSON 对象（附带用户名、轮次等字段）
 }
 
+def scraper_options(config: dict) -> dict:
+    """从配置中取出传给 TwitterScraper 的参数"""
+    return {
+        'delay_range': config['delay_range'],
+        'wait_mode': config['wait_mode'],
+        'wait_timeout': config['wait_timeout'],
+        'jitter_floor': config['wait_jitter_floor'],
+        'stream_buffer_size': config['stream_buffer_size'],
+        'html_parser': config['html_parser'] or None,
+        'pipeline': config['pipeline_extract'],
+        'parse_workers': config['parse_workers'],
+        'driver_profile': config['driver_profile'],
+        'chromedriver_path': config['chromedriver_path'] or None
+    }
+
+def job_concurrency(config: dict) -> int:
+    """同时运行的爬取任务数：playwright 引擎按浏览器上下文数，selenium 引擎按浏览器数"""
+    if config['scrape_engine'] == 'playwright':
+        return config['max_concurrent_contexts']
+    return config['max_concurrent_jobs']
+
+def sse_stream_limit(config: dict) -> int:
+    """每个工作进程同时保持的 SSE 进度流数：gthread 下每个流占用一个线程，至少留一半线程处理其他请求"""
+    return config['web_max_streams'] or max(1, config['web_threads'] // 2)
+
 def get_config() -> dict:
     """获取配置"""
     config = DEFAULT_CONFIG.copy()
@@ -42,4 +109,106 @@ def get_config() -> dict:
     if os.getenv('OUTPUT_DIRECTORY'):
         config['output_directory'] = os.getenv('OUTPUT_DIRECTORY')
     
+    if os.getenv('DRIVER_POOL_SIZE'):
+        config['driver_pool_size'] = int(os.getenv('DRIVER_POOL_SIZE'))
+    
+    if os.getenv('CHROMEDRIVER_PATH'):
+        config['chromedriver_path'] = os.getenv('CHROMEDRIVER_PATH')
+    
+    if os.getenv('DRIVER_PROFILE'):
+        config['driver_profile'] = os.getenv('DRIVER_PROFILE').lower()
+    
+    if os.getenv('DRIVER_IDLE_TIMEOUT'):
+        config['driver_idle_timeout'] = float(os.getenv('DRIVER_IDLE_TIMEOUT'))
+    
+    if os.getenv('DRIVER_MAX_PAGES'):
+        config['driver_max_pages'] = int(os.getenv('DRIVER_MAX_PAGES'))
+    
+    if os.getenv('SCRAPE_ENGINE'):
+        config['scrape_engine'] = os.getenv('SCRAPE_ENGINE').lower()
+    
+    if os.getenv('MAX_CONCURRENT_JOBS'):
+        config['max_concurrent_jobs'] = int(os.getenv('MAX_CONCURRENT_JOBS'))
+    
+    if os.getenv('MAX_CONCURRENT_CONTEXTS'):
+        config['max_concurrent_contexts'] = int(os.getenv('MAX_CONCURRENT_CONTEXTS'))
+    
+    if os.getenv('MAX_QUEUED_JOBS'):
+        config['max_queued_jobs'] = int(os.getenv('MAX_QUEUED_JOBS'))
+    
+    if os.getenv('MAX_BATCH_SIZE'):
+        config['max_batch_size'] = int(os.getenv('MAX_BATCH_SIZE'))
+    
+    if os.getenv('JOB_RETRY_DELAY'):
+        config['job_retry_delay'] = float(os.getenv('JOB_RETRY_DELAY'))
+    
+    if os.getenv('WAIT_MODE'):
+        config['wait_mode'] = os.getenv('WAIT_MODE')
+    
+    if os.getenv('HTML_PARSER'):
+        config['html_parser'] = os.getenv('HTML_PARSER')
+    
+    if os.getenv('PIPELINE_EXTRACT'):
+        config['pipeline_extract'] = os.getenv('PIPELINE_EXTRACT').lower() == 'true'
+    
+    if os.getenv('PARSE_WORKERS'):
+        config['parse_workers'] = int(os.getenv('PARSE_WORKERS'))
+    
+    if os.getenv('WAIT_TIMEOUT'):
+        config['wait_timeout'] = float(os.getenv('WAIT_TIMEOUT'))
+    
+    if os.getenv('WAIT_JITTER_MIN') and os.getenv('WAIT_JITTER_MAX'):
+        config['wait_jitter_floor'] = (
+            float(os.getenv('WAIT_JITTER_MIN')),
+            float(os.getenv('WAIT_JITTER_MAX'))
+        )
+    
+    if os.getenv('STREAM_OUTPUT'):
+        config['stream_output'] = os.getenv('STREAM_OUTPUT').lower() == 'true'
+    
+    if os.getenv('STREAM_BUFFER_SIZE'):
+        config['stream_buffer_size'] = int(os.getenv('STREAM_BUFFER_SIZE'))
+    
+    if os.getenv('TWEET_STORE'):
+        config['tweet_store'] = os.getenv('TWEET_STORE').lower() == 'true'
+    
+    if os.getenv('TWEET_STORE_PATH'):
+        config['tweet_store_path'] = os.getenv('TWEET_STORE_PATH')
+    
+    if os.getenv('WEB_HOST'):
+        config['web_host'] = os.getenv('WEB_HOST')
+    
+    if os.getenv('WEB_PORT'):
+        config['web_port'] = int(os.getenv('WEB_PORT'))
+    
+    if os.getenv('WEB_SERVER'):
+        config['web_server'] = os.getenv('WEB_SERVER')
+    
+    if os.getenv('WEB_WORKERS'):
+        config['web_workers'] = int(os.getenv('WEB_WORKERS'))
+    
+    if os.getenv('WEB_THREADS'):
+        config['web_threads'] = int(os.getenv('WEB_THREADS'))
+    
+    if os.getenv('WEB_MAX_STREAMS'):
+        config['web_max_streams'] = int(os.getenv('WEB_MAX_STREAMS'))
+    
+    if os.getenv('WEB_KEEPALIVE'):
+        config['web_keepalive'] = float(os.getenv('WEB_KEEPALIVE'))
+    
+    if os.getenv('WEB_DEBUG'):
+        config['web_debug'] = os.getenv('WEB_DEBUG').lower() == 'true'
+    
+    if os.getenv('SHARED_JOB_STATE'):
+        config['shared_job_state'] = os.getenv('SHARED_JOB_STATE').lower() == 'true'
+    
+    if os.getenv('JOB_STATE_PATH'):
+        config['job_state_path'] = os.getenv('JOB_STATE_PATH')
+    
+    if os.getenv('LOG_LEVEL'):
+        config['log_level'] = os.getenv('LOG_LEVEL').upper()
+    
+    if os.getenv('LOG_FORMAT'):
+        config['log_format'] = os.getenv('LOG_FORMAT').lower()
+    
     return config
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+互动数解析
+把点赞 / 转发 / 回复按钮的 aria-label 或显示文本（"1,234 Likes. Like"、"1.2K"、"99239 回复。回复"、
+"1.2万 次喜欢"、"3,5 Mio."）换算为整数。只取标签中的第一个数字及紧跟的单位，标签里的其他文字
+（Likes、Mentions 等）不会被当作单位；正则在导入时编译，同一标签的结果会缓存
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# 单位 -> 倍数（英文单位不区分大小写，后面不能紧跟字母）
+LATIN_UNITS = {
+    'k': 10 ** 3, 'thousand': 10 ** 3, 'thousands': 10 ** 3, 'mil': 10 ** 3,
+    'm': 10 ** 6, 'mn': 10 ** 6, 'mio': 10 ** 6, 'million': 10 ** 6, 'millions': 10 ** 6,
+    'b': 10 ** 9, 'bn': 10 ** 9, 'mrd': 10 ** 9, 'billion': 10 ** 9, 'billions': 10 ** 9,
+}
+CJK_UNITS = {
+    '千': 10 ** 3,
+    '万': 10 ** 4, '萬': 10 ** 4, '만': 10 ** 4,
+    '亿': 10 ** 8, '億': 10 ** 8, '억': 10 ** 8,
+}
+
+# 数字分组符：逗号、点（德语等）、空格和不换行空格（法语等）、撇号（瑞士）
+GROUP_SEPARATORS = " '\u00a0\u202f\u2019"
+
+COUNT_PATTERN = re.compile(
+    r"(?P<number>\d+(?:[.,%s]\d+)*)\s*"
+    r"(?:(?P<unit>%s)(?![^\W\d_])|(?P<cjk>[%s]))?" % (
+        GROUP_SEPARATORS,
+        '|'.join(sorted(LATIN_UNITS, key=len, reverse=True)),
+        ''.join(CJK_UNITS),
+    ),
+    re.IGNORECASE,
+)
+
+
+def _to_number(digits: str, has_unit: bool) -> float:
+    """
+    按分隔符判断小数点：同时有逗号和点时后出现的是小数点；只有一种且出现一次时，
+    后面恰好三位且没有单位视为千位分组（"1,234"、"1.234"），否则为小数点（"1.2K"、"3,5 Mio."）
+    """
+    marks = [c for c in digits if c in '.,']
+    decimal = None
+    if marks:
+        last = marks[-1]
+        tail = digits.rsplit(last, 1)[1]
+        if len(set(marks)) > 1 or (len(marks) == 1 and (has_unit or len(tail) != 3)):
+            decimal = last
+    if decimal is None:
+        return float(''.join(c for c in digits if c.isdigit()))
+    head, tail = digits.rsplit(decimal, 1)
+    return float(''.join(c for c in head if c.isdigit()) + '.' + ''.join(c for c in tail if c.isdigit()))
+
+
+@lru_cache(maxsize=4096)
+def parse_count(label: Optional[str]) -> int:
+    """
+    解析一个互动数标签
+
+    Returns:
+        整数互动数；标签为空、为 None（按钮不存在）或其中没有数字时为 0
+    """
+    if not label:
+        return 0
+    match = COUNT_PATTERN.search(label)
+    if not match:
+        return 0
+    number, unit, cjk = match.groups()
+    if unit is None and cjk is None:
+        # aria-label 中通常是不带单位的精确数字
+        return int(number) if number.isdigit() else int(_to_number(number, False))
+    multiplier = LATIN_UNITS[unit.lower()] if unit else CJK_UNITS[cjk]
+    return int(round(_to_number(number, True) * multiplier))
+
+
+def parse_counts(like_label: Optional[str], retweet_label: Optional[str],
+                 reply_label: Optional[str]) -> Tuple[int, int, int]:
+    """一次换算一条推文的 (点赞数, 转发数, 回复数)"""
+    return parse_count(like_label), parse_count(retweet_label), parse_count(reply_label)
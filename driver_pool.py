@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器驱动池
+复用已启动、已配置好的 Chrome 会话，避免每个爬取任务都冷启动浏览器
+"""
+
+import time
+import threading
+from typing import Callable, Dict, Hashable, List
+
+
+# 后台检查空闲驱动的最长间隔（秒），idle_timeout 更短时按 idle_timeout 检查
+REAP_INTERVAL = 30
+
+
+class _PooledDriver:
+    """池中的驱动及其使用记录"""
+
+    def __init__(self, driver, key: Hashable):
+        self.driver = driver
+        self.key = key
+        self.pages = 0  # 已服务的任务（页面）数
+        self.idle_since = time.monotonic()
+
+
+class DriverPool:
+    """
+    Chrome 驱动池
+
+    - 按配置键（无头模式、网络捕获等启动参数）分组，只复用配置相同的驱动
+    - 借出前做健康检查，失效的驱动直接丢弃
+    - 每个驱动服务 max_pages 个任务后回收重建，空闲超过 idle_timeout 秒的驱动被关闭
+      （有空闲驱动时由后台线程定期检查，没有新任务时也会关闭）
+    """
+
+    def __init__(self, size: int = 2, idle_timeout: float = 300, max_pages: int = 20):
+        """
+        Args:
+            size: 池中最多保留的空闲驱动数量
+            idle_timeout: 空闲驱动的最长保留时间（秒）
+            max_pages: 每个驱动最多服务的任务数，达到后关闭并重建
+        """
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_pages = max_pages
+        self._idle: List[_PooledDriver] = []
+        self._in_use: Dict[int, _PooledDriver] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._reaper = None
+        self._stats = {'hits': 0, 'misses': 0, 'launches': 0, 'recycles': 0,
+                       'health_failures': 0, 'idle_evictions': 0}
+
+    def acquire(self, key: Hashable, factory: Callable):
+        """
+        借出一个驱动：优先复用配置相同的空闲驱动，否则调用 factory() 启动新驱动
+
+        Args:
+            key: 驱动配置键
+            factory: 无参函数，返回新启动的驱动
+        """
+        self._evict_idle()
+        while True:
+            with self._lock:
+                pooled = next((p for p in reversed(self._idle) if p.key == key), None)
+                if pooled:
+                    self._idle.remove(pooled)
+            if not pooled:
+                break
+            if self._is_healthy(pooled.driver):
+                with self._lock:
+                    self._stats['hits'] += 1
+                    self._in_use[id(pooled.driver)] = pooled
+                return pooled.driver
+            with self._lock:
+                self._stats['health_failures'] += 1
+            self._quit(pooled.driver)
+
+        driver = factory()
+        with self._lock:
+            self._stats['misses'] += 1
+            self._stats['launches'] += 1
+            self._in_use[id(driver)] = _PooledDriver(driver, key)
+        return driver
+
+    def release(self, driver, healthy: bool = True):
+        """
+        归还驱动；不健康、达到回收阈值或池已满时直接关闭
+
+        Args:
+            driver: acquire() 借出的驱动
+            healthy: 调用方认为驱动仍可用
+        """
+        with self._lock:
+            pooled = self._in_use.pop(id(driver), None)
+        if pooled is None:
+            self._quit(driver)
+            return
+
+        pooled.pages += 1
+        keep = healthy and pooled.pages < self.max_pages
+        if keep:
+            try:
+                # 离开当前页面，释放页面占用的内存
+                driver.get('about:blank')
+            except Exception:
+                keep = False
+
+        with self._lock:
+            if not healthy or pooled.pages >= self.max_pages:
+                self._stats['recycles'] += 1
+            if keep and len(self._idle) < self.size:
+                pooled.idle_since = time.monotonic()
+                self._idle.append(pooled)
+                self._start_reaper()
+                return
+        self._quit(driver)
+
+    def stats(self) -> Dict:
+        """返回池的统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = len(self._in_use)
+            stats['size'] = self.size
+        return stats
+
+    def close_all(self):
+        """关闭所有空闲驱动并停止后台检查线程（借出中的驱动在归还时关闭）"""
+        self._closed.set()
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.size = 0
+            reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            reaper.join()
+        for pooled in idle:
+            self._quit(pooled.driver)
+
+    def _start_reaper(self):
+        """池中有空闲驱动时启动后台检查线程（调用方持有锁）"""
+        if self._reaper is None and self.idle_timeout > 0 and not self._closed.is_set():
+            self._reaper = threading.Thread(target=self._reap, name='driver-pool-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        """定期关闭空闲超时的驱动；空闲驱动全部关闭或池关闭后退出，下次有驱动归还时重新启动"""
+        interval = min(REAP_INTERVAL, self.idle_timeout)
+        while not self._closed.wait(interval):
+            self._evict_idle()
+            with self._lock:
+                if not self._idle:
+                    if self._reaper is threading.current_thread():
+                        self._reaper = None
+                    return
+
+    def _evict_idle(self):
+        """关闭空闲超时的驱动"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [p for p in self._idle if now - p.idle_since > self.idle_timeout]
+            self._idle = [p for p in self._idle if p not in expired]
+            self._stats['idle_evictions'] += len(expired)
+        for pooled in expired:
+            self._quit(pooled.driver)
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        """健康检查：浏览器会话仍可执行脚本"""
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
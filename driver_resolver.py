@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChromeDriver 解析与缓存
+启动浏览器前确定 chromedriver 的路径，按以下顺序查找，只有最后一步需要联网：
+1. 配置的固定路径（chromedriver_path / 环境变量 CHROMEDRIVER_PATH），离线节点使用；
+2. 本进程已解析过的结果；
+3. 本机缓存文件（data/.state/chromedriver.json）：记录的驱动仍可执行且与本机 Chrome 主版本一致时直接使用；
+4. PATH 中的 chromedriver（版本与 Chrome 一致时）；
+5. webdriver-manager 下载（需要联网），结果写入缓存
+
+缓存只在驱动与 Chrome 的主版本不一致时失效（包括启动浏览器时报告版本不匹配）
+
+命令行（查看解析结果）:
+    python3 driver_resolver.py [--refresh] [--path /usr/local/bin/chromedriver]
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import logging
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from typing import Dict, Optional
+
+from log_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', '.state', 'chromedriver.json')
+
+VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+(?:\.\d+)?')
+
+# 本机 Chrome 可执行文件的常见位置（按顺序尝试）
+CHROME_CANDIDATES = {
+    'linux': ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser'],
+    'darwin': ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+               '/Applications/Chromium.app/Contents/MacOS/Chromium'],
+}
+
+# webdriver-manager 4.x 有时返回压缩包中的其他文件，在同一目录下查找真正的驱动
+DRIVER_FILENAMES = ('chromedriver', 'chromedriver.exe', 'chromedriver-mac-arm64', 'chromedriver-mac-x64')
+
+_lock = threading.Lock()
+_resolved: Optional[Dict] = None  # 本进程已解析的结果
+
+
+def _read_version(executable: str) -> Optional[str]:
+    """运行 `<executable> --version`，返回版本号；无法运行时返回 None"""
+    try:
+        output = subprocess.run([executable, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output or '')
+    return match.group(0) if match else None
+
+
+def _major(version: Optional[str]) -> Optional[str]:
+    return version.split('.', 1)[0] if version else None
+
+
+def detect_chrome_version() -> Optional[str]:
+    """本机 Chrome 的版本号；找不到时返回 None（此时不按版本校验缓存）"""
+    platform = 'darwin' if sys.platform == 'darwin' else 'linux' if sys.platform.startswith('linux') else None
+    for candidate in CHROME_CANDIDATES.get(platform, []):
+        executable = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+        if executable and os.path.exists(executable):
+            version = _read_version(executable)
+            if version:
+                return version
+    return None
+
+
+def _is_executable(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _fix_driver_path(driver_path: str) -> str:
+    """webdriver-manager 返回的路径不是驱动本身时，在同一目录下查找并设置执行权限"""
+    if os.path.basename(driver_path) in DRIVER_FILENAMES and os.path.isfile(driver_path):
+        candidates = [driver_path]
+    else:
+        driver_dir = os.path.dirname(driver_path)
+        candidates = [os.path.join(driver_dir, name) for name in DRIVER_FILENAMES]
+    for path in candidates:
+        if os.path.isfile(path):
+            if os.name != 'nt' and not os.access(path, os.X_OK):
+                os.chmod(path, 0o755)
+            return path
+    raise FileNotFoundError(f"在 {os.path.dirname(driver_path)} 中找不到可执行的 chromedriver")
+
+
+def _load_cache(cache_path: str) -> Optional[Dict]:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache(cache_path: str, entry: Dict):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("写入 ChromeDriver 缓存失败: %s", e)
+
+
+def _matches(entry: Optional[Dict], chrome_version: Optional[str]) -> bool:
+    """缓存的驱动仍可执行，且（能检测到 Chrome 版本时）主版本一致"""
+    if not entry or not _is_executable(entry.get('driver_path')):
+        return False
+    return chrome_version is None or _major(entry.get('driver_version')) == _major(chrome_version)
+
+
+def _entry(driver_path: str, chrome_version: Optional[str], source: str) -> Dict:
+    return {
+        'driver_path': driver_path,
+        'driver_version': _read_version(driver_path),
+        'chrome_version': chrome_version,
+        'source': source,
+        'resolved_at': datetime.now().isoformat(),
+    }
+
+
+def _download(chrome_version: Optional[str]) -> Dict:
+    """
+    用 webdriver-manager 下载与本机 Chrome 匹配的驱动（需要联网）
+
+    Raises:
+        FileNotFoundError: 下载失败（没有网络、没有安装 webdriver-manager 等），提示设置 CHROMEDRIVER_PATH
+    """
+    logger.info("正在通过 webdriver-manager 获取 ChromeDriver（需要联网）...")
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver_path = _fix_driver_path(ChromeDriverManager().install())
+    except Exception as e:
+        raise FileNotFoundError(
+            f"找不到 ChromeDriver：本机没有缓存、PATH 中没有可用的驱动，下载也失败了（{type(e).__name__}: {e}）。"
+            f"请设置 CHROMEDRIVER_PATH 指向本机的 chromedriver，或连接网络后重试") from e
+    return _entry(driver_path, chrome_version, 'webdriver-manager')
+
+
+def resolve_chromedriver(pinned_path: Optional[str] = None, cache_path: str = DEFAULT_CACHE_PATH,
+                         refresh: bool = False) -> str:
+    """
+    返回可用的 chromedriver 路径
+
+    Args:
+        pinned_path: 固定的驱动路径，指定时直接使用，不检测版本、不联网
+        cache_path: 本机缓存文件路径
+        refresh: 忽略已解析的结果和缓存文件（浏览器报告驱动版本不匹配时）
+
+    Raises:
+        FileNotFoundError: 固定路径不存在或不可执行，或需要下载时下载失败、下载后找不到驱动
+    """
+    global _resolved
+    if pinned_path:
+        if not _is_executable(pinned_path):
+            raise FileNotFoundError(f"配置的 ChromeDriver 不存在或不可执行: {pinned_path}")
+        return pinned_path
+
+    with _lock:
+        if _resolved is not None and not refresh and _is_executable(_resolved['driver_path']):
+            return _resolved['driver_path']
+
+        chrome_version = detect_chrome_version()
+        entry = None if refresh else _load_cache(cache_path)
+        if _matches(entry, chrome_version):
+            logger.debug("使用缓存的 ChromeDriver: %s", entry['driver_path'])
+        else:
+            if entry:
+                logger.info("缓存的 ChromeDriver %s 与 Chrome %s 不匹配，重新解析",
+                            entry.get('driver_version'), chrome_version)
+            on_path = shutil.which('chromedriver')
+            entry = _entry(on_path, chrome_version, 'path') if on_path else None
+            # 刷新时检测不到 Chrome 版本，无法确认 PATH 中的驱动是否就是不匹配的那个，直接下载
+            if not _matches(entry, chrome_version) or (refresh and chrome_version is None):
+                entry = _download(chrome_version)
+            _save_cache(cache_path, entry)
+            logger.info("ChromeDriver %s（%s）: %s", entry['driver_version'] or '未知版本',
+                        entry['source'], entry['driver_path'])
+        _resolved = entry
+        return entry['driver_path']
+
+
+def is_version_mismatch(error: Exception) -> bool:
+    """启动浏览器的异常是否为驱动与 Chrome 版本不匹配"""
+    message = str(error)
+    return 'only supports Chrome version' in message or 'This version of ChromeDriver' in message
+
+
+def main():
+    """查看或刷新本机的 ChromeDriver 解析结果"""
+    parser = argparse.ArgumentParser(description='ChromeDriver 解析与缓存')
+    parser.add_argument('--path', default=os.getenv('CHROMEDRIVER_PATH'), help='固定的驱动路径')
+    parser.add_argument('--refresh', action='store_true', help='忽略缓存重新解析')
+    args = parser.parse_args()
+    configure_logging('INFO')
+    print(f"Chrome: {detect_chrome_version() or '未检测到'}")
+    try:
+        print(f"ChromeDriver: {resolve_chromedriver(args.path, refresh=args.refresh)}")
+    except FileNotFoundError as e:
+        sys.exit(f"❌ {e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出文件行索引
+为 JSON / JSON Lines / CSV 导出文件建立每条推文的字节偏移索引（每个文件只扫描一次，按 mtime 缓存），
+分页预览任意一页只需按偏移读取该页的推文，耗时和内存与文件大小无关
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import mmap
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List
+
+
+# JSON：整个字符串（含转义）作为一个记号跳过，只关心括号的嵌套层级
+JSON_TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]+|\\.)*"|[{}\[\]]', re.DOTALL)
+
+# 不含嵌套对象 / 数组的 JSON 对象（推文导出都是这种平坦结构），整个对象一次匹配
+FLAT_OBJECT_PATTERN = re.compile(rb'\{(?:[^{}\[\]"]+|"(?:[^"\\]+|\\.)*")*\}', re.DOTALL)
+
+# CSV：引号内的字段整体跳过（可含换行和 "" 转义），剩下的换行才是记录分隔
+CSV_TOKEN_PATTERN = re.compile(rb'"[^"]*(?:""[^"]*)*"|\n')
+
+# 最多缓存的文件索引数
+INDEX_CACHE_SIZE = 32
+
+
+class RowIndex:
+    """单个文件的行索引：第 i 条推文位于 [starts[i], ends[i]) 字节范围内"""
+
+    def __init__(self, path: str, fmt: str, mtime_ns: int, size: int):
+        self.path = path
+        self.format = fmt
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.starts = array('q')
+        self.ends = array('q')
+        self.fieldnames: List[str] = []  # CSV 表头
+
+    @property
+    def total(self) -> int:
+        return len(self.starts)
+
+    def read(self, offset: int = 0, limit: int = 10) -> List[Dict]:
+        """读取第 offset 条起的 limit 条推文"""
+        stop = min(offset + limit, self.total)
+        if offset >= stop:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self.starts[offset])
+            block = f.read(self.ends[stop - 1] - self.starts[offset])
+        base = self.starts[offset]
+        rows = []
+        for i in range(offset, stop):
+            raw = block[self.starts[i] - base:self.ends[i] - base].decode('utf-8')
+            if self.format == 'csv':
+                values = next(csv.reader(io.StringIO(raw, newline='')), [])
+                rows.append(dict(zip(self.fieldnames, values)))
+            else:
+                rows.append(json.loads(raw))
+        return rows
+
+
+def _scan_flat_json(index: RowIndex, data) -> bool:
+    """
+    快速路径：顶层数组中都是平坦对象时，每个对象一次正则匹配
+
+    Returns:
+        文件结构不符合时返回 False（已记录的位置会被清空）
+    """
+    position = data.find(b'[') + 1
+    if position == 0 or data[:position - 1].strip():
+        return False
+    for match in FLAT_OBJECT_PATTERN.finditer(data, position):
+        # 对象之间只能有逗号和空白，否则说明匹配到了嵌套结构内部
+        if data[position:match.start()].strip(b' \t\r\n,'):
+            break
+        index.starts.append(match.start())
+        index.ends.append(match.end())
+        position = match.end()
+    else:
+        if data[position:].strip(b' \t\r\n,') == b']':
+            return True
+    del index.starts[:]
+    del index.ends[:]
+    return False
+
+
+def _scan_json(index: RowIndex, data):
+    """顶层数组中每个对象的起止位置"""
+    if _scan_flat_json(index, data):
+        return
+    depth = 0
+    start = 0
+    for match in JSON_TOKEN_PATTERN.finditer(data):
+        token = match.group()
+        if token in (b'{', b'['):
+            if depth == 1 and token == b'{':
+                start = match.start()
+            depth += 1
+        elif token in (b'}', b']'):
+            depth -= 1
+            if depth == 1 and token == b'}':
+                index.starts.append(start)
+                index.ends.append(match.end())
+
+
+def _scan_jsonl(index: RowIndex, f):
+    """每个非空行的起止位置"""
+    position = 0
+    for line in f:
+        if line.strip():
+            index.starts.append(position)
+            index.ends.append(position + len(line))
+        position += len(line)
+
+
+def _scan_csv(index: RowIndex, data):
+    """表头之后每条记录的起止位置（引号内的换行不算记录分隔）"""
+    header_end = None
+    start = 0
+    for match in CSV_TOKEN_PATTERN.finditer(data):
+        if match.group() != b'\n':
+            continue
+        end = match.end()
+        if header_end is None:
+            header_end = end
+            index.fieldnames = next(csv.reader([data[:end].decode('utf-8-sig')]), [])
+        elif data[start:end].strip():
+            index.starts.append(start)
+            index.ends.append(end)
+        start = end
+    if header_end is None:
+        # 只有表头且没有结尾换行
+        index.fieldnames = next(csv.reader([data[:].decode('utf-8-sig')]), [])
+    elif start < index.size and data[start:index.size].strip():
+        index.starts.append(start)
+        index.ends.append(index.size)
+
+
+def build_row_index(path: str) -> RowIndex:
+    """扫描文件建立行索引（通过 mmap 在 C 层匹配记号，不把文件读入内存）"""
+    stat = os.stat(path)
+    fmt = os.path.splitext(path)[1][1:].lower()
+    if fmt not in ('json', 'jsonl', 'csv'):
+        raise ValueError(f"不支持的文件格式: {path}")
+    index = RowIndex(path, fmt, stat.st_mtime_ns, stat.st_size)
+    if not stat.st_size:
+        return index
+    with open(path, 'rb') as f:
+        if fmt == 'jsonl':
+            _scan_jsonl(index, f)
+            return index
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if fmt == 'json':
+                _scan_json(index, data)
+            else:
+                _scan_csv(index, data)
+    return index
+
+
+_cache: 'OrderedDict[str, RowIndex]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_row_index(path: str) -> RowIndex:
+    """返回文件的行索引；文件的 mtime 或大小变化时重建"""
+    stat = os.stat(path)
+    with _cache_lock:
+        index = _cache.get(path)
+        if index and index.mtime_ns == stat.st_mtime_ns and index.size == stat.st_size:
+            _cache.move_to_end(path)
+            return index
+    index = build_row_index(path)
+    with _cache_lock:
+        _cache[path] = index
+        _cache.move_to_end(path)
+        while len(_cache) > INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史记录索引
+在 data/.index/history.json 中维护每个导出文件的元数据（用户名、推文数、时间范围、格式），
+爬虫写文件时直接更新索引；目录有变化（目录 mtime 改变）或每隔 rescan_interval 秒才重新 stat 各文件，
+/api/history 按页从内存中的有序列表取数据，不再每次 listdir + stat 全部文件。
+数据库、检查点和驱动缓存等运行状态都在子目录（data/.state、data/checkpoints）中，
+它们的临时文件不改变 data 目录本身的 mtime，只有导出文件的增删才会触发重新扫描
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tweet_sinks import iter_output_records
+
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_PATH = os.path.join('.index', 'history.json')
+
+EXPORT_EXTENSIONS = ('.json', '.jsonl', '.csv')
+
+# 导出文件名：用户名_YYYYMMDD_HHMMSS.格式
+EXPORT_FILENAME_PATTERN = re.compile(r'^(.+)_\d{8}_\d{6}\.(json|jsonl|csv)$')
+
+
+def summarize_tweets(tweets: Iterable[Dict]) -> Dict:
+    """推文数和时间范围"""
+    count = 0
+    oldest = newest = ''
+    for tweet in tweets:
+        count += 1
+        timestamp = tweet.get('timestamp') or ''
+        if timestamp:
+            if not oldest or timestamp < oldest:
+                oldest = timestamp
+            if timestamp > newest:
+                newest = timestamp
+    return {'count': count, 'oldest': oldest or None, 'newest': newest or None}
+
+
+class HistoryIndex:
+    """单个 data 目录的历史记录索引（线程安全；多个进程通过索引文件的 mtime 感知彼此的更新）"""
+
+    def __init__(self, data_dir: str, rescan_interval: float = 60):
+        """
+        Args:
+            data_dir: 导出文件目录
+            rescan_interval: 目录没有变化时，多久做一次完整的 mtime 扫描（发现被原地修改的文件）
+        """
+        self.data_dir = data_dir
+        self.index_path = os.path.join(data_dir, INDEX_PATH)
+        self.rescan_interval = rescan_interval
+        self._entries: Dict[str, Dict] = {}
+        self._sorted: Optional[List[Dict]] = None  # 按修改时间排序（最新的在前）
+        self._by_username: Dict[str, List[Dict]] = {}
+        self._dir_mtime = None
+        self._index_mtime = None
+        self._last_scan = 0.0
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            self._index_mtime = os.stat(self.index_path).st_mtime_ns
+        except (OSError, ValueError):
+            return
+        self._entries = {entry['name']: entry for entry in entries}
+        self._invalidate()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self._entries.values()), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        self._index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def _invalidate(self):
+        self._sorted = None
+        self._by_username = {}
+
+    def _describe(self, name: str, stat: os.stat_result, tweets: Optional[Iterable[Dict]] = None) -> Dict:
+        """生成一个文件的元数据；没有传入推文时读取文件统计"""
+        match = EXPORT_FILENAME_PATTERN.match(name)
+        fmt = os.path.splitext(name)[1][1:]
+        entry = {
+            'name': name,
+            'type': fmt.upper(),
+            'format': fmt,
+            'username': match.group(1) if match else None,
+            'size': stat.st_size,
+            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            'mtime_ns': stat.st_mtime_ns,
+            'count': None,
+            'oldest': None,
+            'newest': None
+        }
+        try:
+            records = tweets if tweets is not None else iter_output_records(os.path.join(self.data_dir, name))
+            entry.update(summarize_tweets(records))
+        except (OSError, ValueError):
+            pass
+        return entry
+
+    def record(self, path: str, tweets: Optional[Iterable[Dict]] = None):
+        """
+        写入导出文件后更新索引
+
+        Args:
+            path: 导出文件路径
+            tweets: 文件中的推文（已在内存中时传入，省去重新读取文件）
+        """
+        name = os.path.basename(path)
+        stat = os.stat(path)
+        with self._lock:
+            self._reload_if_changed()
+            self._entries[name] = self._describe(name, stat, tweets)
+            self._invalidate()
+            self._save()
+            # 新文件已直接记入索引，不必因为目录 mtime 变化再全量扫描（其他改动由定期扫描发现）
+            if self._dir_mtime is not None:
+                self._dir_mtime = os.stat(self.data_dir).st_mtime_ns
+
+    def _reload_if_changed(self):
+        """其他进程更新了索引文件时重新读取"""
+        try:
+            index_mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            return
+        if index_mtime != self._index_mtime:
+            self._load()
+
+    def refresh(self, force: bool = False):
+        """目录有变化或到了定期扫描时间时，同步新增、删除和被修改的文件"""
+        with self._lock:
+            self._reload_if_changed()
+            try:
+                dir_mtime = os.stat(self.data_dir).st_mtime_ns
+            except OSError:
+                return
+            now = time.monotonic()
+            if not force and dir_mtime == self._dir_mtime and now - self._last_scan < self.rescan_interval:
+                return
+            self._dir_mtime = dir_mtime
+            self._last_scan = now
+
+            changed = False
+            present = set()
+            for name in os.listdir(self.data_dir):
+                if not name.endswith(EXPORT_EXTENSIONS):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.data_dir, name))
+                except OSError:
+                    continue
+                present.add(name)
+                entry = self._entries.get(name)
+                if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                    self._entries[name] = self._describe(name, stat)
+                    changed = True
+            for name in set(self._entries) - present:
+                del self._entries[name]
+                changed = True
+            if changed:
+                self._invalidate()
+                self._save()
+
+    def query(self, username: Optional[str] = None, offset: int = 0,
+              limit: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """
+        按修改时间倒序分页返回文件元数据
+
+        Returns:
+            (本页文件, 符合条件的文件总数)
+        """
+        self.refresh()
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._entries.values(), key=lambda e: e['mtime_ns'], reverse=True)
+            entries = self._sorted
+            if username:
+                key = username.lower()
+                if key not in self._by_username:
+                    self._by_username[key] = [e for e in self._sorted if (e['username'] or '').lower() == key]
+                entries = self._by_username[key]
+            stop = None if limit is None else offset + limit
+            return [dict(e) for e in entries[offset:stop]], len(entries)
+
+    def usernames(self) -> List[str]:
+        """索引中出现过的用户名"""
+        self.refresh()
+        with self._lock:
+            return sorted({e['username'] for e in self._entries.values() if e['username']}, key=str.lower)
+
+
+_indexes: Dict[str, HistoryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_history_index(data_dir: str) -> HistoryIndex:
+    """同一进程中每个 data 目录共用一个索引实例"""
+    data_dir = os.path.abspath(data_dir)
+    with _indexes_lock:
+        if data_dir not in _indexes:
+            _indexes[data_dir] = HistoryIndex(data_dir)
+        return _indexes[data_dir]
+
+
+def record_export(path: str, tweets: Optional[Iterable[Dict]] = None):
+    """导出文件写入后调用，更新所在目录的历史记录索引（失败不影响导出本身）"""
+    try:
+        get_history_index(os.path.dirname(os.path.abspath(path))).record(path, tweets)
+    except (OSError, ValueError) as e:
+        logger.warning("更新历史记录索引失败: %s", e)
@@ -0,0 +1,750 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取任务管理
+每个任务拥有独立的 TwitterScraper、状态、暂停/取消标志和结果，
+由有界线程池并发执行（playwright 引擎由一个事件循环并发执行），超出并发上限的任务排队等待；
+多进程部署时通过共享任务状态（job_state.SharedJobState）查询和控制其他进程中的任务
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import functools
+import threading
+from datetime import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from twitter_scraper import TwitterScraper
+from async_scraper import ENGINES, AsyncTwitterScraper, BrowserHost, EventLoopThread, require_playwright
+from scrape_metrics import MetricsRegistry, attempt_samples
+
+
+# 任务状态
+STATE_QUEUED = 'queued'
+STATE_RUNNING = 'running'
+STATE_COMPLETED = 'completed'
+STATE_FAILED = 'failed'
+STATE_CANCELLED = 'cancelled'
+
+FINISHED_STATES = (STATE_COMPLETED, STATE_FAILED, STATE_CANCELLED)
+
+# 流式输出时保存格式对应的文件格式（store 只写入推文库，不生成文件）
+STREAM_FORMATS = {'json': ['jsonl'], 'csv': ['csv'], 'both': ['jsonl', 'csv'], 'store': []}
+
+
+# 每个任务保留的最近事件数（状态变化和新推文），SSE 连接落后更多时只会丢失较早的推文事件
+JOB_EVENT_HISTORY = 500
+
+# 读取其他进程中任务的事件 / 状态时的轮询间隔（秒）
+REMOTE_POLL_INTERVAL = 0.5
+
+
+class QueueFullError(Exception):
+    """排队任务数已达上限"""
+
+
+class JobEvents:
+    """
+    任务的事件序列
+
+    状态变化（'status'）和新收集的推文（'tweet'）按递增 ID 追加，
+    SSE 连接用上次收到的事件 ID 阻塞等待后续事件，没有变化时不产生任何请求或序列化
+    """
+
+    def __init__(self, max_events: int = JOB_EVENT_HISTORY):
+        self._events = deque(maxlen=max_events)
+        self._condition = threading.Condition()
+        self.last_id = 0
+
+    def publish(self, event: str, data: Dict) -> int:
+        """追加一个事件并唤醒等待中的连接，返回事件 ID"""
+        with self._condition:
+            self.last_id += 1
+            self._events.append((self.last_id, event, data))
+            self._condition.notify_all()
+            return self.last_id
+
+    def since(self, last_id: int, timeout: Optional[float] = None) -> List[Tuple[int, str, Dict]]:
+        """返回 ID 大于 last_id 的事件；暂时没有时最多等待 timeout 秒，超时返回空列表"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.last_id > last_id, timeout)
+            return [item for item in self._events if item[0] > last_id]
+
+
+class ScrapeJob:
+    """单个爬取任务"""
+
+    def __init__(self, username: str, max_tweets: int, headless: bool = True,
+                 save_format: str = 'json', capture_network: bool = False,
+                 retries: int = 0, batch_id: Optional[str] = None, stream: bool = False,
+                 resume: bool = False, since_last_run: bool = False, state=None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.username = username
+        self.max_tweets = max_tweets
+        self.headless = headless
+        self.save_format = save_format
+        self.capture_network = capture_network
+        self.retries = retries
+        self.batch_id = batch_id
+        self.resume = resume  # 从该用户上次未完成的检查点继续
+        self.since_last_run = since_last_run  # 增量爬取：只收集上次保存的最新推文之后的推文
+        self.stream = stream or resume  # 边爬取边写入 JSON Lines / CSV 文件（断点续爬依赖流式输出）
+        self.done = threading.Event()  # 任务结束（成功、失败或取消）时置位
+        self.events = JobEvents()  # 状态变化和新推文，供 /api/events 推送
+        self.state = state  # 共享任务状态，多进程部署时其他进程从中读取状态和事件
+        self._published_status = None
+
+        # 状态字段与原有 /api/status 返回的结构保持一致，另加 job_id、state 等
+        self.status = {
+            'job_id': self.job_id,
+            'state': STATE_QUEUED,
+            'is_running': True,
+            'is_paused': False,
+            'is_cancelled': False,
+            'progress': 0,
+            'current_tweets': 0,
+            'target_tweets': max_tweets,
+            'status_message': '排队中...',
+            'username': username,
+            'error': None,
+            'output_files': [],
+            'scan_stats': {},
+            'store_added': 0,
+            'metrics': None,  # 最近一次尝试的分阶段耗时和计数（ScrapeMetrics.as_dict()）
+            'attempts': 0,
+            'batch_id': batch_id,
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None
+        }
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status['state'] in FINISHED_STATES
+
+    def snapshot(self) -> Dict:
+        """返回状态的副本，供 API 序列化"""
+        status = dict(self.status)
+        status['output_files'] = list(status['output_files'])
+        status['scan_stats'] = dict(status['scan_stats'])
+        return status
+
+    def control(self):
+        """控制回调：返回 (is_paused, is_cancelled)；有共享状态时同步其他进程设置的标志"""
+        if self.state is not None:
+            is_paused, is_cancelled = self.state.get_control(self.job_id)
+            if is_cancelled and not self.status['is_cancelled']:
+                self.status['is_cancelled'] = True
+                self.status['status_message'] = '正在取消任务...'
+                self.publish_status()
+            elif is_paused != self.status['is_paused']:
+                self.status['is_paused'] = is_paused
+                self.status['status_message'] = '已暂停' if is_paused else '继续爬取中...'
+                self.publish_status()
+        return self.status['is_paused'], self.status['is_cancelled']
+
+    def publish_status(self):
+        """状态与上次推送的不同时发布一个 status 事件"""
+        status = self.snapshot()
+        if status != self._published_status:
+            self._published_status = status
+            if self.state is not None:
+                self.state.save_status(self.job_id, status)
+            self._publish('status', status)
+
+    def publish_tweet(self, tweet: Dict):
+        """推文回调：发布新收集到的推文"""
+        self._publish('tweet', tweet)
+
+    def _publish(self, event: str, data: Dict):
+        event_id = self.events.publish(event, data)
+        if self.state is not None:
+            self.state.add_event(self.job_id, event_id, event, data)
+            if event_id % JOB_EVENT_HISTORY == 0:
+                self.state.trim_events(self.job_id, event_id - JOB_EVENT_HISTORY)
+
+
+class RemoteEvents:
+    """其他进程中任务的事件序列，接口与 JobEvents 相同，从共享任务状态轮询"""
+
+    def __init__(self, state, job_id: str):
+        self.state = state
+        self.job_id = job_id
+
+    def since(self, last_id: int, timeout: Optional[float] = None) -> List[Tuple[int, str, Dict]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            events = self.state.events_since(self.job_id, last_id)
+            if events or (deadline is not None and time.monotonic() >= deadline):
+                return events
+            remaining = REMOTE_POLL_INTERVAL if deadline is None else deadline - time.monotonic()
+            time.sleep(max(0, min(REMOTE_POLL_INTERVAL, remaining)))
+
+
+class RemoteDone:
+    """其他进程中任务的结束标志，接口与 threading.Event 的 is_set() / wait() 相同"""
+
+    def __init__(self, job: 'RemoteJob'):
+        self.job = job
+
+    def is_set(self) -> bool:
+        return self.job.is_finished
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(REMOTE_POLL_INTERVAL)
+        return True
+
+
+class RemoteJob:
+    """
+    由其他工作进程执行的任务
+
+    每次访问 status 都从共享任务状态读取；暂停 / 取消通过共享标志传给执行任务的进程。
+    执行任务的进程已退出而任务未结束时视为失败
+    """
+
+    def __init__(self, state, record: Dict):
+        self.state = state
+        self.job_id = record['job_id']
+        self.batch_id = record['batch_id']
+        self.owner_pid = record['owner_pid']
+        self.username = record['status']['username']
+        self.events = RemoteEvents(state, self.job_id)
+        self.done = RemoteDone(self)
+        self._record = record
+
+    @property
+    def status(self) -> Dict:
+        record = self.state.load_job(self.job_id) or self._record
+        self._record = record
+        status = dict(record['status'])
+        status['is_paused'] = record['is_paused']
+        status['is_cancelled'] = status['is_cancelled'] or record['is_cancelled']
+        if status['state'] not in FINISHED_STATES and not _process_alive(self.owner_pid):
+            status.update(state=STATE_FAILED, is_running=False, error='执行该任务的进程已退出',
+                          status_message='执行该任务的进程已退出')
+        return status
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status['state'] in FINISHED_STATES
+
+    def snapshot(self) -> Dict:
+        return self.status
+
+
+def _process_alive(pid: int) -> bool:
+    """同一台机器上的进程是否仍在运行"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class ScrapeBatch:
+    """一批账号的爬取任务，每个账号对应一个 ScrapeJob"""
+
+    def __init__(self, jobs: List[ScrapeJob], batch_id: str):
+        self.batch_id = batch_id
+        self.jobs = jobs
+        self.created_at = datetime.now().isoformat()
+
+    @property
+    def is_finished(self) -> bool:
+        return all(job.is_finished for job in self.jobs)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待批次中所有任务结束，超时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in self.jobs:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            if not job.done.wait(remaining):
+                return False
+        return True
+
+    def summary(self) -> Dict:
+        """汇总批次结果：各状态的任务数、推文总数和每个账号的结果"""
+        counts = {state: 0 for state in (STATE_QUEUED, STATE_RUNNING) + FINISHED_STATES}
+        accounts = []
+        for job in self.jobs:
+            status = job.snapshot()
+            counts[status['state']] += 1
+            accounts.append({
+                'job_id': job.job_id,
+                'username': job.username,
+                'state': status['state'],
+                'tweets': status['current_tweets'] if status['state'] == STATE_COMPLETED else 0,
+                'attempts': status['attempts'],
+                'error': status['error'],
+                'output_files': [f['name'] for f in status['output_files']],
+                'metrics': status.get('metrics'),
+                'started_at': status['started_at'],
+                'finished_at': status['finished_at']
+            })
+        return {
+            'batch_id': self.batch_id,
+            'created_at': self.created_at,
+            'is_finished': self.is_finished,
+            'total': len(self.jobs),
+            'counts': counts,
+            'total_tweets': sum(a['tweets'] for a in accounts),
+            'accounts': accounts
+        }
+
+
+class JobManager:
+    """
+    任务管理器
+
+    - submit() 创建任务并交给线程池，最多 max_workers 个任务同时运行
+    - submit_batch() 为一批账号各创建一个任务，失败的账号按 retries 重试
+    - pause() / resume() / cancel() 按 job_id 控制单个任务
+    - 只保留最近 history_limit 个已结束的任务（批次自身持有其任务，不受影响）
+    """
+
+    def __init__(self, max_workers: int = 3, max_queued: int = 100, history_limit: int = 200,
+                 driver_pool=None, max_batch_size: int = 5000, retry_delay: float = 10,
+                 scraper_options: Optional[Dict] = None, store=None, state=None, engine: str = 'selenium'):
+        """
+        Args:
+            max_workers: 最大并发任务数
+            max_queued: 最多排队（尚未开始）的单个任务数，批次任务不计入
+            history_limit: 保留的已结束任务数
+            driver_pool: 浏览器驱动池，传给每个任务的 TwitterScraper
+            max_batch_size: 单个批次最多包含的账号数
+            retry_delay: 重试前的等待时间（秒），第 n 次重试等待 n 倍
+            scraper_options: 传给每个 TwitterScraper 的其他参数（等待模式等）
+            store: TweetStore 推文库，所有任务的推文都写入其中；save_format='store' 时只写入推文库
+            state: SharedJobState 共享任务状态，多进程部署时让各进程看到彼此的任务；
+                   任务仍在提交它的进程中执行，并发上限和排队上限按进程计算
+            engine: 爬取引擎，'selenium' 每个运行中的任务占用一个线程和一个 Chrome；
+                    'playwright' 所有任务在一个事件循环中运行，共享一个 Chromium，每个任务一个浏览器上下文
+                    （不使用 driver_pool，max_workers 为同时打开的上下文数）
+        """
+        if engine not in ENGINES:
+            raise ValueError(f'不支持的爬取引擎: {engine}')
+        if engine == 'playwright':
+            require_playwright()
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.history_limit = history_limit
+        self.driver_pool = driver_pool
+        self.max_batch_size = max_batch_size
+        self.retry_delay = retry_delay
+        self.scraper_options = scraper_options or {}
+        self.store = store
+        self.state = state
+        self.engine = engine
+        self.metrics = MetricsRegistry()  # 所有任务的累计计数器（有共享状态时写入共享状态）
+        self._executor = None
+        self._loop = None
+        if engine == 'playwright':
+            self._loop = EventLoopThread(max_workers)
+            self._browser_host = BrowserHost()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self._jobs: 'OrderedDict[str, ScrapeJob]' = OrderedDict()
+        self._batches: 'OrderedDict[str, ScrapeBatch]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, username: str, max_tweets: int, headless: bool = True,
+               save_format: str = 'json', capture_network: bool = False, retries: int = 0,
+               stream: bool = False, resume: bool = False, since_last_run: bool = False) -> ScrapeJob:
+        """创建并提交一个爬取任务"""
+        self._check_format(save_format)
+        job = ScrapeJob(username, max_tweets, headless, save_format, capture_network, retries,
+                        stream=stream, resume=resume, since_last_run=since_last_run, state=self.state)
+        with self._lock:
+            queued = sum(1 for j in self._jobs.values()
+                         if j.status['state'] == STATE_QUEUED and j.batch_id is None)
+            if queued >= self.max_queued:
+                raise QueueFullError(f'排队任务已达上限 {self.max_queued}')
+            self._jobs[job.job_id] = job
+            self._prune()
+        if self.state is not None:
+            self.state.add_job(job.job_id, job.snapshot())
+        self._start(job)
+        return job
+
+    def submit_batch(self, usernames: List[str], max_tweets: int, headless: bool = True,
+                     save_format: str = 'json', capture_network: bool = False, retries: int = 1,
+                     stream: bool = False, resume: bool = False,
+                     since_last_run: bool = False) -> ScrapeBatch:
+        """为一批账号创建爬取任务，按提交顺序排队执行"""
+        self._check_format(save_format)
+        if len(usernames) > self.max_batch_size:
+            raise QueueFullError(f'批次账号数 {len(usernames)} 超过上限 {self.max_batch_size}')
+        batch_id = uuid.uuid4().hex[:12]
+        jobs = [ScrapeJob(username, max_tweets, headless, save_format, capture_network, retries, batch_id,
+                          stream, resume, since_last_run, state=self.state)
+                for username in usernames]
+        batch = ScrapeBatch(jobs, batch_id)
+        with self._lock:
+            for job in jobs:
+                self._jobs[job.job_id] = job
+            self._batches[batch_id] = batch
+            self._prune()
+        if self.state is not None:
+            self.state.add_batch(batch_id, batch.created_at)
+            for job in jobs:
+                self.state.add_job(job.job_id, job.snapshot(), batch_id)
+        for job in jobs:
+            self._start(job)
+        return batch
+
+    def _start(self, job: ScrapeJob):
+        """交给线程池或事件循环执行，超出并发上限时排队"""
+        if self._loop is not None:
+            self._loop.submit(self._run_async, job)
+        else:
+            self._executor.submit(self._run, job)
+
+    def _check_format(self, save_format: str):
+        if save_format not in STREAM_FORMATS:
+            raise ValueError(f'不支持的保存格式: {save_format}')
+        if save_format == 'store' and self.store is None:
+            raise ValueError('未启用推文库，不能只保存到推文库')
+
+    def get_batch(self, batch_id: str) -> Optional[ScrapeBatch]:
+        with self._lock:
+            batch = self._batches.get(batch_id)
+        if batch is not None or self.state is None:
+            return batch
+        found = self.state.batch_jobs(batch_id)
+        if found is None:
+            return None
+        created_at, records = found
+        batch = ScrapeBatch([self._job_from_record(record) for record in records], batch_id)
+        batch.created_at = created_at
+        return batch
+
+    def cancel_batch(self, batch: ScrapeBatch):
+        """取消批次中所有未结束的任务"""
+        for job in batch.jobs:
+            if not job.is_finished:
+                self.cancel(job)
+
+    def get(self, job_id: Optional[str] = None) -> Optional[ScrapeJob]:
+        """按 job_id 获取任务；不指定时返回最近提交的任务（有共享状态时包括其他进程的任务）"""
+        if self.state is not None:
+            record = self.state.load_job(job_id)
+            return self._job_from_record(record) if record else None
+        with self._lock:
+            if job_id is None:
+                return next(reversed(self._jobs.values()), None)
+            return self._jobs.get(job_id)
+
+    def _job_from_record(self, record: Dict):
+        """共享状态中的任务：本进程执行的返回 ScrapeJob，其他进程的返回 RemoteJob"""
+        with self._lock:
+            job = self._jobs.get(record['job_id'])
+        return job if job is not None else RemoteJob(self.state, record)
+
+    def list_jobs(self) -> List[ScrapeJob]:
+        """返回所有任务（最新的在前）"""
+        if self.state is not None:
+            return [self._job_from_record(record) for record in self.state.list_jobs()]
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def active_count(self) -> int:
+        """运行中和排队中的任务数"""
+        if self.state is not None:
+            return sum(1 for j in self.list_jobs() if not j.is_finished)
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.is_finished)
+
+    def pause(self, job: ScrapeJob):
+        self._control(job, '已暂停', is_paused=True)
+
+    def resume(self, job: ScrapeJob):
+        self._control(job, '继续爬取中...', is_paused=False)
+
+    def cancel(self, job: ScrapeJob):
+        self._control(job, '正在取消任务...', is_cancelled=True)
+
+    def _control(self, job, message: str, is_paused: Optional[bool] = None, is_cancelled: bool = False):
+        """设置暂停 / 取消标志；其他进程的任务只写共享标志，由执行它的进程在下一次控制检查时读取"""
+        if self.state is not None:
+            self.state.set_control(job.job_id, paused=is_paused, cancelled=is_cancelled)
+        if isinstance(job, RemoteJob):
+            return
+        if is_paused is not None:
+            job.status['is_paused'] = is_paused
+        if is_cancelled:
+            job.status['is_cancelled'] = True
+        job.status['status_message'] = message
+        job.publish_status()
+
+    def shutdown(self):
+        """取消所有未结束的任务并等待线程池退出"""
+        for job in self.list_jobs():
+            if not job.is_finished:
+                self.cancel(job)
+        if self._loop is not None:
+            self._loop.close(wait=True, before_stop=self._browser_host.close())
+        else:
+            self._executor.shutdown(wait=True)
+
+    def _prune(self):
+        """删除超出保留数量的最早的已结束任务和批次"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
+        finished = [batch_id for batch_id, batch in self._batches.items() if batch.is_finished]
+        for batch_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._batches[batch_id]
+        if self.state is not None:
+            self.state.prune(self.history_limit)
+
+    def record_metrics(self, samples: Dict):
+        """累加计数器；有共享状态时写入共享状态，所有进程的任务合计"""
+        if self.state is not None:
+            self.state.add_metrics(samples)
+        else:
+            self.metrics.add(samples)
+
+    def metric_values(self) -> Dict:
+        """累计计数器的当前值"""
+        if self.state is not None:
+            return self.state.load_metrics()
+        return self.metrics.values()
+
+    def _finish(self, job: ScrapeJob, state: str):
+        job.status['state'] = state
+        job.status['is_running'] = False
+        job.status['finished_at'] = datetime.now().isoformat()
+        self.record_metrics({('jobs_total', (('state', state),)): 1})
+        # 最终状态先于 done 发布，等待 done 的 SSE 连接不会漏掉它
+        job.publish_status()
+        job.done.set()
+
+    def _run(self, job: ScrapeJob):
+        """在工作线程中执行一个爬取任务，失败时按 job.retries 重试"""
+        if not self._begin_job(job):
+            return
+
+        state = STATE_FAILED
+        for attempt in range(job.retries + 1):
+            if attempt and not self._wait_unless_cancelled(job, self._retry_delay(job, attempt)):
+                state = STATE_CANCELLED
+                break
+            self._begin_attempt(job, attempt)
+            # 流式输出时，重试从上一次尝试的检查点继续
+            state = self._scrape_once(job, resume=job.resume or (job.stream and attempt > 0))
+            if state != STATE_FAILED:
+                break
+
+        self._finish(job, state)
+
+    async def _run_async(self, job: ScrapeJob):
+        """
+        在事件循环中执行一个爬取任务（playwright 引擎），重试规则与 _run 相同；
+        发布状态（有共享状态时写 SQLite）和记录计数器在线程池中进行，不阻塞事件循环
+        """
+        loop = asyncio.get_event_loop()
+        if not await loop.run_in_executor(None, self._begin_job, job):
+            return
+
+        state = STATE_FAILED
+        for attempt in range(job.retries + 1):
+            if attempt:
+                delay = await loop.run_in_executor(None, self._retry_delay, job, attempt)
+                if not await self._wait_unless_cancelled_async(job, delay):
+                    state = STATE_CANCELLED
+                    break
+            self._begin_attempt(job, attempt)
+            state = await self._scrape_once_async(job, resume=job.resume or (job.stream and attempt > 0))
+            if state != STATE_FAILED:
+                break
+
+        await loop.run_in_executor(None, self._finish, job, state)
+
+    def _begin_job(self, job: ScrapeJob) -> bool:
+        """任务开始运行；排队期间已被取消时直接结束并返回 False"""
+        status = job.status
+        if job.control()[1]:
+            status['error'] = '任务已取消'
+            status['status_message'] = '任务已取消'
+            self._finish(job, STATE_CANCELLED)
+            return False
+
+        status['state'] = STATE_RUNNING
+        status['started_at'] = datetime.now().isoformat()
+        job.publish_status()
+        return True
+
+    def _retry_delay(self, job: ScrapeJob, attempt: int) -> float:
+        delay = self.retry_delay * attempt
+        job.status['status_message'] = f'第 {attempt} 次重试，{delay:.0f} 秒后开始...'
+        job.publish_status()
+        return delay
+
+    @staticmethod
+    def _begin_attempt(job: ScrapeJob, attempt: int):
+        job.status['attempts'] = attempt + 1
+        job.status['error'] = None
+
+    @staticmethod
+    def _wait_unless_cancelled(job: ScrapeJob, delay: float) -> bool:
+        """等待 delay 秒，期间任务被取消则返回 False"""
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            if job.control()[1]:
+                return False
+            time.sleep(min(1, deadline - time.monotonic()))
+        return not job.control()[1]
+
+    @staticmethod
+    async def _wait_unless_cancelled_async(job: ScrapeJob, delay: float) -> bool:
+        """_wait_unless_cancelled 的协程版本，等待期间不占用线程（读取控制标志在线程池中进行）"""
+        loop = asyncio.get_event_loop()
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            if (await loop.run_in_executor(None, job.control))[1]:
+                return False
+            await asyncio.sleep(min(1, deadline - time.monotonic()))
+        return not (await loop.run_in_executor(None, job.control))[1]
+
+    def _scrape_once(self, job: ScrapeJob, resume: bool = False) -> str:
+        """执行一次爬取，返回结束状态"""
+        job.status['status_message'] = '正在初始化浏览器...'
+
+        scraper = None
+        state = STATE_FAILED
+        try:
+            scraper = self._create_scraper(job, TwitterScraper, driver_pool=self.driver_pool)
+            # 爬取推文
+            tweets = scraper.scrape_user_tweets(job.username, job.max_tweets, resume=resume,
+                                                since_last_run=job.since_last_run)
+            state = self._attempt_state(job, scraper, tweets)
+        except Exception as e:
+            job.status['error'] = str(e)
+            job.status['status_message'] = f'错误: {str(e)}'
+        finally:
+            # 出错时也要关闭（或归还）浏览器，避免驱动泄漏
+            if scraper:
+                scraper.close()
+                self._record_attempt(job, scraper)
+        return state
+
+    async def _scrape_once_async(self, job: ScrapeJob, resume: bool = False) -> str:
+        """执行一次爬取（playwright 引擎），返回结束状态；保存文件在线程池中进行，不阻塞事件循环"""
+        job.status['status_message'] = '正在初始化浏览器...'
+
+        loop = asyncio.get_event_loop()
+        scraper = None
+        state = STATE_FAILED
+        try:
+            scraper = await loop.run_in_executor(None, functools.partial(
+                self._create_scraper, job, AsyncTwitterScraper, browser_host=self._browser_host))
+            tweets = await scraper.scrape_user_tweets(job.username, job.max_tweets, resume=resume,
+                                                      since_last_run=job.since_last_run)
+            state = await loop.run_in_executor(None, self._attempt_state, job, scraper, tweets)
+        except Exception as e:
+            job.status['error'] = str(e)
+            job.status['status_message'] = f'错误: {str(e)}'
+        finally:
+            if scraper:
+                await scraper.close()
+                await loop.run_in_executor(None, self._record_attempt, job, scraper)
+        return state
+
+    def _create_scraper(self, job: ScrapeJob, scraper_class, **engine_options):
+        """创建爬虫实例，传入进度回调、控制检查函数和推文回调"""
+        status = job.status
+
+        # 自定义进度回调
+        def update_progress(current, total, message):
+            status['current_tweets'] = current
+            status['target_tweets'] = total
+            status['progress'] = int((current / total) * 100) if total > 0 else 0
+            status['status_message'] = message
+            # 增量扫描计数：已提取 / 已跳过的推文元素
+            status['scan_stats'] = dict(scraper.scan_stats)
+            job.publish_status()
+
+        options = dict(self.scraper_options)
+        if job.stream:
+            options['stream_formats'] = STREAM_FORMATS[job.save_format]
+        if job.save_format == 'store':
+            options['keep_in_memory'] = False
+        options.update(engine_options)
+
+        scraper = scraper_class(headless=job.headless, progress_callback=update_progress,
+                                control_callback=job.control, tweet_callback=job.publish_tweet,
+                                capture_network=job.capture_network, store=self.store, **options)
+
+        status['status_message'] = '正在爬取推文...'
+        job.publish_status()
+        return scraper
+
+    def _attempt_state(self, job: ScrapeJob, scraper, tweets: List) -> str:
+        """根据爬取结果保存文件、更新任务状态，返回本次尝试的结束状态"""
+        status = job.status
+        state = STATE_FAILED
+        status['store_added'] = scraper.store_added
+
+        if job.stream:
+            # 流式输出文件在取消或出错时也保留已收集的推文
+            status['output_files'] = [
+                {'type': os.path.splitext(path)[1][1:], 'path': path, 'name': os.path.basename(path)}
+                for path in scraper.stream_files
+            ]
+
+        # 检查是否被取消
+        if job.control()[1]:
+            status['error'] = '任务已取消'
+            status['status_message'] = '任务已取消'
+            state = STATE_CANCELLED
+        elif scraper.error is not None:
+            # 中途出错：流式输出和检查点保留已收集的推文，重试时从检查点继续
+            status['error'] = str(scraper.error) or type(scraper.error).__name__
+            status['status_message'] = f"错误: {status['error']}"
+        elif (job.stream or job.save_format == 'store') and scraper.tweets_collected:
+            status['current_tweets'] = scraper.tweets_collected
+            status['progress'] = 100
+            status['status_message'] = f'完成！成功爬取 {scraper.tweets_collected} 条推文'
+            state = STATE_COMPLETED
+        elif tweets:
+            status['status_message'] = '正在保存数据...'
+            status['current_tweets'] = len(tweets)
+            status['progress'] = 100
+
+            # 保存文件
+            output_files = []
+            if job.save_format in ['json', 'both']:
+                json_file = scraper.save_to_json()
+                output_files.append({'type': 'json', 'path': json_file, 'name': os.path.basename(json_file)})
+
+            if job.save_format in ['csv', 'both']:
+                csv_file = scraper.save_to_csv()
+                output_files.append({'type': 'csv', 'path': csv_file, 'name': os.path.basename(csv_file)})
+
+            status['output_files'] = output_files
+            status['status_message'] = f'完成！成功爬取 {len(tweets)} 条推文'
+            state = STATE_COMPLETED
+        elif scraper.reached_last_run:
+            status['current_tweets'] = 0
+            status['progress'] = 100
+            status['status_message'] = '完成！上次爬取之后没有新推文'
+            state = STATE_COMPLETED
+        else:
+            status['error'] = '未能爬取到任何推文'
+            status['status_message'] = '爬取失败'
+        return state
+
+    def _record_attempt(self, job: ScrapeJob, scraper):
+        job.status['metrics'] = scraper.metrics.as_dict()
+        self.record_metrics(attempt_samples(job.status['metrics']))
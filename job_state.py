@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享任务状态
+多进程部署（gunicorn 多个 worker）时，任务只在接收提交请求的进程中执行，
+状态、暂停/取消标志、进度事件和累计计数器写入同一个 SQLite 数据库，任何进程都能查询和控制任何任务
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# 与推文库一样放在 data/.state 中，每次写入状态时的 WAL 文件变化不影响历史记录索引
+DEFAULT_JOB_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', '.state', 'jobs.db')
+
+# 已结束的任务状态（与 job_manager 中的常量一致）
+FINISHED_STATES = ('completed', 'failed', 'cancelled')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    batch_id TEXT,
+    owner_pid INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    status TEXT NOT NULL,
+    is_paused INTEGER NOT NULL DEFAULT 0,
+    is_cancelled INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels)
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, event_id)
+) WITHOUT ROWID;
+"""
+
+
+class SharedJobState:
+    """
+    跨进程的任务状态
+
+    暂停 / 取消标志与状态分开存放：执行任务的进程只写状态，控制接口只写标志，互不覆盖；
+    每个线程使用自己的连接（WAL 模式）
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_STATE_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # ---------- 任务和批次 ----------
+
+    def add_job(self, job_id: str, status: Dict, batch_id: Optional[str] = None):
+        """登记由当前进程执行的任务"""
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO jobs (job_id, batch_id, owner_pid, state, status, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, batch_id, os.getpid(), status['state'], json.dumps(status, ensure_ascii=False),
+                 status['created_at'])
+            )
+
+    def add_batch(self, batch_id: str, created_at: str):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO batches (batch_id, created_at) VALUES (?, ?)',
+                         (batch_id, created_at))
+
+    def save_status(self, job_id: str, status: Dict):
+        """执行任务的进程写入最新状态"""
+        with self._connect() as conn:
+            conn.execute('UPDATE jobs SET state = ?, status = ? WHERE job_id = ?',
+                         (status['state'], json.dumps(status, ensure_ascii=False), job_id))
+
+    def set_control(self, job_id: str, paused: Optional[bool] = None, cancelled: Optional[bool] = None):
+        """任意进程设置暂停 / 取消标志"""
+        with self._connect() as conn:
+            if paused is not None:
+                conn.execute('UPDATE jobs SET is_paused = ? WHERE job_id = ?', (int(paused), job_id))
+            if cancelled:
+                conn.execute('UPDATE jobs SET is_cancelled = 1 WHERE job_id = ?', (job_id,))
+
+    def get_control(self, job_id: str) -> Tuple[bool, bool]:
+        """返回 (is_paused, is_cancelled)"""
+        row = self._connect().execute('SELECT is_paused, is_cancelled FROM jobs WHERE job_id = ?',
+                                      (job_id,)).fetchone()
+        if row is None:
+            return False, False
+        return bool(row['is_paused']), bool(row['is_cancelled'])
+
+    def load_job(self, job_id: Optional[str] = None) -> Optional[Dict]:
+        """按 job_id 读取任务；不指定时返回最近提交的任务"""
+        conn = self._connect()
+        if job_id is None:
+            row = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT 1').fetchone()
+        else:
+            row = conn.execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self) -> List[Dict]:
+        """所有任务（最新的在前）"""
+        rows = self._connect().execute('SELECT * FROM jobs ORDER BY created_at DESC').fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def batch_jobs(self, batch_id: str) -> Optional[Tuple[str, List[Dict]]]:
+        """返回 (批次创建时间, 按提交顺序排列的任务)，批次不存在时返回 None"""
+        conn = self._connect()
+        row = conn.execute('SELECT created_at FROM batches WHERE batch_id = ?', (batch_id,)).fetchone()
+        if row is None:
+            return None
+        rows = conn.execute('SELECT * FROM jobs WHERE batch_id = ? ORDER BY rowid', (batch_id,)).fetchall()
+        return row['created_at'], [self._row_to_job(r) for r in rows]
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict:
+        return {
+            'job_id': row['job_id'],
+            'batch_id': row['batch_id'],
+            'owner_pid': row['owner_pid'],
+            'status': json.loads(row['status']),
+            'is_paused': bool(row['is_paused']),
+            'is_cancelled': bool(row['is_cancelled'])
+        }
+
+    def prune(self, history_limit: int):
+        """删除超出保留数量的最早的已结束任务、它们的事件和已经没有任务的批次"""
+        placeholders = ','.join('?' * len(FINISHED_STATES))
+        with self._connect() as conn:
+            stale = [row['job_id'] for row in conn.execute(
+                f'SELECT job_id FROM jobs WHERE state IN ({placeholders}) ORDER BY created_at DESC LIMIT -1 OFFSET ?',
+                (*FINISHED_STATES, history_limit)
+            )]
+            conn.executemany('DELETE FROM jobs WHERE job_id = ?', [(job_id,) for job_id in stale])
+            conn.executemany('DELETE FROM job_events WHERE job_id = ?', [(job_id,) for job_id in stale])
+            if stale:
+                conn.execute('DELETE FROM batches WHERE batch_id NOT IN '
+                             '(SELECT batch_id FROM jobs WHERE batch_id IS NOT NULL)')
+
+    # ---------- 累计计数器（/api/metrics） ----------
+
+    def add_metrics(self, samples: Dict[Tuple, float]):
+        """累加计数器：samples 的键为 (指标名, ((标签, 值), ...))"""
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT INTO metrics (name, labels, value) VALUES (?, ?, ?) '
+                'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value',
+                [(name, json.dumps(labels), value) for (name, labels), value in samples.items()]
+            )
+
+    def load_metrics(self) -> Dict[Tuple, float]:
+        rows = self._connect().execute('SELECT name, labels, value FROM metrics').fetchall()
+        return {(row['name'], tuple(tuple(pair) for pair in json.loads(row['labels']))): row['value']
+                for row in rows}
+
+    # ---------- 进度事件 ----------
+
+    def add_event(self, job_id: str, event_id: int, event: str, data: Dict):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO job_events (job_id, event_id, event, data) VALUES (?, ?, ?, ?)',
+                         (job_id, event_id, event, json.dumps(data, ensure_ascii=False)))
+
+    def events_since(self, job_id: str, last_id: int) -> List[Tuple[int, str, Dict]]:
+        rows = self._connect().execute(
+            'SELECT event_id, event, data FROM job_events WHERE job_id = ? AND event_id > ? ORDER BY event_id',
+            (job_id, last_id)
+        ).fetchall()
+        return [(row['event_id'], row['event'], json.loads(row['data'])) for row in rows]
+
+    def trim_events(self, job_id: str, keep_after: int):
+        """只保留 ID 大于 keep_after 的事件"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM job_events WHERE job_id = ? AND event_id <= ?', (job_id, keep_after))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志配置
+各模块通过 logging.getLogger(__name__) 记录日志，由入口（Web 应用、命令行工具）调用 configure_logging
+设置级别和格式：text 为带时间和级别的单行文本，json 为每行一个 JSON 对象，
+附带用户名、轮次等结构化字段，便于在并发任务的日志中筛选
+"""
+
+import sys
+import json
+import logging
+from datetime import datetime
+from typing import Dict
+
+
+LOG_FORMATS = ('text', 'json')
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(context)s%(message)s'
+
+# LogRecord 自带的属性，其余属性都是通过 extra 传入的结构化字段
+STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'context'}
+
+
+class ContextAdapter(logging.LoggerAdapter):
+    """为每条日志附加固定的上下文字段（如用户名），并与单次调用传入的 extra 合并"""
+
+    def process(self, msg, kwargs):
+        kwargs['extra'] = {**self.extra, **kwargs.get('extra', {})}
+        return msg, kwargs
+
+
+def record_context(record: logging.LogRecord) -> Dict:
+    """日志记录中通过 extra 传入的字段"""
+    return {key: value for key, value in vars(record).items()
+            if key not in STANDARD_ATTRS and value is not None}
+
+
+class TextFormatter(logging.Formatter):
+    """单行文本，有用户名时在消息前加上 [@用户名]"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT, datefmt='%H:%M:%S')
+
+    def format(self, record: logging.LogRecord) -> str:
+        username = getattr(record, 'username', None)
+        record.context = f"[@{username}] " if username else ''
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """每行一个 JSON 对象：time、level、logger、message，加上 extra 中的结构化字段"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update(record_context(record))
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+_handler = None
+
+
+def configure_logging(level: str = 'INFO', fmt: str = 'text'):
+    """
+    配置根日志记录器（重复调用时替换之前安装的处理器）
+
+    Args:
+        level: 日志级别；DEBUG 输出每条推文和每次滚动，INFO 输出每轮摘要，WARNING 为安静模式
+        fmt: 'text' 或 'json'
+    """
+    global _handler
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"不支持的日志格式: {fmt}")
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+    root.addHandler(_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析流水线
+爬取线程每轮只取回原始数据（时间线 HTML 快照或网络响应）并提交给解析线程，随后立即滚动、等待下一批内容；
+解析在等待期间完成，爬取线程滚动结束后再按提交顺序取回结果，去重和写入输出仍在爬取线程中按轮次进行。
+待解析的数据有上限，解析跟不上时提交会阻塞（背压），内存不会随积压增长
+"""
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+
+class ParsePipeline:
+    """
+    有界的解析线程池
+
+    Args:
+        parse: 解析函数，在解析线程中以提交的原始数据调用（不能访问爬取线程的可变状态）
+        workers: 解析线程数
+        max_pending: 最多同时待解析（排队或解析中）的数据份数
+    """
+
+    def __init__(self, parse: Callable, workers: int = 1, max_pending: int = 2):
+        self._parse = parse
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='tweet-parser')
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.parse_seconds = 0.0  # 解析线程累计的解析耗时（与滚动、等待重叠）
+        self.submitted = 0
+
+    def submit(self, data) -> Future:
+        """提交一份原始数据，返回解析结果的 Future；待解析的数据已满时阻塞"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._run, data)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        self.submitted += 1
+        return future
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def _run(self, data):
+        start = time.perf_counter()
+        try:
+            return self._parse(data)
+        finally:
+            with self._lock:
+                self.parse_seconds += time.perf_counter() - start
+
+    def close(self, cancel: bool = False):
+        """关闭线程池；cancel 为 True 时丢弃尚未开始的解析（任务取消或出错时）"""
+        if cancel:
+            with self._lock:
+                pending = list(self._pending)
+            for future in pending:
+                future.cancel()
+        self._executor.shutdown(wait=not cancel)
@@ -33,5 +33,6 @@ fi
 echo "✅ 环境检查完成"
 echo
 
-# 运行主程序
-python3 twitter_scraper.py
+# 启动 Web 服务（生产模式）；命令行交互式爬取请运行 python3 twitter_scraper.py
+python3 -c "import flask" 2>/dev/null || python3 -m pip install -r requirements.txt
+python3 serve.py "$@"
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取计时与计数
+ScrapeMetrics 记录单次爬取各阶段的耗时（驱动准备、页面加载、等待、滚动、提取、处理、保存）和计数
+（滚动轮数、扫描 / 新增元素、重复推文），MetricsRegistry 把所有任务的结果累加为进程级计数器，
+由 /api/metrics 以 Prometheus 文本格式输出
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# 阶段：计时按"自身时间"统计，嵌套阶段（如滚动中的等待）的时间只计入内层阶段，各阶段之和不超过总耗时
+PHASES = ('driver_setup', 'page_load', 'wait', 'scroll', 'extract', 'process', 'save', 'paused')
+
+# 不算作工作时间的阶段
+IDLE_PHASES = ('wait', 'paused')
+
+METRIC_PREFIX = 'twitter_scraper_'
+
+# 计数器说明：(名称, 类型, 说明)
+METRIC_HELP = {
+    'jobs_total': ('counter', '结束的爬取任务数（按结束状态）'),
+    'attempts_total': ('counter', '爬取尝试次数（含重试）'),
+    'run_seconds_total': ('counter', '爬取尝试的总耗时（秒）'),
+    'phase_seconds_total': ('counter', '各阶段耗时（秒，嵌套阶段只计入内层）'),
+    'phase_calls_total': ('counter', '各阶段的执行次数'),
+    'tweets_collected_total': ('counter', '收集到的新推文数'),
+    'tweets_seen_total': ('counter', '提取到的有正文的推文数（含重复）'),
+    'tweets_duplicate_total': ('counter', '重复的推文数（本次已收集过或检查点中已有）'),
+    'elements_scanned_total': ('counter', '扫描的推文元素数'),
+    'elements_skipped_total': ('counter', '跳过的已处理推文元素数'),
+    'elements_extracted_total': ('counter', '实际提取的推文元素数'),
+    'rounds_total': ('counter', '爬取轮数'),
+    'scrolls_total': ('counter', '滚动次数'),
+    'browser_transfer_bytes_total': ('counter', '页面下载的字节数（Resource Timing，跨域资源可能计为 0）'),
+    'browser_requests_total': ('counter', '页面发出的请求数'),
+    'parse_ms_total': ('counter', '解析线程的解析耗时（毫秒，流水线模式和异步引擎，与其他阶段重叠）'),
+    'jobs_active': ('gauge', '运行中和排队中的任务数'),
+    'driver_pool': ('gauge', '浏览器驱动池统计'),
+}
+
+
+class ScrapeMetrics:
+    """单次爬取的分阶段计时器和计数器（在爬取线程中使用，不需要加锁）"""
+
+    def __init__(self):
+        self.phase_seconds: Dict[str, float] = {}
+        self.phase_calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.browser: Dict = {}  # 爬取结束时页面的资源用量（browser_profile.resource_usage）
+        self.started_at: Optional[float] = None
+        self.last_activity: Optional[float] = None
+        self._stack: List[list] = []  # [阶段, 开始时间, 内层阶段耗时]
+
+    def start(self):
+        """开始计时（总耗时从这里算起）"""
+        self.started_at = self.last_activity = time.perf_counter()
+
+    @contextmanager
+    def timer(self, phase: str):
+        """统计代码块的耗时；嵌套时外层阶段不包含内层阶段的时间"""
+        frame = [phase, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._stack.pop()
+            elapsed = now - frame[1]
+            self.add_time(phase, elapsed - frame[2])
+            if self._stack:
+                self._stack[-1][2] += elapsed
+            self.last_activity = now
+
+    def add_time(self, phase: str, seconds: float):
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+        self.phase_calls[phase] = self.phase_calls.get(phase, 0) + 1
+        if self.started_at is None:
+            self.started_at = time.perf_counter() - seconds
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @property
+    def total_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        # 计时中的阶段尚未结束时算到当前时间
+        end = time.perf_counter() if self._stack else self.last_activity
+        return end - self.started_at
+
+    def as_dict(self) -> Dict:
+        """汇总结果：各阶段耗时、计数和派生指标（推文/秒、重复率、等待与工作时间）"""
+        total = self.total_seconds
+        idle = sum(self.phase_seconds.get(phase, 0.0) for phase in IDLE_PHASES)
+        timed = sum(self.phase_seconds.values())
+        counters = dict(self.counters)
+        collected = counters.get('tweets_collected', 0)
+        seen = counters.get('tweets_seen', 0)
+        scanned = counters.get('elements_scanned', 0)
+        return {
+            'total_seconds': round(total, 3),
+            'wait_seconds': round(idle, 3),
+            'work_seconds': round(max(0.0, total - idle), 3),
+            'phases': {
+                phase: {'seconds': round(seconds, 3), 'calls': self.phase_calls.get(phase, 0)}
+                for phase, seconds in self.phase_seconds.items()
+            },
+            'other_seconds': round(max(0.0, total - timed), 3),  # 未计时的部分（回调、日志输出等）
+            'counters': counters,
+            'tweets_per_second': round(collected / total, 3) if total else 0.0,
+            'duplicate_rate': round(counters.get('tweets_duplicate', 0) / seen, 3) if seen else 0.0,
+            'new_element_rate': round(counters.get('elements_extracted', 0) / scanned, 3) if scanned else 0.0,
+            'browser': dict(self.browser),
+        }
+
+    def summary(self) -> str:
+        """一行一个阶段的文本摘要，供命令行输出"""
+        data = self.as_dict()
+        lines = [f"总耗时 {data['total_seconds']:.2f} 秒（等待 {data['wait_seconds']:.2f} 秒，"
+                 f"工作 {data['work_seconds']:.2f} 秒），{data['tweets_per_second']:.2f} 条推文/秒，"
+                 f"重复率 {data['duplicate_rate']:.1%}"]
+        for phase, item in sorted(data['phases'].items(), key=lambda kv: -kv[1]['seconds']):
+            lines.append(f"  {phase:<13} {item['seconds']:8.2f} 秒  {item['calls']:>5} 次")
+        counters = data['counters']
+        lines.append(f"  轮数 {counters.get('rounds', 0)}，滚动 {counters.get('scrolls', 0)} 次，"
+                     f"扫描元素 {counters.get('elements_scanned', 0)}，新元素 {counters.get('elements_extracted', 0)}")
+        browser = data['browser']
+        if browser:
+            lines.append(f"  浏览器（{browser['profile']}）下载 {browser.get('transfer_bytes', 0) / 1024:.0f} KB"
+                         f"（{browser.get('requests', 0)} 个请求），JS 堆 {browser.get('js_heap_bytes', 0) / 1048576:.1f} MB，"
+                         f"DOM 节点 {browser.get('dom_nodes', 0)}")
+        return '\n'.join(lines)
+
+
+# ---------- 进程级累计计数器 ----------
+
+Sample = Tuple[str, Tuple[Tuple[str, str], ...]]  # (指标名, ((标签, 值), ...))
+
+
+def attempt_samples(metrics: Dict) -> Dict[Sample, float]:
+    """一次爬取尝试（ScrapeMetrics.as_dict() 的结果）对应的计数器增量"""
+    samples: Dict[Sample, float] = {
+        ('attempts_total', ()): 1,
+        ('run_seconds_total', ()): metrics['total_seconds'],
+    }
+    for phase, item in metrics['phases'].items():
+        samples[('phase_seconds_total', (('phase', phase),))] = item['seconds']
+        samples[('phase_calls_total', (('phase', phase),))] = item['calls']
+    for name, value in metrics['counters'].items():
+        samples[(f'{name}_total', ())] = value
+    return samples
+
+
+class MetricsRegistry:
+    """累计所有任务的计数器（线程安全）"""
+
+    def __init__(self):
+        self._values: Dict[Sample, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, samples: Dict[Sample, float]):
+        with self._lock:
+            for key, value in samples.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+    def values(self) -> Dict[Sample, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+def render_prometheus(values: Dict[Sample, float], gauges: Iterable[Tuple[Sample, float]] = ()) -> str:
+    """把计数器和瞬时值输出为 Prometheus 文本格式（0.0.4）"""
+    grouped: Dict[str, List[Tuple[Tuple[Tuple[str, str], ...], float]]] = {}
+    for (name, labels), value in list(values.items()) + list(gauges):
+        grouped.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(grouped):
+        metric_type, help_text = METRIC_HELP.get(name, ('counter' if name.endswith('_total') else 'gauge', name))
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} {metric_type}")
+        for labels, value in sorted(grouped[name]):
+            label_text = ','.join(f'{key}="{_escape_label(val)}"' for key, val in labels)
+            label_text = f'{{{label_text}}}' if label_text else ''
+            lines.append(f"{METRIC_PREFIX}{name}{label_text} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(round(float(value), 6))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
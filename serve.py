@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生产模式 Web 服务
+默认关闭调试和自动重载；安装了 gunicorn 时以多进程（每个进程多线程）运行，
+否则使用内置的多线程服务器（单进程，支持 HTTP/1.1 keep-alive）。
+多个工作进程时自动启用共享任务状态，任意进程的状态和控制接口看到的任务一致
+
+gthread 工作进程中每个 SSE 进度流（/api/events）在任务结束前一直占用一个线程：每个进程最多保持
+web_max_streams 个（默认为线程数的一半），其余页面改为轮询 /api/status。需要同时打开很多个页面时
+按 页面数 ≈ 进程数 × 进度流上限 增加 --threads（gthread 的线程很轻，例如 --threads 64）
+
+用法:
+    python3 serve.py                               # 按配置 / 环境变量启动
+    python3 serve.py --workers 4 --threads 8       # gunicorn：4 个进程，每个 8 个线程
+    python3 serve.py --server builtin --port 8080  # 内置多线程服务器
+"""
+
+import os
+import argparse
+
+from config import get_config, sse_stream_limit
+from log_config import LOG_FORMATS
+
+
+def gunicorn_available() -> bool:
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_gunicorn(host: str, port: int, workers: int, threads: int, keepalive: float):
+    """gunicorn gthread 工作进程：每个进程独立加载 app（各自的任务管理器和驱动池），通过共享任务状态协作"""
+    from gunicorn.app.base import BaseApplication
+
+    class WebApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+
+    WebApplication({
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'threads': threads,
+        'worker_class': 'gthread',  # 线程工作方式：每个 SSE 进度流在任务结束前占用一个线程（数量由 web_max_streams 限制）
+        'keepalive': keepalive,
+        'timeout': 120,
+        'graceful_timeout': 30,
+        'accesslog': '-'
+    }).run()
+
+
+def run_builtin(host: str, port: int, keepalive: float):
+    """内置多线程服务器：单进程，关闭调试器和自动重载"""
+    from werkzeug.serving import WSGIRequestHandler, run_simple
+
+    # HTTP/1.1 才会保持连接；空闲超过 keepalive 秒后关闭
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+    WSGIRequestHandler.timeout = keepalive
+    from app import app
+    run_simple(host, port, app, threaded=True, use_reloader=False, use_debugger=False)
+
+
+def main():
+    """主函数"""
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='X（推特）推文爬虫 Web 服务（生产模式）')
+    parser.add_argument('--host', default=config['web_host'], help='监听地址')
+    parser.add_argument('--port', type=int, default=config['web_port'], help='监听端口')
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'builtin'], default=config['web_server'],
+                        help='auto: 有 gunicorn 时使用 gunicorn，否则使用内置多线程服务器')
+    parser.add_argument('--workers', type=int, default=config['web_workers'], help='gunicorn 工作进程数')
+    parser.add_argument('--threads', type=int, default=config['web_threads'], help='每个工作进程的线程数')
+    parser.add_argument('--keepalive', type=float, default=config['web_keepalive'],
+                        help='keep-alive 空闲连接保留时间（秒）')
+    parser.add_argument('--debug', action='store_true', default=config['web_debug'],
+                        help='开发模式：Flask 调试器和自动重载')
+    parser.add_argument('--log-level', default=config['log_level'],
+                        help='日志级别：DEBUG 输出每条推文和每次滚动，INFO 输出每轮摘要，WARNING 为安静模式')
+    parser.add_argument('--log-format', choices=LOG_FORMATS, default=config['log_format'],
+                        help='日志格式：text 单行文本，json 每行一个 JSON 对象')
+    args = parser.parse_args()
+
+    server = args.server
+    if server == 'auto':
+        server = 'gunicorn' if gunicorn_available() else 'builtin'
+    elif server == 'gunicorn' and not gunicorn_available():
+        parser.error('未安装 gunicorn（pip install gunicorn，Windows 不支持），或使用 --server builtin')
+
+    workers = max(1, args.workers) if server == 'gunicorn' and not args.debug else 1
+    if workers == 1 and args.workers > 1:
+        print(f"⚠️ {'调试模式' if args.debug else '内置服务器'}只运行 1 个进程，忽略 --workers {args.workers}")
+    # app 在导入时读取配置：工作进程数决定是否启用共享任务状态
+    os.environ['WEB_WORKERS'] = str(workers)
+    # 进度流上限按每个进程的线程数计算
+    os.environ['WEB_THREADS'] = str(args.threads)
+    # 日志在 app 导入时配置（gunicorn 的每个工作进程各自导入）
+    os.environ['LOG_LEVEL'] = args.log_level
+    os.environ['LOG_FORMAT'] = args.log_format
+
+    print("=== Twitter爬虫 Web 应用 ===")
+    print(f"访问地址: http://localhost:{args.port}")
+    if args.debug:
+        print("⚠️ 调试模式：仅用于开发，不要在生产环境中使用")
+        from app import app
+        app.run(debug=True, host=args.host, port=args.port, threaded=True)
+    elif server == 'gunicorn':
+        print(f"gunicorn：{workers} 个工作进程 × {args.threads} 个线程，keep-alive {args.keepalive:g} 秒，"
+              f"每个进程最多 {sse_stream_limit(dict(config, web_threads=args.threads))} 个进度流")
+        run_gunicorn(args.host, args.port, workers, args.threads, args.keepalive)
+    else:
+        print(f"内置多线程服务器：keep-alive {args.keepalive:g} 秒（多进程部署请安装 gunicorn）")
+        run_builtin(args.host, args.port, args.keepalive)
+
+
+if __name__ == '__main__':
+    main()
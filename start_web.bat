@@ -52,9 +52,10 @@ echo ================================
 echo.
 echo 访问地址: http://localhost:8887
 echo 按 Ctrl+C 停止服务器
-echo 提示: 如果端口被占用，可以修改 app.py 中的端口号
+echo 提示: 如果端口被占用，可以设置环境变量 WEB_PORT 或使用 --port 参数
 echo.
 
-python app.py
+REM 生产模式（Windows 使用内置多线程服务器），额外参数原样传给 serve.py
+python serve.py %*
 pause
 
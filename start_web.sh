@@ -51,10 +51,12 @@ echo "================================"
 echo "🚀 启动Web服务器..."
 echo "================================"
 echo ""
-echo "📍 访问地址: http://localhost:8887"
+echo "📍 访问地址: http://localhost:${WEB_PORT:-8887}"
 echo "📍 按 Ctrl+C 停止服务器"
-echo "📍 提示: 如果端口被占用，可以修改 app.py 中的端口号"
+echo "📍 提示: 如果端口被占用，可以设置环境变量 WEB_PORT 或使用 --port 参数"
+echo "📍 提示: 开发调试请使用 --debug，多进程部署请安装 gunicorn 并使用 --workers"
 echo ""
 
-$PYTHON_CMD app.py
+# 生产模式：关闭调试和自动重载，额外参数原样传给 serve.py（如 --workers 4）
+$PYTHON_CMD serve.py "$@"
 
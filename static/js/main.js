@@ -1,7 +1,9 @@
 // ========== 全局变量 ==========
 let statusCheckInterval = null;
+let statusEventSource = null;  // SSE 进度流，不支持或连接失败时退回轮询
 let currentFiles = [];
 let isPaused = false;
+let currentJobId = null;
 
 // ========== 初始化 ==========
 document.addEventListener('DOMContentLoaded', function() {
@@ -102,10 +104,12 @@ async function startScraping() {
         const data = await response.json();
         
         if (response.ok) {
+            // 记录任务ID，后续状态查询和控制都针对该任务
+            currentJobId = data.job_id;
             // 显示控制按钮
             document.getElementById('controlButtons').style.display = 'flex';
-            // 开始轮询状态
-            startStatusPolling();
+            // 订阅进度推送（不支持时轮询状态）
+            startStatusUpdates();
         } else {
             showNotification(data.error || '启动失败', 'error');
             resetForm();
@@ -116,7 +120,59 @@ async function startScraping() {
     }
 }
 
-// ========== 状态轮询 ==========
+// ========== 进度推送 ==========
+const LIVE_TWEET_LIMIT = 20;  // 进度区域最多显示的实时推文数
+const SSE_MAX_ERRORS = 3;     // 连续出错超过该次数后改为轮询
+
+function startStatusUpdates() {
+    stopStatusUpdates();
+    document.getElementById('liveTweets').innerHTML = '';
+    
+    if (!window.EventSource) {
+        startStatusPolling();
+        return;
+    }
+    
+    let errors = 0;
+    const source = new EventSource(`/api/events/${currentJobId}`);
+    statusEventSource = source;
+    
+    source.addEventListener('status', event => {
+        errors = 0;
+        handleStatus(JSON.parse(event.data));
+    });
+    source.addEventListener('tweet', event => {
+        appendLiveTweet(JSON.parse(event.data));
+    });
+    source.addEventListener('end', () => {
+        source.close();
+        statusEventSource = null;
+    });
+    source.onerror = () => {
+        // EventSource 会自动重连（带上 Last-Event-ID）；连接被拒绝或反复失败时退回轮询
+        errors += 1;
+        if (source.readyState === EventSource.CLOSED || errors > SSE_MAX_ERRORS) {
+            source.close();
+            if (statusEventSource === source) {
+                statusEventSource = null;
+                startStatusPolling();
+            }
+        }
+    };
+}
+
+function stopStatusUpdates() {
+    if (statusEventSource) {
+        statusEventSource.close();
+        statusEventSource = null;
+    }
+    if (statusCheckInterval) {
+        clearInterval(statusCheckInterval);
+        statusCheckInterval = null;
+    }
+}
+
+// ========== 状态轮询（不支持 SSE 时使用） ==========
 function startStatusPolling() {
     if (statusCheckInterval) {
         clearInterval(statusCheckInterval);
@@ -124,35 +180,58 @@ function startStatusPolling() {
     
     statusCheckInterval = setInterval(async () => {
         try {
-            const response = await fetch('/api/status');
+            const response = await fetch(`/api/status/${currentJobId}`);
             const status = await response.json();
             
-            updateProgress(status);
-            
-            // 如果完成或出错，停止轮询
-            if (!status.is_running) {
-                clearInterval(statusCheckInterval);
-                statusCheckInterval = null;
-                
-                // 隐藏控制按钮
-                document.getElementById('controlButtons').style.display = 'none';
-                
-                if (status.error) {
-                    showNotification('爬取失败: ' + status.error, 'error');
-                } else if (status.output_files && status.output_files.length > 0) {
-                    currentFiles = status.output_files;
-                    document.getElementById('actionButtons').style.display = 'grid';
-                    showNotification('爬取完成！', 'success');
-                    // 刷新历史记录
-                    loadHistory();
-                }
-            }
+            handleStatus(status);
         } catch (error) {
             console.error('获取状态失败:', error);
         }
     }, 1000);
 }
 
+// ========== 处理状态更新 ==========
+function handleStatus(status) {
+    updateProgress(status);
+    
+    // 如果完成或出错，停止接收更新
+    if (!status.is_running) {
+        stopStatusUpdates();
+        
+        // 隐藏控制按钮
+        document.getElementById('controlButtons').style.display = 'none';
+        
+        if (status.error) {
+            showNotification('爬取失败: ' + status.error, 'error');
+        } else if (status.output_files && status.output_files.length > 0) {
+            currentFiles = status.output_files;
+            document.getElementById('actionButtons').style.display = 'grid';
+            showNotification('爬取完成！', 'success');
+            // 刷新历史记录
+            loadHistory();
+        }
+    }
+}
+
+// ========== 实时推文 ==========
+function appendLiveTweet(tweet) {
+    const liveTweets = document.getElementById('liveTweets');
+    const item = document.createElement('div');
+    item.className = 'live-tweet';
+    item.innerHTML = `
+        <div class="live-tweet-text">${escapeHtml(tweet.text || '')}</div>
+        <div class="live-tweet-meta">
+            <span><i class="fas fa-clock"></i> ${escapeHtml(tweet.time_display || '')}</span>
+            <span><i class="fas fa-heart"></i> ${tweet.likes || 0}</span>
+            <span><i class="fas fa-retweet"></i> ${tweet.retweets || 0}</span>
+        </div>
+    `;
+    liveTweets.prepend(item);
+    while (liveTweets.children.length > LIVE_TWEET_LIMIT) {
+        liveTweets.lastElementChild.remove();
+    }
+}
+
 // ========== 更新进度显示 ==========
 function updateProgress(status) {
     const progressBar = document.getElementById('progressBar');
@@ -194,7 +273,7 @@ function updateProgress(status) {
 async function togglePause() {
     try {
         const endpoint = isPaused ? '/api/resume' : '/api/pause';
-        const response = await fetch(endpoint, { method: 'POST' });
+        const response = await fetch(`${endpoint}/${currentJobId}`, { method: 'POST' });
         const data = await response.json();
         
         if (response.ok) {
@@ -225,16 +304,13 @@ async function cancelScraping() {
     }
     
     try {
-        const response = await fetch('/api/cancel', { method: 'POST' });
+        const response = await fetch(`/api/cancel/${currentJobId}`, { method: 'POST' });
         const data = await response.json();
         
         if (response.ok) {
             showNotification('已取消爬取任务', 'info');
-            // 停止轮询
-            if (statusCheckInterval) {
-                clearInterval(statusCheckInterval);
-                statusCheckInterval = null;
-            }
+            // 停止接收进度
+            stopStatusUpdates();
             // 稍等一下再重置表单，让用户看到取消消息
             setTimeout(() => {
                 resetForm();
@@ -263,11 +339,10 @@ function resetForm() {
     // 重置状态
     isPaused = false;
     currentFiles = [];
+    currentJobId = null;
     
-    if (statusCheckInterval) {
-        clearInterval(statusCheckInterval);
-        statusCheckInterval = null;
-    }
+    stopStatusUpdates();
+    document.getElementById('liveTweets').innerHTML = '';
 }
 
 // ========== 预览数据 ==========
@@ -277,10 +352,10 @@ async function previewData() {
         return;
     }
     
-    // 优先查找CSV文件，其次JSON文件
+    // 优先查找CSV文件，其次JSON / JSONL文件
     let fileToPreview = currentFiles.find(f => f.type === 'csv');
     if (!fileToPreview) {
-        fileToPreview = currentFiles.find(f => f.type === 'json');
+        fileToPreview = currentFiles.find(f => f.type === 'json' || f.type === 'jsonl');
     }
     
     if (!fileToPreview) {
@@ -288,12 +363,21 @@ async function previewData() {
         return;
     }
     
+    loadPreviewPage(`/api/preview/${fileToPreview.name}`, fileToPreview.name, 0);
+}
+
+// ========== 分页加载预览 ==========
+const PREVIEW_PAGE_SIZE = 10;
+let previewSource = null;  // 当前预览的接口地址和标题，翻页时复用
+
+async function loadPreviewPage(url, title, offset) {
+    previewSource = { url, title };
     try {
-        const response = await fetch(`/api/preview/${fileToPreview.name}`);
+        const response = await fetch(`${url}?offset=${offset}&limit=${PREVIEW_PAGE_SIZE}`);
         const data = await response.json();
         
         if (response.ok) {
-            displayPreview(data, fileToPreview.name);
+            displayPreview(data, title);
         } else {
             showNotification(data.error || '预览失败', 'error');
         }
@@ -302,6 +386,12 @@ async function previewData() {
     }
 }
 
+function changePreviewPage(offset) {
+    if (previewSource) {
+        loadPreviewPage(previewSource.url, previewSource.title, Math.max(0, offset));
+    }
+}
+
 // ========== 显示预览 ==========
 function displayPreview(data, filename) {
     const modal = document.getElementById('previewModal');
@@ -310,10 +400,20 @@ function displayPreview(data, filename) {
     // 判断文件格式
     const format = data.format || (filename && filename.endsWith('.csv') ? 'csv' : 'json');
     const formatLabel = format.toUpperCase();
-    
-    let html = `<div style="margin-bottom: 20px; color: var(--text-secondary);">
-        <span style="background: var(--primary); color: white; padding: 4px 12px; border-radius: 6px; margin-right: 10px;">${formatLabel}</span>
-        显示前10条，共${data.total}条推文
+    const offset = data.offset || 0;
+    const limit = data.limit || PREVIEW_PAGE_SIZE;
+    const first = data.total > 0 ? offset + 1 : 0;
+    const last = offset + data.tweets.length;
+    
+    let html = `<div style="margin-bottom: 20px; color: var(--text-secondary); display: flex; align-items: center; gap: 10px;">
+        <span style="background: var(--primary); color: white; padding: 4px 12px; border-radius: 6px;">${formatLabel}</span>
+        <span style="flex: 1;">第 ${first}-${last} 条，共${data.total}条推文</span>
+        <button class="icon-btn" onclick="changePreviewPage(${offset - limit})" title="上一页" ${offset > 0 ? '' : 'disabled'}>
+            <i class="fas fa-chevron-left"></i>
+        </button>
+        <button class="icon-btn" onclick="changePreviewPage(${offset + limit})" title="下一页" ${last < data.total ? '' : 'disabled'}>
+            <i class="fas fa-chevron-right"></i>
+        </button>
     </div>`;
     
     data.tweets.forEach((tweet, index) => {
@@ -380,21 +480,43 @@ function downloadFiles() {
 }
 
 // ========== 加载历史记录 ==========
-async function loadHistory() {
+const HISTORY_PAGE_SIZE = 50;
+let historyFiles = [];     // 已加载的导出文件
+let historyAccounts = [];  // 推文库中的账号
+let historyTotal = 0;      // 符合筛选条件的导出文件总数
+
+async function loadHistory(append = false) {
     const historyList = document.getElementById('historyList');
-    historyList.innerHTML = `
-        <div class="loading-spinner">
-            <i class="fas fa-spinner fa-spin"></i>
-            <p>加载中...</p>
-        </div>
-    `;
+    if (!append) {
+        historyList.innerHTML = `
+            <div class="loading-spinner">
+                <i class="fas fa-spinner fa-spin"></i>
+                <p>加载中...</p>
+            </div>
+        `;
+    }
+    
+    const filterInput = document.getElementById('historyFilter');
+    const username = filterInput ? filterInput.value.trim().replace(/^@/, '') : '';
+    const offset = append ? historyFiles.length : 0;
+    const params = new URLSearchParams({ offset, limit: HISTORY_PAGE_SIZE });
+    if (username) {
+        params.set('username', username);
+    }
     
     try {
-        const response = await fetch('/api/history');
+        const response = await fetch(`/api/history?${params}`);
         const data = await response.json();
         
-        if (data.files && data.files.length > 0) {
-            displayHistory(data.files);
+        historyFiles = append ? historyFiles.concat(data.files || []) : (data.files || []);
+        historyTotal = data.total || historyFiles.length;
+        historyAccounts = (data.accounts || []).filter(
+            account => !username || account.username.toLowerCase() === username.toLowerCase()
+        );
+        const files = historyFiles;
+        const accounts = historyAccounts;
+        if (files.length > 0 || accounts.length > 0) {
+            displayHistory(files, accounts);
         } else {
             historyList.innerHTML = `
                 <div class="empty-state">
@@ -414,14 +536,57 @@ async function loadHistory() {
 }
 
 // ========== 显示历史记录 ==========
-function displayHistory(files) {
+function displayHistory(files, accounts = []) {
     const historyList = document.getElementById('historyList');
     
     let html = '';
+    // 推文库中的账号（按推文去重，跨次爬取累积）
+    accounts.forEach(account => {
+        const dateRange = account.oldest && account.newest
+            ? `${formatDate(account.oldest)} ~ ${formatDate(account.newest)}`
+            : '未知';
+        
+        html += `
+            <div class="history-item">
+                <div class="history-info">
+                    <div class="file-icon">
+                        <i class="fas fa-database"></i>
+                    </div>
+                    <div class="file-details">
+                        <h4>@${escapeHtml(account.username)}</h4>
+                        <div class="file-meta">
+                            <span><i class="fas fa-list"></i> ${account.count} 条推文</span>
+                            <span><i class="fas fa-clock"></i> ${dateRange}</span>
+                            <span><i class="fas fa-calendar"></i> ${formatDate(account.last_scraped)}</span>
+                        </div>
+                    </div>
+                </div>
+                <div class="history-actions">
+                    <button class="icon-btn" onclick="previewAccount('${account.username}')" title="预览">
+                        <i class="fas fa-eye"></i>
+                    </button>
+                    <button class="icon-btn" onclick="exportAccount('${account.username}', 'json')" title="导出JSON">
+                        <i class="fas fa-file-code"></i>
+                    </button>
+                    <button class="icon-btn" onclick="exportAccount('${account.username}', 'csv')" title="导出CSV">
+                        <i class="fas fa-file-csv"></i>
+                    </button>
+                </div>
+            </div>
+        `;
+    });
+    
     files.forEach(file => {
         const fileSize = formatFileSize(file.size);
         const fileDate = formatDate(file.modified);
-        const fileIcon = file.type === 'JSON' ? 'fa-file-code' : 'fa-file-csv';
+        const fileIcon = file.type === 'CSV' ? 'fa-file-csv' : 'fa-file-code';
+        // 推文数和时间范围来自历史记录索引，不需要打开文件
+        const countMeta = file.count !== null && file.count !== undefined
+            ? `<span><i class="fas fa-list"></i> ${file.count} 条推文</span>`
+            : '';
+        const rangeMeta = file.oldest && file.newest
+            ? `<span><i class="fas fa-clock"></i> ${formatDate(file.oldest)} ~ ${formatDate(file.newest)}</span>`
+            : '';
         
         html += `
             <div class="history-item">
@@ -433,6 +598,8 @@ function displayHistory(files) {
                         <h4>${file.name}</h4>
                         <div class="file-meta">
                             <span><i class="fas fa-tag"></i> ${file.type}</span>
+                            ${countMeta}
+                            ${rangeMeta}
                             <span><i class="fas fa-hdd"></i> ${fileSize}</span>
                             <span><i class="fas fa-calendar"></i> ${fileDate}</span>
                         </div>
@@ -450,23 +617,37 @@ function displayHistory(files) {
         `;
     });
     
+    if (files.length < historyTotal) {
+        html += `
+            <button class="refresh-btn load-more-btn" onclick="loadHistory(true)">
+                <i class="fas fa-chevron-down"></i>
+                加载更多（${files.length}/${historyTotal}）
+            </button>
+        `;
+    }
+    
     historyList.innerHTML = html;
 }
 
 // ========== 预览历史文件 ==========
-async function previewHistoryFile(filename) {
-    try {
-        const response = await fetch(`/api/preview/${filename}`);
-        const data = await response.json();
-        
-        if (response.ok) {
-            displayPreview(data, filename);
-        } else {
-            showNotification(data.error || '预览失败', 'error');
-        }
-    } catch (error) {
-        showNotification('预览失败: ' + error.message, 'error');
-    }
+function previewHistoryFile(filename) {
+    loadPreviewPage(`/api/preview/${filename}`, filename, 0);
+}
+
+// ========== 预览推文库中的账号 ==========
+function previewAccount(username) {
+    loadPreviewPage(`/api/accounts/${encodeURIComponent(username)}/tweets`, `@${username}`, 0);
+}
+
+// ========== 从推文库导出账号推文 ==========
+function exportAccount(username, format) {
+    const link = document.createElement('a');
+    link.href = `/api/accounts/${encodeURIComponent(username)}/export?format=${format}`;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    
+    showNotification('开始导出', 'success');
 }
 
 // ========== 下载历史文件 ==========
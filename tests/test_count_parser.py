@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+互动数解析换算表测试（count_parser.parse_count / parse_counts）
+
+用法:
+    python -m pytest tests/test_count_parser.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from count_parser import parse_count, parse_counts
+
+# (标签, 期望的互动数)
+CASES = [
+    # 英文界面的 aria-label 和显示文本
+    ('1,234 Likes. Like', 1234),
+    ('0 Replies. Reply', 0),
+    ('12 Mentions', 12),
+    ('1 Repost. Repost', 1),
+    ('1.2K', 1200),
+    ('15K Likes', 15000),
+    ('2.5M', 2500000),
+    ('1.5B views', 1500000000),
+    ('3 millions', 3000000),
+    ('1,234.5K', 1234500),
+    ('1,234,567 Likes. Like', 1234567),
+    # 中文 / 日文 / 韩文界面
+    ('99239 回复。回复', 99239),
+    ('924686 喜欢次数。喜欢', 924686),
+    ('99934 次转帖。转帖', 99934),
+    ('1.2万 次喜欢', 12000),
+    ('12.3万', 123000),
+    ('10 万', 100000),
+    ('3亿', 300000000),
+    ('1.5億', 150000000),
+    ('2千', 2000),
+    ('4.5만', 45000),
+    # 其他地区的分隔符和单位
+    ('1.234 Gefällt mir', 1234),
+    ('3,5 Mio.', 3500000),
+    ('2 Mrd.', 2000000000),
+    ('1 234 J’aime', 1234),
+    ('1 234', 1234),
+    ("1'234", 1234),
+    ('1,5 mil Me gusta', 1500),
+    # 没有数字、按钮不存在
+    ('Like', 0),
+    ('', 0),
+    (None, 0),
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """每个测试从空缓存开始，换算结果不依赖其他测试缓存的值"""
+    parse_count.cache_clear()
+
+
+@pytest.mark.parametrize('label, expected', CASES)
+def test_parse_count(label, expected):
+    assert parse_count(label) == expected
+    # 第二次从缓存中取出，结果相同
+    assert parse_count(label) == expected
+    info = parse_count.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+def test_parse_counts_converts_three_labels():
+    assert parse_counts('1,234 Likes. Like', '1.2K', None) == (1234, 1200, 0)
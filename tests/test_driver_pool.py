@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+驱动池测试：空闲超时的驱动在没有新任务时也会被关闭
+
+用法:
+    python -m pytest tests/test_driver_pool.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from driver_pool import DriverPool
+
+
+class StubDriver:
+    """只记录是否已退出的驱动"""
+
+    def __init__(self):
+        self.quit_called = False
+
+    def execute_script(self, script):
+        return 1
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def wait_until(condition, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_idle_driver_quit_without_another_acquire():
+    pool = DriverPool(size=1, idle_timeout=0.1)
+    driver = pool.acquire('key', StubDriver)
+    pool.release(driver)
+    assert pool.stats()['idle'] == 1
+    assert not driver.quit_called
+
+    assert wait_until(lambda: driver.quit_called)
+    stats = pool.stats()
+    assert stats['idle'] == 0
+    assert stats['idle_evictions'] == 1
+    pool.close_all()
+
+
+def test_close_all_stops_reaper():
+    pool = DriverPool(size=1, idle_timeout=60)
+    driver = pool.acquire('key', StubDriver)
+    pool.release(driver)
+    reaper = pool._reaper
+    assert reaper is not None and reaper.is_alive()
+
+    pool.close_all()
+    assert not reaper.is_alive()
+    assert driver.quit_called
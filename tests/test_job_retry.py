@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务重试测试：流式输出任务中途出错时按失败处理，下一次尝试从检查点继续
+
+用法:
+    python -m pytest tests/test_job_retry.py
+"""
+
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from fake_driver import FakeDriver
+from replay import FIXTURE, load_fixture, synthesize_timeline
+from twitter_scraper import TwitterScraper
+from job_manager import JobManager, STATE_COMPLETED
+
+
+class FailingDriver(FakeDriver):
+    """执行 fail_after 次脚本后抛出异常（模拟爬取中途浏览器崩溃）"""
+
+    def __init__(self, html: str, fail_after: int, **kwargs):
+        super().__init__(html, **kwargs)
+        self.fail_after = fail_after
+        self.scripts = 0
+
+    def execute_script(self, script, *args):
+        self.scripts += 1
+        if self.scripts > self.fail_after:
+            raise RuntimeError('浏览器已崩溃')
+        return super().execute_script(script, *args)
+
+
+class FakePool:
+    """按顺序借出预先准备的驱动"""
+
+    def __init__(self, drivers):
+        self.drivers = list(drivers)
+
+    def acquire(self, key, launch):
+        return self.drivers.pop(0)
+
+    def release(self, driver):
+        pass
+
+
+def test_stream_job_resumes_after_mid_scrape_failure(tmp_path, monkeypatch):
+    html = synthesize_timeline(load_fixture(FIXTURE), 120)
+    pool = FakePool([FailingDriver(html, fail_after=8, visible=10, scroll_batch=10),
+                     FakeDriver(html, visible=10, scroll_batch=10)])
+
+    setup_driver = TwitterScraper.setup_driver
+
+    def setup_in_tmp(self):
+        self.data_dir = str(tmp_path)
+        self.checkpoint_dir = str(tmp_path / 'checkpoints')
+        return setup_driver(self)
+
+    monkeypatch.setattr(TwitterScraper, 'setup_driver', setup_in_tmp)
+
+    manager = JobManager(max_workers=1, driver_pool=pool, retry_delay=0,
+                         scraper_options=dict(wait_mode='adaptive', wait_timeout=0.1, jitter_floor=(0, 0)))
+    try:
+        job = manager.submit('tester', 100, save_format='json', stream=True, retries=2)
+        assert job.done.wait(60)
+    finally:
+        manager.shutdown()
+
+    status = job.snapshot()
+    assert status['state'] == STATE_COMPLETED
+    assert status['attempts'] == 2
+    assert status['current_tweets'] == 100
+
+    # 第二次尝试续写第一次的输出文件，不重复也不丢失
+    [output] = status['output_files']
+    with open(output['path'], encoding='utf-8') as f:
+        keys = [(t['timestamp'], t['text']) for t in map(json.loads, f)]
+    assert len(keys) == 100
+    assert len(set(keys)) == 100
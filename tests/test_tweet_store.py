@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文库账号汇总测试：写入时维护的 accounts 汇总与扫描推文表的结果一致
+
+用法:
+    python -m pytest tests/test_tweet_store.py
+"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tweet_store import TweetStore
+
+# 直接扫描推文表得到的账号汇总（以前 accounts() 的查询）
+SCAN_SQL = ('SELECT username, COUNT(*) AS count, MIN(timestamp) AS oldest, MAX(timestamp) AS newest, '
+            'MAX(scraped_at) AS last_scraped FROM tweets GROUP BY username ORDER BY last_scraped DESC')
+
+
+def tweet(tweet_id, timestamp, scraped_at, text='正文'):
+    return {'tweet_id': tweet_id, 'timestamp': timestamp, 'text': text, 'scraped_at': scraped_at}
+
+
+def scanned(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(SCAN_SQL)]
+    finally:
+        conn.close()
+
+
+def test_accounts_summary_matches_table_scan(tmp_path):
+    path = str(tmp_path / 'tweets.db')
+    store = TweetStore(path)
+    assert store.upsert_tweets('Alice', [tweet('1', '2024-01-02', '2024-03-01T10:00'),
+                                         tweet('2', '2024-01-05', '2024-03-01T10:00'),
+                                         tweet('2', '2024-01-05', '2024-03-01T10:01')]) == 2
+    assert store.upsert_tweets('bob', [tweet('3', '2023-12-30', '2024-03-02T09:00'),
+                                       tweet(None, None, '2024-03-02T09:00', text='没有时间')]) == 2
+    # bob 的时间线上出现 alice 的推文（转推）：推文仍属于 alice，只更新 alice 的最近爬取时间
+    assert store.upsert_tweets('bob', [tweet('1', '2024-01-02', '2024-03-03T08:00'),
+                                       tweet('4', '2024-01-10', '2024-03-03T08:00')]) == 1
+    assert store.upsert_tweets('alice', []) == 0
+
+    assert store.accounts() == scanned(path)
+    assert [a['username'] for a in store.accounts()] == ['alice', 'bob']
+
+
+def test_accounts_summary_rebuilt_for_older_databases(tmp_path):
+    path = str(tmp_path / 'tweets.db')
+    store = TweetStore(path)
+    store.upsert_tweets('alice', [tweet('1', '2024-01-02', '2024-03-01T10:00')])
+    store.close()
+
+    # 以前版本的数据库没有汇总
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute('DELETE FROM accounts')
+        conn.execute('PRAGMA user_version = 0')
+    conn.close()
+
+    assert TweetStore(path).accounts() == scanned(path)
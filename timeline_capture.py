@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+时间线网络响应捕获
+通过 Chrome DevTools 性能日志记录页面本身下载的时间线 GraphQL 响应，
+直接从 JSON 中解析推文（真实推文 ID、作者 ID 和精确的互动数）
+
+离线回放:
+    python3 timeline_capture.py benchmarks/fixtures/user_tweets_response.json
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+
+from tweet_record import Tweet, OPTIONAL_FIELDS
+
+
+logger = logging.getLogger(__name__)
+
+# 需要捕获的时间线接口（用户主页推文、回复、媒体、推文详情）
+TIMELINE_URL_PATTERN = re.compile(
+    r'/i/api/graphql/[^/]+/(UserTweets|UserTweetsAndReplies|UserMedia|TweetDetail)\b'
+)
+
+# 网络捕获模式额外提供的字段（DOM 模式下没有）
+EXTRA_FIELDS = list(OPTIONAL_FIELDS)
+
+# 推文 JSON 中 created_at 的格式，例如 "Sun Sep 28 19:01:01 +0000 2025"
+CREATED_AT_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+
+def format_created_at(created_at: str) -> str:
+    """将 created_at 转为与页面 <time datetime> 一致的 ISO 格式"""
+    try:
+        dt = datetime.strptime(created_at, CREATED_AT_FORMAT)
+    except (TypeError, ValueError):
+        return ""
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def _find_instructions(node) -> List[Dict]:
+    """在响应中查找时间线 instructions 列表（不同接口的嵌套路径不同）"""
+    if isinstance(node, dict):
+        instructions = node.get('instructions')
+        if isinstance(instructions, list):
+            return instructions
+        for value in node.values():
+            found = _find_instructions(value)
+            if found:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = _find_instructions(value)
+            if found:
+                return found
+    return []
+
+
+def _iter_entries(instructions: List[Dict]) -> Iterable[tuple]:
+    """遍历 instructions 中的时间线条目（含置顶推文），返回 (条目, 是否为置顶推文)"""
+    for instruction in instructions:
+        if instruction.get('type') == 'TimelinePinEntry' and instruction.get('entry'):
+            yield instruction['entry'], True
+        for entry in instruction.get('entries') or []:
+            yield entry, False
+
+
+def _iter_tweet_results(entry: Dict) -> Iterable[Dict]:
+    """从条目中取出 tweet_results.result（单条推文或会话模块）"""
+    entry_id = entry.get('entryId', '')
+    if entry_id.startswith('promoted-'):
+        return
+    content = entry.get('content') or {}
+    item_content = content.get('itemContent')
+    if item_content:
+        yield (item_content.get('tweet_results') or {}).get('result')
+    for item in content.get('items') or []:
+        if 'promoted' in item.get('entryId', ''):
+            continue
+        item_content = (item.get('item') or {}).get('itemContent') or {}
+        yield (item_content.get('tweet_results') or {}).get('result')
+
+
+def parse_tweet_result(result: Optional[Dict], scraped_at: Optional[str] = None,
+                       pinned: bool = False) -> Optional[Tweet]:
+    """
+    解析单个 tweet_results.result
+
+    Args:
+        result: tweet_results.result
+        scraped_at: 爬取时间（同一响应中的推文共用一个字符串），默认为当前时间
+        pinned: 是否为置顶推文（与转推一样标记 social_context）
+
+    Returns:
+        推文数据，字段与 DOM 提取一致，另含 tweet_id、author_id、author、quotes、views；
+        无法解析（已删除、受限等）时返回 None
+    """
+    if not result:
+        return None
+    if result.get('__typename') == 'TweetWithVisibilityResults':
+        result = result.get('tweet') or {}
+    legacy = result.get('legacy')
+    if not legacy:
+        return None
+
+    # 长推文的完整文本在 note_tweet 中
+    note = (((result.get('note_tweet') or {}).get('note_tweet_results') or {}).get('result') or {})
+    text = note.get('text') or legacy.get('full_text', '')
+
+    user = (((result.get('core') or {}).get('user_results') or {}).get('result') or {})
+    screen_name = ((user.get('core') or {}).get('screen_name')
+                   or (user.get('legacy') or {}).get('screen_name', ''))
+
+    views = (result.get('views') or {}).get('count')
+
+    return Tweet(
+        text=text,
+        timestamp=format_created_at(legacy.get('created_at')),
+        time_display="",
+        likes=int(legacy.get('favorite_count') or 0),
+        retweets=int(legacy.get('retweet_count') or 0),
+        replies=int(legacy.get('reply_count') or 0),
+        scraped_at=scraped_at or datetime.now().isoformat(),
+        tweet_id=legacy.get('id_str') or result.get('rest_id', ''),
+        author_id=legacy.get('user_id_str', ''),
+        author=screen_name,
+        quotes=int(legacy.get('quote_count') or 0),
+        views=int(views) if views else 0,
+        social_context=pinned or 'retweeted_status_result' in legacy,
+    )
+
+
+def parse_timeline_response(payload: Dict) -> List[Tweet]:
+    """解析一个时间线 GraphQL 响应，返回其中的推文（按出现顺序，已按推文 ID 去重）"""
+    tweets = []
+    seen_ids = set()
+    scraped_at = datetime.now().isoformat()
+    for entry, pinned in _iter_entries(_find_instructions(payload)):
+        for result in _iter_tweet_results(entry):
+            tweet = parse_tweet_result(result, scraped_at, pinned)
+            if tweet and tweet.tweet_id not in seen_ids:
+                seen_ids.add(tweet.tweet_id)
+                tweets.append(tweet)
+    return tweets
+
+
+def load_recorded_responses(path: str) -> List[Dict]:
+    """
+    读取录制的响应文件，用于离线回放
+
+    支持单个响应 JSON、响应 JSON 数组，或每行一个响应的 .jsonl 文件
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+class NetworkCapture:
+    """
+    从 Chrome 性能日志中收集时间线响应
+
+    需要驱动启用 goog:loggingPrefs 的 performance 日志（见 TwitterScraper.setup_driver）。
+    每次 poll() 只处理上次之后的新日志，响应体通过 CDP Network.getResponseBody 读取。
+    """
+
+    def __init__(self, record_dir: Optional[str] = None):
+        """
+        Args:
+            record_dir: 若指定，每个捕获到的原始响应都会追加到该目录下的 responses.jsonl，供离线回放
+        """
+        self.record_dir = record_dir
+        self.pending_requests = {}  # requestId -> url，响应体尚未就绪的请求
+        self.responses_captured = 0
+
+    def poll(self, driver) -> List[Dict]:
+        """读取新的性能日志，返回本次新捕获的时间线响应 JSON 列表"""
+        try:
+            log_entries = driver.get_log('performance')
+        except Exception as e:
+            logger.warning("读取性能日志失败（驱动未启用 performance 日志？）: %s", e)
+            log_entries = []
+
+        for entry in log_entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method') != 'Network.responseReceived':
+                continue
+            params = message.get('params', {})
+            url = params.get('response', {}).get('url', '')
+            if TIMELINE_URL_PATTERN.search(url):
+                self.pending_requests[params.get('requestId')] = url
+
+        payloads = []
+        for request_id in list(self.pending_requests):
+            try:
+                body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception:
+                # 响应体可能还没下载完，下一轮再取
+                continue
+            del self.pending_requests[request_id]
+            try:
+                payload = json.loads(body.get('body', ''))
+            except ValueError:
+                continue
+            payloads.append(payload)
+            self.responses_captured += 1
+            self._record(payload)
+        return payloads
+
+    def _record(self, payload: Dict):
+        if not self.record_dir:
+            return
+        os.makedirs(self.record_dir, exist_ok=True)
+        with open(os.path.join(self.record_dir, 'responses.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(payload, ensure_ascii=False) + '\n')
+
+
+def main():
+    """离线回放录制的响应文件并打印解析结果"""
+    if len(sys.argv) < 2:
+        print("用法: python3 timeline_capture.py <响应文件.json|.jsonl> ...")
+        return
+    total = 0
+    for path in sys.argv[1:]:
+        for payload in load_recorded_responses(path):
+            for tweet in parse_timeline_response(payload):
+                total += 1
+                print(f"#{total} [{tweet['tweet_id']}] @{tweet['author']} {tweet['timestamp']} "
+                      f"♥{tweet['likes']} ⟳{tweet['retweets']} 💬{tweet['replies']} | {tweet['text'][:50]}")
+    print(f"共解析 {total} 条推文")
+
+
+if __name__ == "__main__":
+    main()
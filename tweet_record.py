@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的推文记录
+推文保存为固定字段的 __slots__ 对象，不为每条推文分配字典；重复率高的短字符串（显示时间、作者）驻留后共享。
+Tweet 实现只读的 Mapping 接口（get、in、keys、items），推文库、检查点、历史记录索引和 CSV 写入
+可以像读取字典一样直接读取；JSON 序列化使用 json_default
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+# 所有提取方式都有的字段（与 CSV_FIELDNAMES 一致）
+BASE_FIELDS = ('text', 'timestamp', 'time_display', 'likes', 'retweets', 'replies', 'scraped_at')
+# 网络捕获模式才有的字段（与 EXTRA_FIELDS 一致；DOM 提取只有从推文链接取出的 tweet_id），为 None 时视为不存在
+OPTIONAL_FIELDS = ('tweet_id', 'author_id', 'author', 'quotes', 'views')
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class Tweet(Mapping):
+    """
+    一条推文（创建后不再修改）
+
+    social_context 不是输出字段：推文带有社交上下文（置顶、转推）时为 True，
+    这类推文在时间线上的位置与发布时间无关，增量爬取判断是否到达上次的位置时不计入
+    """
+
+    __slots__ = BASE_FIELDS + OPTIONAL_FIELDS + ('social_context',)
+
+    def __init__(self, text: str = '', timestamp: str = '', time_display: str = '',
+                 likes: int = 0, retweets: int = 0, replies: int = 0, scraped_at: str = '',
+                 tweet_id: Optional[str] = None, author_id: Optional[str] = None, author: Optional[str] = None,
+                 quotes: Optional[int] = None, views: Optional[int] = None, social_context: bool = False):
+        self.text = text
+        self.timestamp = timestamp
+        self.time_display = _intern(time_display)
+        self.likes = likes
+        self.retweets = retweets
+        self.replies = replies
+        self.scraped_at = scraped_at
+        self.tweet_id = tweet_id
+        self.author_id = _intern(author_id)
+        self.author = _intern(author)
+        self.quotes = quotes
+        self.views = views
+        self.social_context = social_context
+
+    def __getitem__(self, field: str):
+        if field in BASE_FIELDS:
+            return getattr(self, field)
+        if field in OPTIONAL_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                return value
+        raise KeyError(field)
+
+    def __iter__(self):
+        yield from BASE_FIELDS
+        for field in OPTIONAL_FIELDS:
+            if getattr(self, field) is not None:
+                yield field
+
+    def __len__(self) -> int:
+        return len(BASE_FIELDS) + sum(getattr(self, field) is not None for field in OPTIONAL_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Tweet({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+
+def json_default(obj):
+    """json.dump 的 default 参数：把 Tweet 序列化为对象"""
+    if isinstance(obj, Tweet):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
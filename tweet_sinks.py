@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式输出
+爬取过程中每收集到一条新推文就追加写入 JSON Lines / CSV 文件，
+内存中只保留不超过 buffer_size 条待写入的推文，崩溃或取消时已写入的数据不会丢失
+"""
+
+import os
+import csv
+import json
+from typing import Dict, Iterator, List
+
+from tweet_record import json_default
+
+
+# 与 save_to_csv 一致的基础列
+CSV_FIELDNAMES = ['text', 'timestamp', 'time_display', 'likes', 'retweets', 'replies', 'scraped_at']
+
+
+class TweetSink:
+    """流式输出基类：write() 缓冲推文，缓冲满 buffer_size 条时写入并刷新到磁盘"""
+
+    def __init__(self, path: str, buffer_size: int = 20):
+        self.path = path
+        self.buffer_size = max(1, buffer_size)
+        self.written = 0
+        self._buffer: List[Dict] = []
+        self._file = None
+
+    def write(self, tweet: Dict):
+        self._buffer.append(tweet)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """将缓冲的推文写入文件并刷新到磁盘"""
+        if not self._buffer:
+            return
+        self._write_records(self._buffer)
+        self.written += len(self._buffer)
+        self._buffer = []
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def _write_records(self, records: List[Dict]):
+        raise NotImplementedError
+
+
+class JsonLinesSink(TweetSink):
+    """JSON Lines 输出：每行一条推文"""
+
+    def __init__(self, path: str, buffer_size: int = 20):
+        super().__init__(path, buffer_size)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _write_records(self, records: List[Dict]):
+        self._file.write(''.join(json.dumps(r, ensure_ascii=False, default=json_default) + '\n' for r in records))
+
+
+class CsvSink(TweetSink):
+    """CSV 输出：UTF-8 BOM 编码，与 save_to_csv 一致，可在 Excel 中正常显示中文"""
+
+    def __init__(self, path: str, fieldnames: List[str], buffer_size: int = 20):
+        super().__init__(path, buffer_size)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='', encoding='utf-8-sig' if is_new else 'utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        if is_new:
+            self._writer.writeheader()
+
+    def _write_records(self, records: List[Dict]):
+        self._writer.writerows(records)
+
+
+def sort_output_file(path: str, reverse: bool = True):
+    """
+    按时间戳排序流式输出文件（可选的后处理步骤，需要将整个文件读入内存）
+
+    Args:
+        path: .jsonl 或 .csv 文件
+        reverse: True 为从新到旧，与 scrape_user_tweets 的默认排序一致
+    """
+    if path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        records.sort(key=lambda x: x.get('timestamp', ''), reverse=reverse)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    elif path.endswith('.csv'):
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames
+            records = list(reader)
+        records.sort(key=lambda x: x.get('timestamp', ''), reverse=reverse)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        raise ValueError(f"不支持的文件格式: {path}")
+    os.replace(tmp_path, path)
+
+
+def iter_output_records(path: str) -> Iterator[Dict]:
+    """逐条读取输出文件（.json / .jsonl / .csv）中的推文"""
+    if path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith('.csv'):
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
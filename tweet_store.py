@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 推文库
+所有爬取结果按推文去重写入同一个带索引的数据库，可以按账号、时间范围和互动数查询，
+需要文件时再按需导出 JSON / CSV
+
+用法:
+    python3 tweet_store.py import data/*.json data/*.csv    # 导入以前的输出文件
+    python3 tweet_store.py export elonmusk --format csv       # 导出某个账号的推文
+    python3 tweet_store.py accounts                          # 列出库中的账号
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from checkpoint import key_digest
+from tweet_sinks import TweetSink, CSV_FIELDNAMES, iter_output_records
+from timeline_capture import EXTRA_FIELDS
+
+
+# 导出文件目录（与 Web 历史记录读取的目录相同）
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+# 数据库放在 data/.state 中：WAL / shm 文件的创建和删除不改变 data 目录的 mtime（历史记录索引据此判断是否重新扫描）
+DEFAULT_STORE_PATH = os.path.join(DATA_DIR, '.state', 'tweets.db')
+# 以前版本的默认位置，首次打开时迁移到 DEFAULT_STORE_PATH
+LEGACY_STORE_PATH = os.path.join(DATA_DIR, 'tweets.db')
+
+# 推文字段（与 DOM / 网络捕获提取的字段一致）
+TWEET_COLUMNS = CSV_FIELDNAMES + EXTRA_FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    key TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    tweet_id TEXT,
+    text TEXT NOT NULL,
+    timestamp TEXT,
+    time_display TEXT,
+    likes INTEGER NOT NULL DEFAULT 0,
+    retweets INTEGER NOT NULL DEFAULT 0,
+    replies INTEGER NOT NULL DEFAULT 0,
+    quotes INTEGER,
+    views INTEGER,
+    author_id TEXT,
+    author TEXT,
+    first_scraped_at TEXT,
+    scraped_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tweets_username_timestamp ON tweets (username, timestamp);
+CREATE INDEX IF NOT EXISTS idx_tweets_timestamp ON tweets (timestamp);
+CREATE TABLE IF NOT EXISTS accounts (
+    username TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    oldest TEXT,
+    newest TEXT,
+    last_scraped TEXT
+);
+"""
+
+# 账号汇总表的版本（PRAGMA user_version）：以前的数据库打开时从 tweets 表重建一次汇总
+ACCOUNTS_VERSION = 1
+
+REBUILD_ACCOUNTS_SQL = """
+DELETE FROM accounts;
+INSERT INTO accounts (username, count, oldest, newest, last_scraped)
+SELECT username, COUNT(*), MIN(timestamp), MAX(timestamp), MAX(scraped_at) FROM tweets GROUP BY username;
+"""
+
+# 每次写入后按本批推文累加账号汇总：新增推文计数并扩展时间范围，已有推文只更新最近爬取时间
+# （SQLite 的多参数 MIN / MAX 遇到 NULL 返回 NULL，所以先用 COALESCE 补齐）
+UPDATE_ACCOUNT_SQL = """
+INSERT INTO accounts (username, count, oldest, newest, last_scraped)
+VALUES (:username, :count, :oldest, :newest, :last_scraped)
+ON CONFLICT (username) DO UPDATE SET
+    count = count + excluded.count,
+    oldest = MIN(COALESCE(oldest, excluded.oldest), COALESCE(excluded.oldest, oldest)),
+    newest = MAX(COALESCE(newest, excluded.newest), COALESCE(excluded.newest, newest)),
+    last_scraped = MAX(COALESCE(last_scraped, excluded.last_scraped), COALESCE(excluded.last_scraped, last_scraped))
+"""
+
+# 再次爬到同一条推文时更新互动数等可变字段，保留首次爬取时间
+UPSERT_SQL = """
+INSERT INTO tweets (key, username, tweet_id, text, timestamp, time_display, likes, retweets, replies,
+                    quotes, views, author_id, author, first_scraped_at, scraped_at)
+VALUES (:key, :username, :tweet_id, :text, :timestamp, :time_display, :likes, :retweets, :replies,
+        :quotes, :views, :author_id, :author, :scraped_at, :scraped_at)
+ON CONFLICT (key) DO UPDATE SET
+    likes = excluded.likes,
+    retweets = excluded.retweets,
+    replies = excluded.replies,
+    quotes = COALESCE(excluded.quotes, quotes),
+    views = COALESCE(excluded.views, views),
+    tweet_id = COALESCE(excluded.tweet_id, tweet_id),
+    author_id = COALESCE(excluded.author_id, author_id),
+    author = COALESCE(excluded.author, author),
+    scraped_at = excluded.scraped_at
+"""
+
+# 查询排序方式
+ORDER_BY = {
+    'newest': 'timestamp DESC',
+    'oldest': 'timestamp ASC',
+    'likes': 'likes DESC',
+    'retweets': 'retweets DESC',
+}
+
+# 导入时从文件名中取用户名，例如 elonmusk_20250101_120000.json
+OUTPUT_FILENAME_PATTERN = re.compile(r'^(.+)_\d{8}_\d{6}\.(json|jsonl|csv)$')
+
+
+def _migrate_legacy_store(path: str):
+    """把旧位置（data/tweets.db）的推文库连同 WAL / shm 文件移到新位置（新位置还没有数据库时）"""
+    if os.path.exists(path) or not os.path.exists(LEGACY_STORE_PATH):
+        return
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(LEGACY_STORE_PATH + suffix):
+            os.replace(LEGACY_STORE_PATH + suffix, path + suffix)
+
+
+def tweet_key(tweet: Dict) -> str:
+    """
+    推文的唯一键：有推文 ID 时用 ID（网络捕获和 DOM 提取都能取到，同一推文两种方式爬取的键相同），
+    否则用 timestamp + 正文的稳定哈希（没有推文链接的推文、以前不带 ID 的输出文件）
+    """
+    if tweet.get('tweet_id'):
+        return str(tweet['tweet_id'])
+    return 'h:' + key_digest(f"{tweet.get('timestamp', '')}_{tweet.get('text', '')}")
+
+
+def _account_updates(rows: Iterable[Dict], owners: Dict[str, str]) -> List[Dict]:
+    """
+    按账号汇总一批写入对账号汇总表的增量
+
+    新推文计入本批账号的数量和时间范围；已存在的推文时间戳不变，只更新其所属账号的最近爬取时间
+    """
+    updates = {}
+    for row in rows:
+        username = owners.get(row['key'], row['username'])
+        update = updates.setdefault(username, {'username': username, 'count': 0, 'oldest': None,
+                                               'newest': None, 'last_scraped': None})
+        update['last_scraped'] = max(update['last_scraped'] or row['scraped_at'], row['scraped_at'])
+        if row['key'] in owners:
+            continue
+        update['count'] += 1
+        timestamp = row['timestamp']
+        if timestamp is not None:
+            update['oldest'] = timestamp if update['oldest'] is None else min(update['oldest'], timestamp)
+            update['newest'] = timestamp if update['newest'] is None else max(update['newest'], timestamp)
+    return list(updates.values())
+
+
+def _to_int(value) -> Optional[int]:
+    """CSV 导入的数值为字符串，空值保持为 None"""
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TweetStore:
+    """
+    SQLite 推文库
+
+    每个线程使用自己的连接（WAL 模式，读写互不阻塞），多个爬取任务可以同时写入
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.abspath(path) == DEFAULT_STORE_PATH:
+            _migrate_legacy_store(DEFAULT_STORE_PATH)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute('PRAGMA user_version').fetchone()[0] < ACCOUNTS_VERSION:
+                conn.executescript(REBUILD_ACCOUNTS_SQL)
+                conn.execute(f'PRAGMA user_version = {ACCOUNTS_VERSION}')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def upsert_tweets(self, username: str, tweets: Iterable[Dict]) -> int:
+        """
+        在一个事务中批量写入推文，已存在的推文更新互动数，同时更新账号汇总
+
+        Returns:
+            新增的推文数
+        """
+        rows = []
+        for tweet in tweets:
+            row = {column: tweet.get(column) for column in TWEET_COLUMNS}
+            row['key'] = tweet_key(tweet)
+            row['username'] = username.lower()
+            row['tweet_id'] = row['tweet_id'] or None
+            for column in ('likes', 'retweets', 'replies'):
+                row[column] = _to_int(row[column]) or 0
+            for column in ('quotes', 'views'):
+                row[column] = _to_int(row[column])
+            row['scraped_at'] = row['scraped_at'] or datetime.now().isoformat()
+            rows.append(row)
+        if not rows:
+            return 0
+
+        # 同一批中重复的推文以最后一条为准（与 executemany 逐条 upsert 的结果一致）
+        latest = {row['key']: row for row in rows}
+        keys = list(latest)
+        conn = self._connect()
+        with conn:
+            # 已存在的推文保留原来的账号（例如转推以前按原作者写入过）
+            owners = {}
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                owners.update(conn.execute(
+                    'SELECT key, username FROM tweets WHERE key IN (%s)' % ','.join('?' * len(chunk)), chunk
+                ).fetchall())
+            conn.executemany(UPSERT_SQL, rows)
+            conn.executemany(UPDATE_ACCOUNT_SQL, _account_updates(latest.values(), owners))
+        return len(keys) - len(owners)
+
+    def _where(self, username: Optional[str], since: Optional[str], until: Optional[str],
+               min_likes: Optional[int]):
+        clauses, params = [], []
+        if username:
+            clauses.append('username = ?')
+            params.append(username.lower())
+        if since:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if until:
+            clauses.append('timestamp <= ?')
+            params.append(until)
+        if min_likes:
+            clauses.append('likes >= ?')
+            params.append(min_likes)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query_tweets(self, username: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, min_likes: Optional[int] = None,
+                     order: str = 'newest', limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        查询推文
+
+        Args:
+            username: 账号
+            since / until: 时间范围（ISO 格式，含边界）
+            min_likes: 最少点赞数
+            order: newest | oldest | likes | retweets
+            limit / offset: 分页
+        """
+        return list(self.iter_tweets(username, since, until, min_likes, order, limit, offset))
+
+    def iter_tweets(self, username: Optional[str] = None, since: Optional[str] = None,
+                    until: Optional[str] = None, min_likes: Optional[int] = None,
+                    order: str = 'newest', limit: Optional[int] = None, offset: int = 0) -> Iterator[Dict]:
+        """逐条返回查询结果（导出大量推文时不会一次性读入内存）"""
+        where, params = self._where(username, since, until, min_likes)
+        sql = f"SELECT * FROM tweets{where} ORDER BY {ORDER_BY.get(order, ORDER_BY['newest'])}"
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        for row in self._connect().execute(sql, params):
+            yield {column: row[column] for column in TWEET_COLUMNS}
+
+    def count_tweets(self, username: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, min_likes: Optional[int] = None) -> int:
+        where, params = self._where(username, since, until, min_likes)
+        return self._connect().execute(f'SELECT COUNT(*) FROM tweets{where}', params).fetchone()[0]
+
+    def latest_tweet(self, username: str) -> Optional[Dict]:
+        """账号最新的一条推文"""
+        tweets = self.query_tweets(username, limit=1)
+        return tweets[0] if tweets else None
+
+    def accounts(self) -> List[Dict]:
+        """
+        库中的账号及其推文数、时间范围和最近爬取时间（最近爬取的在前）
+
+        读取写入时维护的账号汇总表，耗时与账号数成正比，不扫描推文表
+        """
+        rows = self._connect().execute(
+            'SELECT username, count, oldest, newest, last_scraped FROM accounts ORDER BY last_scraped DESC'
+        )
+        return [dict(row) for row in rows]
+
+    def iter_export(self, fmt: str, **filters) -> Iterator[str]:
+        """
+        按需导出，逐块生成 JSON / CSV 文本
+
+        JSON 与 save_to_json 的格式一致（缩进的数组），CSV 带 UTF-8 BOM
+        """
+        if fmt == 'json':
+            yield '['
+            for i, tweet in enumerate(self.iter_tweets(**filters)):
+                yield (',\n  ' if i else '\n  ') + json.dumps(tweet, ensure_ascii=False)
+            yield '\n]\n'
+        elif fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=TWEET_COLUMNS)
+            buffer.write('\ufeff')
+            writer.writeheader()
+            for i, tweet in enumerate(self.iter_tweets(**filters), 1):
+                writer.writerow(tweet)
+                if i % 500 == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            raise ValueError(f"不支持的导出格式: {fmt}")
+
+    def export(self, path: str, fmt: Optional[str] = None, **filters) -> int:
+        """导出到文件，格式默认取文件扩展名，返回导出的推文数"""
+        fmt = fmt or os.path.splitext(path)[1][1:]
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            for chunk in self.iter_export(fmt, **filters):
+                f.write(chunk)
+        return self.count_tweets(**filters)
+
+    def import_file(self, path: str, username: Optional[str] = None) -> int:
+        """
+        导入以前的输出文件，用户名默认从文件名中取
+
+        Returns:
+            新增的推文数
+        """
+        if username is None:
+            match = OUTPUT_FILENAME_PATTERN.match(os.path.basename(path))
+            if not match:
+                raise ValueError(f"无法从文件名中识别用户名: {path}")
+            username = match.group(1)
+        added = 0
+        batch = []
+        for record in iter_output_records(path):
+            batch.append(record)
+            if len(batch) >= 1000:
+                added += self.upsert_tweets(username, batch)
+                batch = []
+        return added + self.upsert_tweets(username, batch)
+
+
+class StoreSink(TweetSink):
+    """将爬取过程中的推文批量写入推文库（每次刷新一个事务）"""
+
+    def __init__(self, store: TweetStore, username: str, buffer_size: int = 20):
+        super().__init__(store.path, buffer_size)
+        self.store = store
+        self.username = username
+        self.added = 0  # 库中原来没有的推文数
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self.added += self.store.upsert_tweets(self.username, self._buffer)
+        self.written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self.store.close()
+
+
+def main():
+    """推文库命令行：导入旧文件、导出、列出账号"""
+    parser = argparse.ArgumentParser(description='SQLite 推文库')
+    parser.add_argument('--db', default=DEFAULT_STORE_PATH, help='数据库路径')
+    subparsers = parser.add_subparsers(dest='command')
+
+    import_parser = subparsers.add_parser('import', help='导入以前的 JSON / JSONL / CSV 输出文件')
+    import_parser.add_argument('files', nargs='+')
+    import_parser.add_argument('-u', '--username', help='用户名（默认从文件名中取）')
+
+    export_parser = subparsers.add_parser('export', help='导出某个账号的推文')
+    export_parser.add_argument('username')
+    export_parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    export_parser.add_argument('--since', help='起始时间（ISO 格式）')
+    export_parser.add_argument('--until', help='结束时间（ISO 格式）')
+    export_parser.add_argument('-o', '--output', help='输出文件（默认 data/用户名_时间.格式）')
+
+    subparsers.add_parser('accounts', help='列出库中的账号')
+    args = parser.parse_args()
+
+    store = TweetStore(args.db)
+    if args.command == 'import':
+        total = 0
+        for path in args.files:
+            try:
+                added = store.import_file(path, args.username)
+            except (OSError, ValueError) as e:
+                print(f"跳过 {path}: {e}")
+                continue
+            total += added
+            print(f"{path}: 新增 {added} 条")
+        print(f"共新增 {total} 条推文")
+    elif args.command == 'export':
+        output = args.output or os.path.join(
+            DATA_DIR,
+            f"{args.username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.format}"
+        )
+        count = store.export(output, args.format, username=args.username, since=args.since, until=args.until)
+        print(f"已导出 {count} 条推文到: {output}")
+    elif args.command == 'accounts':
+        for account in store.accounts():
+            print(f"@{account['username']}: {account['count']} 条，{account['oldest']} ~ {account['newest']}，"
+                  f"最近爬取 {account['last_scraped']}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
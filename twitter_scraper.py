@@ -10,7 +10,7 @@ import json
 import csv
 import time
 import random
-import shutil
+import logging
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -20,16 +20,130 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, SessionNotCreatedException
 from fake_useragent import UserAgent
-from bs4 import BeautifulSoup
+
+from timeline_capture import NetworkCapture, parse_timeline_response, EXTRA_FIELDS
+from timeline_html import HTML_PARSERS, TIMELINE_SNAPSHOT_SCRIPT, parse_timeline_html, status_id
+from tweet_sinks import JsonLinesSink, CsvSink, CSV_FIELDNAMES, sort_output_file
+from checkpoint import ScrapeCheckpoint, key_digest, key_hash, load_watermark, save_watermark
+from tweet_store import StoreSink
+from history_index import record_export
+from scrape_metrics import ScrapeMetrics
+from tweet_record import Tweet, json_default
+from count_parser import parse_count, parse_counts
+from browser_profile import (DRIVER_PROFILES, STEALTH_ARGUMENTS, HIDE_WEBDRIVER_SCRIPT, apply_profile,
+                             prepare_driver, resource_usage)
+from driver_resolver import resolve_chromedriver, is_version_mismatch
+from parse_pipeline import ParsePipeline
+from log_config import ContextAdapter, configure_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# 用户主页所在站点（离线回放时指向本地替身服务器）
+DEFAULT_BASE_URL = 'https://x.com'
+
+# 批量提取脚本：一次 execute_script 取回页面上所有推文的字段，
+# 避免逐个元素、逐个字段地与 WebDriver 往返通信。
+# 每个已提取的节点会被写入 data-scraper-key 标记（推文链接），arguments[0] 为 true 时
+# 跳过标记与当前内容一致的节点，只提取上次扫描之后新增（或被复用为其他推文）的节点
+BATCH_EXTRACT_SCRIPT = """
+const onlyNew = arguments[0];
+const label = (root, testid) => {
+    const el = root.querySelector('[data-testid="' + testid + '"]');
+    return el ? (el.getAttribute('aria-label') || '0') : null;
+};
+const articles = document.querySelectorAll('[data-testid="tweet"]');
+const tweets = [];
+let skipped = 0;
+articles.forEach(article => {
+    const timeEl = article.querySelector('time');
+    const link = timeEl ? timeEl.closest('a') : null;
+    const key = (link && link.getAttribute('href')) || (timeEl && timeEl.getAttribute('datetime')) || '';
+    if (onlyNew && article.getAttribute('data-scraper-key') === key) {
+        skipped++;
+        return;
+    }
+    article.setAttribute('data-scraper-key', key);
+    const textEl = article.querySelector('[data-testid="tweetText"]');
+    const statusId = (link && link.getAttribute('href') || '').match(/\\/status\\/(\\d+)/);
+    tweets.push({
+        tweet_id: statusId ? statusId[1] : null,
+        social_context: !!article.querySelector('[data-testid="socialContext"]'),
+        text: textEl ? textEl.innerText : '',
+        timestamp: timeEl ? (timeEl.getAttribute('datetime') || '') : '',
+        time_display: timeEl ? timeEl.innerText : '',
+        like_label: label(article, 'like'),
+        retweet_label: label(article, 'retweet'),
+        reply_label: label(article, 'reply')
+    });
+});
+return {tweets: tweets, total: articles.length, skipped: skipped};
+"""
+
+# 统计页面上的推文节点数量（只返回一个整数，不序列化元素引用）
+TWEET_COUNT_SCRIPT = "return document.querySelectorAll('[data-testid=\"tweet\"]').length;"
+
+# 页面状态：[推文节点数, 页面高度]，用于判断滚动后是否加载了新内容
+PAGE_STATE_SCRIPT = "return [document.querySelectorAll('[data-testid=\"tweet\"]').length, document.body.scrollHeight];"
+
+# 事件驱动等待：用 MutationObserver 监听页面，推文节点数或页面高度与 arguments[0]、arguments[1]
+# 不同时立即返回 true，超过 arguments[2] 毫秒仍无变化返回 false（execute_async_script，单次往返）
+WAIT_FOR_CHANGE_SCRIPT = """
+const baseCount = arguments[0], baseHeight = arguments[1], timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const changed = () => document.querySelectorAll('[data-testid="tweet"]').length !== baseCount
+    || document.body.scrollHeight !== baseHeight;
+if (changed()) {
+    done(true);
+    return;
+}
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (changed()) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(true);
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(() => {
+    observer.disconnect();
+    done(false);
+}, timeoutMs);
+"""
+
+# 每个账号最多滚动的次数（快进且页面仍在增长的轮次不计入）
+MAX_SCROLL_ATTEMPTS = 20
+
+# 增量爬取：连续遇到这么多条不晚于上次最新推文的推文（不含置顶和转推）时，视为已到达上次的位置
+WATERMARK_OLDER_RUN = 2
+
+# 滚动到最后一个推文节点，页面上没有推文时返回 false
+SCROLL_TO_LAST_TWEET_SCRIPT = """
+const articles = document.querySelectorAll('[data-testid="tweet"]');
+if (!articles.length) {
+    return false;
+}
+articles[articles.length - 1].scrollIntoView({behavior: 'smooth', block: 'center'});
+return true;
+"""
 
 
 class TwitterScraper:
     """X（推特）推文爬虫类"""
     
-    def __init__(self, headless: bool = False, delay_range: tuple = (2, 5), progress_callback=None, control_callback=None):
+    def __init__(self, headless: bool = False, delay_range: tuple = (2, 5), progress_callback=None, control_callback=None,
+                 batch_extract: bool = True, capture_network: bool = False, capture_record_dir: Optional[str] = None,
+                 driver_pool=None, wait_mode: str = 'fixed', wait_timeout: float = 5.0,
+                 jitter_floor: tuple = (0, 0), stream_formats: Optional[List[str]] = None,
+                 stream_buffer_size: int = 20, keep_in_memory: Optional[bool] = None,
+                 sort_results: bool = True, sort_stream_output: bool = False, checkpoint_interval: int = 1,
+                 store=None, tweet_callback=None, base_url: str = DEFAULT_BASE_URL,
+                 html_parser: Optional[str] = None, pipeline: bool = False, parse_workers: int = 1,
+                 driver_profile: str = 'full', chromedriver_path: Optional[str] = None):
         """
         初始化爬虫
         
@@ -38,24 +152,116 @@ class TwitterScraper:
             delay_range: 随机延迟范围（秒）
             progress_callback: 进度回调函数，接受 (current, total, message) 参数
             control_callback: 控制回调函数，返回 (is_paused, is_cancelled) 元组
+            batch_extract: 是否使用批量提取模式（一次脚本调用提取整页推文），失败时自动回退到逐元素提取
+            capture_network: 是否启用网络捕获模式（从时间线 GraphQL 响应解析推文，获得真实 ID 和精确计数），
+                             未捕获到响应时自动回退到 DOM 提取
+            capture_record_dir: 网络捕获模式下保存原始响应的目录，用于离线回放
+            driver_pool: 浏览器驱动池（DriverPool），指定时从池中借用热驱动，close() 时归还而不是退出
+            wait_mode: 等待模式，'fixed' 为固定随机延迟；'adaptive' 为事件驱动等待，
+                       新推文节点出现或页面高度变化时立即返回
+            wait_timeout: adaptive 模式下等待新内容的最长时间（秒）
+            jitter_floor: adaptive 模式下每次等待的最短随机时长范围（秒），模拟人工节奏，(0, 0) 表示不加
+            stream_formats: 流式输出格式列表（'jsonl'、'csv'），每条新推文在收集时即追加写入 data 目录
+            stream_buffer_size: 流式输出的缓冲条数，缓冲满或每轮结束时写入并刷新到磁盘
+            keep_in_memory: 是否在 tweets_data 中保留全部推文；默认流式输出时不保留，内存只占用缓冲
+            sort_results: 爬取结束时是否按时间戳排序内存中的推文
+            sort_stream_output: 爬取结束时是否按时间戳重排流式输出文件（需读入整个文件）
+            checkpoint_interval: 流式输出时每隔多少轮滚动写一次检查点，0 表示不写
+            store: TweetStore 推文库，每轮滚动结束时把新推文批量写入（按推文去重，跨次爬取累积）
+            tweet_callback: 推文回调函数，每收集到一条去重后的新推文时以推文字典调用
+            base_url: 用户主页所在站点，默认 https://x.com；离线回放时指向本地替身服务器（benchmarks/replay.py）
+            html_parser: HTML 快照解析器（'lxml' 或 'html.parser'）：指定时每轮只取回一次新增推文节点的 HTML，
+                         在 Python 中解析；快照失败时回退到批量提取脚本和逐元素提取。
+                         默认的批量提取脚本在爬取线程上更快，快照解析只在需要减少页面内脚本工作时使用
+            pipeline: 流水线模式：每轮取回的 HTML 快照（或网络响应）交给解析线程，浏览器同时滚动和等待，
+                      解析耗时隐藏在等待中；未指定 html_parser 时使用 lxml
+            parse_workers: 流水线模式下的解析线程数
+            driver_profile: 浏览器配置档，'full' 为完整浏览器；'lean' 不下载图片、视频和字体，
+                            关闭不需要的浏览器功能，窗口更小（见 browser_profile.py）
+            chromedriver_path: 固定的 ChromeDriver 路径，指定时不检测版本、不联网；
+                               默认按 driver_resolver.py 的顺序解析并缓存
         """
+        if html_parser and html_parser not in HTML_PARSERS:
+            raise ValueError(f"不支持的 HTML 解析器: {html_parser}")
+        if driver_profile not in DRIVER_PROFILES:
+            raise ValueError(f"不支持的浏览器配置档: {driver_profile}")
         self.headless = headless
         self.delay_range = delay_range
+        self.batch_extract = batch_extract
+        self.html_parser = html_parser or ('lxml' if pipeline else None)
+        self.pipeline = pipeline
+        self.parse_workers = parse_workers
+        self.driver_profile = driver_profile
+        self.chromedriver_path = chromedriver_path or None
+        self.browser_usage = {}  # 本次爬取结束时页面的资源用量（下载字节数、JS 堆等）
+        self.network_capture = NetworkCapture(capture_record_dir) if capture_network else None
+        self.driver_pool = driver_pool
+        self.wait_mode = wait_mode
+        self.wait_timeout = wait_timeout
+        self.jitter_floor = jitter_floor
+        self.stream_formats = stream_formats or []
+        self.stream_buffer_size = stream_buffer_size
+        self.keep_in_memory = not self.stream_formats if keep_in_memory is None else keep_in_memory
+        self.sort_results = sort_results
+        self.sort_stream_output = sort_stream_output
+        self.checkpoint_interval = checkpoint_interval
+        self.store = store
+        self.store_added = 0  # 本次写入推文库的推文中，库里原来没有的数量
+        self.checkpoint = None
+        self.reached_last_run = False  # 增量爬取是否到达了上次保存的最新推文
+        self.error = None  # 本次爬取中途中断的异常（流式输出和推文库模式下已收集的推文不代表成功）
+        self._newest_stored = ('', '')  # 本次保存的最新推文 (timestamp, 去重键)
+        self.sinks = []
+        self.stream_files = []  # 本次爬取的流式输出文件路径
+        self.tweets_collected = 0  # 本次爬取收集到的推文数（不保留在内存时也准确）
         self.driver = None
         self.tweets_data = []
         self.username = None  # 保存当前爬取的用户名
         self.progress_callback = progress_callback  # 保存进度回调函数
         self.control_callback = control_callback  # 保存控制回调函数
+        self.tweet_callback = tweet_callback  # 保存推文回调函数
+        self.base_url = base_url.rstrip('/')
+        self.log = ContextAdapter(logger, {'username': None})  # 日志附带当前爬取的用户名
+        
+        # 增量扫描统计：扫描到的节点数、跳过的已处理节点数、实际提取的节点数
+        self.scan_stats = {'elements_scanned': 0, 'elements_skipped': 0, 'elements_extracted': 0}
+        
+        # 分阶段计时和计数（驱动准备、页面加载、等待、滚动、提取、处理、保存），每次爬取重新开始
+        self.metrics = ScrapeMetrics()
+        
+        # 等待记录：每次等待的轮次、阶段、实际耗时，以及 adaptive 模式下是否检测到新内容
+        self.wait_records = []
+        self.current_round = 0
+        self._async_wait_supported = True
         
         # 创建 data 目录
         self.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
-            print(f"已创建数据目录: {self.data_dir}")
+            self.log.info("已创建数据目录: %s", self.data_dir)
+        self.checkpoint_dir = os.path.join(self.data_dir, 'checkpoints')
         
     def setup_driver(self) -> webdriver.Chrome:
-        """设置Chrome浏览器驱动"""
-        print("正在设置浏览器驱动...")
+        """设置Chrome浏览器驱动（配置了驱动池时优先复用池中已启动的驱动）"""
+        if self.driver_pool:
+            self.driver = self.driver_pool.acquire(self.driver_profile_key(), self._launch_driver)
+            if self.network_capture:
+                # 丢弃复用驱动中上一个任务遗留的性能日志
+                try:
+                    self.driver.get_log('performance')
+                except Exception:
+                    pass
+        else:
+            self.driver = self._launch_driver()
+        return self.driver
+    
+    def driver_profile_key(self) -> tuple:
+        """驱动配置键：启动参数相同的驱动才能在池中复用"""
+        return (self.headless, self.network_capture is not None, self.driver_profile)
+    
+    def _launch_driver(self) -> webdriver.Chrome:
+        """启动并配置一个新的Chrome浏览器驱动"""
+        self.log.info("正在设置浏览器驱动...")
         
         # Chrome选项配置
         chrome_options = Options()
@@ -64,9 +270,8 @@ class TwitterScraper:
             chrome_options.add_argument('--headless')
             
         # 反检测配置
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        for argument in STEALTH_ARGUMENTS:
+            chrome_options.add_argument(argument)
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
@@ -74,133 +279,150 @@ class TwitterScraper:
         ua = UserAgent()
         chrome_options.add_argument(f'--user-agent={ua.random}')
         
-        # 窗口大小
-        chrome_options.add_argument('--window-size=1920,1080')
+        # 窗口大小；精简配置档另外屏蔽图片、媒体和字体
+        apply_profile(chrome_options, self.driver_profile)
         
-        # 创建驱动 - 添加重试机制和更好的错误处理
-        max_retries = 3
-        for attempt in range(max_retries):
+        # 网络捕获模式需要 DevTools 性能日志
+        if self.network_capture:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
+        # 创建驱动：驱动路径按 固定路径 -> 进程内结果 -> 本机缓存 -> PATH -> webdriver-manager 解析，
+        # 只有最后一步需要联网；浏览器报告驱动版本不匹配时刷新一次缓存
+        for attempt in range(2):
             try:
-                print(f"尝试安装 ChromeDriver (第 {attempt + 1} 次)...")
-                
-                # 使用 webdriver-manager 安装 ChromeDriver
-                driver_path = ChromeDriverManager().install()
-                print(f"webdriver-manager 返回路径: {driver_path}")
-                
-                # 修复路径问题 - 查找实际的 chromedriver 可执行文件
-                if 'THIRD_PARTY_NOTICES' in driver_path or not driver_path.endswith('chromedriver'):
-                    # 在同一目录下查找真正的 chromedriver 文件
-                    driver_dir = os.path.dirname(driver_path)
-                    possible_paths = [
-                        os.path.join(driver_dir, 'chromedriver'),
-                        os.path.join(driver_dir, 'chromedriver-mac-arm64'),
-                        os.path.join(driver_dir, 'chromedriver-mac-x64')
-                    ]
-                    
-                    actual_driver_path = None
-                    for path in possible_paths:
-                        if os.path.exists(path):
-                            # 先设置执行权限，然后检查
-                            os.chmod(path, 0o755)
-                            if os.access(path, os.X_OK):
-                                actual_driver_path = path
-                                break
-                    
-                    if actual_driver_path:
-                        driver_path = actual_driver_path
-                        print(f"找到实际的 ChromeDriver: {driver_path}")
-                    else:
-                        # 列出目录内容以调试
-                        print(f"目录内容: {os.listdir(driver_dir)}")
-                        raise FileNotFoundError(f"在 {driver_dir} 中找不到可执行的 chromedriver")
-                
-                # 检查文件是否存在且可执行
-                if not os.path.exists(driver_path):
-                    raise FileNotFoundError(f"ChromeDriver 文件不存在: {driver_path}")
-                
-                # 在 macOS 上设置执行权限
-                if os.name != 'nt':  # 非 Windows 系统
-                    os.chmod(driver_path, 0o755)
-                    print(f"已设置 ChromeDriver 执行权限")
-                
-                service = Service(driver_path)
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                
-                # 执行反检测脚本
-                driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                
-                self.driver = driver
-                print("浏览器驱动设置成功！")
-                return driver
-                
-            except Exception as e:
-                print(f"第 {attempt + 1} 次尝试失败: {e}")
-                if attempt < max_retries - 1:
-                    print("正在重试...")
-                    # 清理可能损坏的缓存
-                    import shutil
-                    wdm_cache = os.path.expanduser("~/.wdm")
-                    if os.path.exists(wdm_cache):
-                        shutil.rmtree(wdm_cache)
-                        print("已清理 webdriver-manager 缓存")
-                    time.sleep(2)
-                else:
-                    print("所有尝试都失败了，请检查 Chrome 浏览器是否已安装")
-                    raise e
+                driver_path = resolve_chromedriver(self.chromedriver_path, refresh=attempt > 0)
+            except FileNotFoundError as e:
+                self.log.error("启动浏览器失败: %s", e)
+                raise
+            self.log.debug("ChromeDriver 路径: %s", driver_path)
+            try:
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            except SessionNotCreatedException as e:
+                if attempt == 0 and not self.chromedriver_path and is_version_mismatch(e):
+                    self.log.warning("ChromeDriver 与 Chrome 版本不匹配，重新解析驱动: %s", e.msg)
+                    continue
+                self.log.error("启动浏览器失败，请检查 Chrome 浏览器是否已安装: %s", e.msg)
+                raise
+            
+            # 执行反检测脚本
+            driver.execute_script(HIDE_WEBDRIVER_SCRIPT)
+            prepare_driver(driver, self.driver_profile)
+            
+            self.log.info("浏览器驱动设置成功！")
+            return driver
     
     def random_delay(self, min_delay: Optional[float] = None, max_delay: Optional[float] = None):
         """随机延迟"""
+        time.sleep(self._delay_seconds(min_delay, max_delay))
+    
+    def _delay_seconds(self, min_delay: Optional[float], max_delay: Optional[float]) -> float:
+        """随机延迟时长（未指定范围时使用 delay_range）"""
         if min_delay is None:
             min_delay = self.delay_range[0]
         if max_delay is None:
             max_delay = self.delay_range[1]
             
         delay = random.uniform(min_delay, max_delay)
-        print(f"等待 {delay:.2f} 秒...")
-        time.sleep(delay)
+        self.log.debug("等待 %.2f 秒...", delay)
+        return delay
+    
+    def wait(self, phase: str, min_delay: float, max_delay: float, baseline: Optional[tuple] = None) -> Optional[bool]:
+        """
+        统一的等待入口，并记录实际等待时长
+        
+        Args:
+            phase: 等待阶段（page_load / scroll / scroll_back / settle），写入 wait_records
+            min_delay, max_delay: fixed 模式下的随机延迟范围
+            baseline: adaptive 模式下的页面状态基线 (推文节点数, 页面高度)，给定时等待页面发生变化
+            
+        Returns:
+            adaptive 模式下给定 baseline 时返回是否检测到新内容，否则返回 None
+        """
+        start = time.monotonic()
+        changed = None
+        with self.metrics.timer('wait'):
+            if self.wait_mode == 'adaptive':
+                if baseline is not None:
+                    changed = self.wait_for_page_change(baseline, self.wait_timeout)
+                # 满足操作员配置的最短随机等待
+                remaining = random.uniform(*self.jitter_floor) - (time.monotonic() - start)
+                if remaining > 0:
+                    time.sleep(remaining)
+            else:
+                self.random_delay(min_delay, max_delay)
+        
+        self._record_wait(phase, start, changed)
+        return changed
+    
+    def _record_wait(self, phase: str, start: float, changed: Optional[bool]):
+        self.wait_records.append({
+            'round': self.current_round,
+            'phase': phase,
+            'seconds': round(time.monotonic() - start, 3),
+            'changed': changed
+        })
+    
+    def wait_for_page_change(self, baseline: tuple, timeout: float) -> bool:
+        """等待推文节点数或页面高度相对 baseline 发生变化，超时返回 False"""
+        base_count, base_height = baseline
+        if self._async_wait_supported:
+            try:
+                self.driver.set_script_timeout(timeout + 5)
+                return bool(self.driver.execute_async_script(
+                    WAIT_FOR_CHANGE_SCRIPT, base_count, base_height, int(timeout * 1000)))
+            except Exception as e:
+                self.log.warning("MutationObserver 等待不可用，改为轮询: %s", e)
+                self._async_wait_supported = False
+        
+        # 轮询回退：每 0.2 秒检查一次页面状态
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if tuple(self.driver.execute_script(PAGE_STATE_SCRIPT)) != (base_count, base_height):
+                return True
+            time.sleep(0.2)
+        return False
     
     def scroll_page(self, scrolls: int = 3):
         """模拟滚动页面加载更多内容"""
-        print(f"正在滚动页面加载更多内容...")
+        self.log.debug("正在滚动页面加载更多内容...")
         
         for i in range(scrolls):
-            # 获取当前页面高度
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
+            self.metrics.count('scrolls')
+            # 获取当前推文节点数和页面高度
+            last_count, last_height = self.driver.execute_script(PAGE_STATE_SCRIPT)
             
-            # 尝试滚动到最后一个推文元素的位置
-            try:
-                last_tweet = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')[-1]
-                self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", last_tweet)
-                print(f"  滚动 {i+1}/{scrolls}: 滚动到最后一个推文...")
-            except:
+            # 尝试滚动到最后一个推文元素的位置（在页面内完成，不取回全部元素引用）
+            if self.driver.execute_script(SCROLL_TO_LAST_TWEET_SCRIPT):
+                self.log.debug("  滚动 %d/%d: 滚动到最后一个推文...", i + 1, scrolls)
+            else:
                 # 如果失败，就滚动到页面底部
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                print(f"  滚动 {i+1}/{scrolls}: 滚动到底部...")
+                self.log.debug("  滚动 %d/%d: 滚动到底部...", i + 1, scrolls)
             
-            # 等待新内容加载
-            self.random_delay(2, 4)
+            # 等待新内容加载（adaptive 模式下新内容出现即返回）
+            changed = self.wait('scroll', 2, 4, baseline=(last_count, last_height))
             
             # 检查页面高度是否改变（说明加载了新内容）
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
+            new_count, new_height = self.driver.execute_script(PAGE_STATE_SCRIPT)
             if new_height > last_height:
-                print(f"  ✓ 页面高度增加: {last_height} -> {new_height}")
+                self.log.debug("  ✓ 页面高度增加: %s -> %s", last_height, new_height)
             else:
-                print(f"  ⚠ 页面高度未变化，可能已到底部")
+                self.log.debug("  ⚠ 页面高度未变化，可能已到底部")
+            
+            # adaptive 模式下超时仍无新内容，本轮不再继续滚动
+            if changed is False:
+                break
             
             # 稍微往回滚一点，模拟真实浏览行为
             if i < scrolls - 1:  # 最后一次不往回滚
                 self.driver.execute_script("window.scrollBy(0, -300);")
-                self.random_delay(0.5, 1)
+                self.wait('scroll_back', 0.5, 1)
     
-    def extract_tweet_data(self, tweet_element) -> Optional[Dict]:
+    def extract_tweet_data(self, tweet_element) -> Optional[Tweet]:
         """从推文元素中提取数据"""
         try:
             tweet_data = {}
             
-            # 获取推文HTML
-            tweet_html = tweet_element.get_attribute('innerHTML')
-            soup = BeautifulSoup(tweet_html, 'html.parser')
-            
             # 提取推文文本
             text_elements = tweet_element.find_elements(By.CSS_SELECTOR, '[data-testid="tweetText"]')
             if text_elements:
@@ -244,185 +466,698 @@ class TwitterScraper:
                     tweet_data['replies'] = 0
                     
             except Exception as e:
-                print(f"提取互动数据时出错: {e}")
+                self.log.debug("提取互动数据时出错: %s", e)
                 tweet_data['likes'] = 0
                 tweet_data['retweets'] = 0
                 tweet_data['replies'] = 0
             
+            # 推文 ID：第一个推文链接（发布时间的链接）中的 ID
+            status_links = tweet_element.find_elements(By.CSS_SELECTOR, 'a[href*="/status/"]')
+            tweet_data['tweet_id'] = status_id(status_links[0].get_attribute('href')) if status_links else None
+            
+            # 置顶、转推的推文带有社交上下文
+            tweet_data['social_context'] = bool(
+                tweet_element.find_elements(By.CSS_SELECTOR, '[data-testid="socialContext"]'))
+            
             # 添加爬取时间
             tweet_data['scraped_at'] = datetime.now().isoformat()
             
-            return tweet_data
+            return Tweet(**tweet_data)
             
         except Exception as e:
-            print(f"提取推文数据时出错: {e}")
+            self.log.warning("提取推文数据时出错: %s", e)
             return None
     
-    def extract_number_from_text(self, text: str) -> int:
-        """从文本中提取数字"""
+    def extract_tweets_batch(self, only_new: bool = False) -> Optional[List[Tweet]]:
+        """
+        批量提取当前页面上所有推文的数据（单次 WebDriver 往返）
+        
+        Args:
+            only_new: 只提取上次扫描之后新增的推文节点，已处理的节点计入 scan_stats 的跳过数
+            
+        Returns:
+            推文数据列表，字段与 extract_tweet_data 一致；脚本执行失败时返回 None，
+            调用方应回退到逐元素提取
+        """
         try:
-            # 处理包含K、M等单位的数字
-            text = text.lower().replace(',', '')
-            if 'k' in text:
-                number = float(text.replace('k', '')) * 1000
-            elif 'm' in text:
-                number = float(text.replace('m', '')) * 1000000
-            else:
-                # 提取纯数字
-                import re
-                numbers = re.findall(r'\d+', text)
-                number = int(numbers[0]) if numbers else 0
-            return int(number)
-        except:
-            return 0
-    
-    def scrape_user_tweets(self, username: str, max_tweets: int = 50) -> List[Dict]:
+            result = self.driver.execute_script(BATCH_EXTRACT_SCRIPT, only_new)
+        except Exception as e:
+            self.log.warning("批量提取推文失败，将回退到逐元素提取: %s", e)
+            return None
+        return self._tweets_from_batch(result)
+    
+    def _tweets_from_batch(self, result) -> Optional[List[Tweet]]:
+        """批量提取脚本的返回值转为推文数据，更新扫描统计；返回值不合法时返回 None"""
+        if not isinstance(result, dict) or not isinstance(result.get('tweets'), list):
+            return None
+        
+        raw_tweets = result['tweets']
+        self.scan_stats['elements_scanned'] += result.get('total', len(raw_tweets))
+        self.scan_stats['elements_skipped'] += result.get('skipped', 0)
+        self.scan_stats['elements_extracted'] += len(raw_tweets)
+        return self._tweets_from_raw(raw_tweets)
+    
+    def extract_tweets_from_html(self, processed_keys: Optional[set] = None) -> Optional[List[Tweet]]:
+        """
+        取回一次时间线 HTML 快照，在 Python 中解析推文（单次 WebDriver 往返，解析不占用浏览器）
+        
+        Args:
+            processed_keys: 已处理推文的链接集合，给定时只取回上次快照之后新增的推文节点，
+                            跳过其中的推文并把新推文加入集合；不给定时解析页面上的全部推文
+            
+        Returns:
+            推文数据列表，字段与 extract_tweet_data 一致；取回或解析失败时返回 None，
+            调用方应回退到脚本提取
+        """
+        snapshot = self._capture_html(only_new=processed_keys is not None)
+        parsed = self._parse_snapshot(snapshot) if snapshot is not None else None
+        if parsed is None:
+            return None
+        return self._take_new(parsed[0], processed_keys, parsed[2])
+    
+    def _capture_html(self, only_new: bool = True) -> Optional[tuple]:
+        """取回时间线 HTML 快照（爬取线程，默认只取回新增的推文节点），失败时返回 None"""
+        try:
+            return 'html', self.driver.execute_script(TIMELINE_SNAPSHOT_SCRIPT, only_new), None
+        except Exception as e:
+            self.log.warning("取回 HTML 快照失败，将回退到脚本提取: %s", e)
+            return None
+    
+    def _capture_snapshot(self, use_network: bool) -> tuple:
+        """
+        流水线模式下取回本轮的原始数据（爬取线程，只与浏览器通信，不解析）
+        
+        Returns:
+            (原始数据 或 None, 是否继续使用网络捕获)；原始数据为 (类型, 内容, 页面推文节点数)
+        """
+        if use_network:
+            payloads = self.network_capture.poll(self.driver)
+            if self.network_capture.responses_captured:
+                return ('network', payloads, self.driver.execute_script(TWEET_COUNT_SCRIPT)), True
+            self.log.warning("⚠️  未捕获到时间线响应，本次回退到 DOM 提取")
+        return self._capture_html(), False
+    
+    def _parse_snapshot(self, snapshot: tuple) -> Optional[tuple]:
+        """
+        解析原始数据（可在解析线程中调用：只读取配置，不修改爬虫状态）
+        
+        Returns:
+            ([(去重标记, 推文数据), ...], 页面推文节点数, 页面中已取回过而跳过的节点数)；
+            取回结果不合法或解析失败时返回 None
+        """
+        kind, content, elements_count = snapshot
+        try:
+            if kind == 'network':
+                tweets = [tweet for payload in content for tweet in parse_timeline_response(payload)]
+                return [(None, tweet) for tweet in tweets], elements_count, 0
+            if not isinstance(content, dict):
+                return None
+            raw_tweets = parse_timeline_html(content.get('html'), self.html_parser)
+        except Exception as e:
+            self.log.warning("HTML 快照解析失败，将回退到脚本提取: %s", e)
+            return None
+        keys = [raw['key'] for raw in raw_tweets]
+        return (list(zip(keys, self._tweets_from_raw(raw_tweets))),
+                content.get('total', len(raw_tweets)), content.get('skipped', 0))
+    
+    def _take_new(self, parsed: List[tuple], processed_keys: Optional[set], page_skipped: int = 0) -> List[Tweet]:
+        """跳过已处理的推文（按推文链接），更新扫描统计（爬取线程）"""
+        if parsed and parsed[0][0] is None:  # 网络响应没有节点标记，由推文 ID 去重
+            return [tweet for _, tweet in parsed]
+        new_tweets = []
+        for key, tweet in parsed:
+            if processed_keys is not None:
+                if key and key in processed_keys:
+                    continue
+                processed_keys.add(key)
+            new_tweets.append(tweet)
+        self.scan_stats['elements_scanned'] += len(parsed) + page_skipped
+        self.scan_stats['elements_skipped'] += len(parsed) + page_skipped - len(new_tweets)
+        self.scan_stats['elements_extracted'] += len(new_tweets)
+        return new_tweets
+    
+    def _collect_parsed(self, pending, processed_element_ids: set) -> tuple:
+        """
+        取回解析线程的结果并筛出新推文；取回或解析失败时在当前页面上回退到 DOM 提取
+        
+        Returns:
+            (推文数据可迭代对象, 页面上的推文元素总数)
+        """
+        result = pending.result() if pending is not None else None
+        if result is None:
+            return self._extract_dom_tweets(processed_element_ids)
+        parsed, elements_count, page_skipped = result
+        return self._take_new(parsed, processed_element_ids, page_skipped), elements_count
+    
+    def _tweets_from_raw(self, raw_tweets: List[Dict]) -> List[Tweet]:
+        """把批量脚本或 HTML 解析得到的原始字段转为推文数据（换算互动数）"""
+        scraped_at = datetime.now().isoformat()
+        tweets = []
+        for raw in raw_tweets:
+            likes, retweets, replies = parse_counts(raw.get('like_label'), raw.get('retweet_label'),
+                                                    raw.get('reply_label'))
+            tweets.append(Tweet(
+                text=raw.get('text') or "",
+                timestamp=raw.get('timestamp') or "",
+                time_display=raw.get('time_display') or "",
+                likes=likes,
+                retweets=retweets,
+                replies=replies,
+                scraped_at=scraped_at,
+                tweet_id=raw.get('tweet_id') or None,
+                social_context=bool(raw.get('social_context'))
+            ))
+        return tweets
+    
+    def extract_tweets_from_network(self) -> List[Tweet]:
+        """从上次调用之后捕获到的时间线响应中解析推文"""
+        tweets = []
+        for payload in self.network_capture.poll(self.driver):
+            tweets.extend(parse_timeline_response(payload))
+        return tweets
+    
+    def extract_number_from_text(self, text: str) -> int:
+        """从文本中提取数字（支持 K/M/B、万/亿 等单位和各地区的分隔符，见 count_parser）"""
+        return parse_count(text)
+    
+    def scrape_user_tweets(self, username: str, max_tweets: int = 50, resume: bool = False,
+                           since_last_run: bool = False) -> List[Tweet]:
         """
         爬取指定用户的推文
         
         Args:
             username: 用户名（不包含@符号）
             max_tweets: 最大爬取推文数量
+            resume: 从上次未完成的检查点继续（需要流式输出）：已收集的推文计入数量并跳过，
+                    输出继续追加到上次的文件
+            since_last_run: 增量爬取：只收集上次保存的最新推文之后发布的推文，到达该推文即停止滚动
             
         Returns:
-            推文数据列表
+            推文记录列表（Tweet，只读的字典接口，可以 tweet['text'] 读取；需要修改时先用 to_dict() 转为字典）
         """
+        self.metrics = ScrapeMetrics()
+        self.metrics.start()
         if not self.driver:
-            self.setup_driver()
+            with self.metrics.timer('driver_setup'):
+                self.setup_driver()
         
-        # 保存用户名，用于后续文件命名
-        self.username = username
-        
-        print(f"开始爬取用户 @{username} 的推文...")
+        self._begin_run(username, resume, since_last_run)
         
         # 访问用户主页
-        url = f"https://x.com/{username}"
-        print(f"正在访问: {url}")
+        url = f"{self.base_url}/{username}"
+        self.log.info("正在访问: %s", url)
         
+        pipeline = None
         try:
-            self.driver.get(url)
-            self.random_delay(3, 6)
-            
-            # 等待页面加载
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
-            )
+            with self.metrics.timer('page_load'):
+                self.driver.get(url)
+                # adaptive 模式下由下面的 WebDriverWait 等待首条推文出现
+                self.wait('page_load', 3, 6)
+                
+                # 等待页面加载
+                WebDriverWait(self.driver, 20).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+                )
             
             # 初始化进度
             if self.progress_callback:
                 self.progress_callback(0, max_tweets, "页面加载完成，开始爬取推文...")
             
-            tweets_collected = 0
+            rounds = 0
             scroll_attempts = 0
-            max_scroll_attempts = 20  # 增加滚动次数
-            no_new_tweets_count = 0  # 连续没有新推文的次数
             
-            # 用于去重的集合（使用timestamp+text的组合）
-            seen_tweets = set()
+            # 增量扫描：回退路径下记录已处理过的 WebElement（同一会话内 id 稳定）
+            processed_element_ids = set()
             
-            while tweets_collected < max_tweets and scroll_attempts < max_scroll_attempts:
+            use_network = self.network_capture is not None
+            cancelled = False
+            fast_forward = False
+            # 流水线模式：本轮快照交给解析线程，滚动和等待下一批内容时解析在后台进行
+            if self.pipeline:
+                pipeline = ParsePipeline(self._parse_snapshot, self.parse_workers)
+            
+            while self.tweets_collected < max_tweets and scroll_attempts < MAX_SCROLL_ATTEMPTS:
                 # 检查控制标志（暂停/取消）
                 if self.control_callback:
                     is_paused, is_cancelled = self.control_callback()
                     
                     # 如果被取消，立即退出
                     if is_cancelled:
-                        print("\n❌ 爬取任务已被取消")
+                        self.log.warning("❌ 爬取任务已被取消")
+                        cancelled = True
                         break
                     
                     # 如果被暂停，等待恢复
-                    while is_paused:
-                        print("⏸️  任务已暂停，等待恢复...")
-                        time.sleep(1)
-                        is_paused, is_cancelled = self.control_callback()
-                        if is_cancelled:
-                            print("\n❌ 爬取任务已被取消")
-                            break
+                    with self.metrics.timer('paused'):
+                        while is_paused:
+                            self.log.info("⏸️  任务已暂停，等待恢复...")
+                            time.sleep(1)
+                            is_paused, is_cancelled = self.control_callback()
+                            if is_cancelled:
+                                self.log.warning("❌ 爬取任务已被取消")
+                                break
                     
                     # 如果在暂停期间被取消，退出
                     if is_cancelled:
+                        cancelled = True
                         break
                 
-                print(f"\n=== 第 {scroll_attempts + 1} 轮爬取 ===")
-                print(f"已收集 {tweets_collected}/{max_tweets} 条推文")
-                
-                # 查找推文元素
-                tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')
-                print(f"当前页面共找到 {len(tweet_elements)} 个推文元素")
-                
-                # 提取新推文 - 遍历所有元素，使用去重集合来避免重复
-                new_tweets_in_this_scroll = 0
-                for tweet_element in tweet_elements:
-                    if tweets_collected >= max_tweets:
-                        break
-                        
-                    tweet_data = self.extract_tweet_data(tweet_element)
-                    if tweet_data and tweet_data['text'].strip():
-                        # 使用 timestamp + text 作为唯一标识
-                        tweet_id = f"{tweet_data.get('timestamp', '')}_{tweet_data['text']}"
-                        
-                        # 检查是否已经收集过这条推文
-                        if tweet_id not in seen_tweets:
-                            seen_tweets.add(tweet_id)
-                            self.tweets_data.append(tweet_data)
-                            tweets_collected += 1
-                            new_tweets_in_this_scroll += 1
-                            print(f"  ✓ 新推文 #{tweets_collected}: {tweet_data['text'][:50]}...")
-                            
-                            # 更新进度
-                            if self.progress_callback:
-                                self.progress_callback(tweets_collected, max_tweets, f"正在爬取推文...已收集 {tweets_collected}/{max_tweets} 条")
+                rounds += 1
+                self.current_round = rounds
+                self.metrics.count('rounds')
+                self.log.debug("=== 第 %d 轮爬取 === 已收集 %d/%d 条推文", rounds, self.tweets_collected, max_tweets)
                 
-                print(f"→ 本轮收集到 {new_tweets_in_this_scroll} 条新推文")
+                # 提取推文 - 网络捕获模式直接解析时间线响应，否则从 DOM 提取新增节点
+                page_tweets = None
+                if pipeline is not None:
+                    with self.metrics.timer('extract'):
+                        snapshot, use_network = self._capture_snapshot(use_network)
+                        pending = pipeline.submit(snapshot) if snapshot is not None else None
+                    self._log_scroll_start(max_tweets)
+                    new_elements_count = self._scroll_for_more(settle=not fast_forward)
+                    with self.metrics.timer('extract'):
+                        skipped_before = self.scan_stats['elements_skipped']
+                        page_tweets, elements_count = self._collect_parsed(pending, processed_element_ids)
+                        round_skipped = self.scan_stats['elements_skipped'] - skipped_before
+                        self.log.debug("当前页面共找到 %d 个推文元素，跳过 %d 个已处理元素", elements_count, round_skipped)
+                else:
+                    with self.metrics.timer('extract'):
+                        if use_network:
+                            page_tweets = self.extract_tweets_from_network()
+                            if self.network_capture.responses_captured == 0:
+                                self.log.warning("⚠️  未捕获到时间线响应，本次回退到 DOM 提取")
+                                use_network = False
+                                page_tweets = None
+                            else:
+                                elements_count = self.driver.execute_script(TWEET_COUNT_SCRIPT)
+                                self.log.debug("从时间线响应中解析到 %d 条推文", len(page_tweets))
+                    
+                        if page_tweets is None:
+                            skipped_before = self.scan_stats['elements_skipped']
+                            page_tweets, elements_count = self._extract_dom_tweets(processed_element_ids)
+                            round_skipped = self.scan_stats['elements_skipped'] - skipped_before
+                            self.log.debug("当前页面共找到 %d 个推文元素，跳过 %d 个已处理元素", elements_count, round_skipped)
                 
-                # 如果已达到目标数量，退出
-                if tweets_collected >= max_tweets:
-                    print(f"\n✅ 已达到目标数量 {max_tweets} 条！")
+                # 去重并保存新推文（逐元素提取的回退路径在这里按需提取，提取耗时仍计入 extract 阶段）
+                new_tweets, known_tweets = self._process_page_tweets(page_tweets, max_tweets)
+                self._end_round(rounds, new_tweets, max_tweets)
+                fast_forward = self._next_round_mode(new_tweets, known_tweets, max_tweets)
+                if fast_forward is None:
                     break
                 
-                # 如果连续多次滚动都没有新推文，可能已经到底了
-                if new_tweets_in_this_scroll == 0:
-                    no_new_tweets_count += 1
-                    print(f"⚠️  本轮无新推文（连续 {no_new_tweets_count} 次）")
-                    if no_new_tweets_count >= 3:
-                        print("❌ 连续3次滚动都没有新推文，可能已经到达页面底部")
-                        break
+                # 滚动加载更多（流水线模式下本轮已在解析时滚动过）
+                prev_elements_count = elements_count
+                if pipeline is None:
+                    self._log_scroll_start(max_tweets)
+                    new_elements_count = self._scroll_for_more(settle=not fast_forward)
+                
+                if new_elements_count > prev_elements_count:
+                    self.log.debug("✓ 页面元素增加: %d -> %d", prev_elements_count, new_elements_count)
                 else:
-                    no_new_tweets_count = 0  # 重置计数器
+                    self.log.debug("⚠️  页面元素未增加，仍为 %d 个", new_elements_count)
                 
-                # 滚动加载更多
-                print("\n📜 开始滚动加载更多推文...")
-                if self.progress_callback:
-                    self.progress_callback(tweets_collected, max_tweets, f"正在滚动页面加载更多推文...已收集 {tweets_collected}/{max_tweets} 条")
+                # 快进且页面仍在增长的轮次不计入滚动次数上限
+                if not (fast_forward and new_elements_count > prev_elements_count):
+                    scroll_attempts += 1
+            
+            return self._complete_run(cancelled, max_tweets)
+            
+        except TimeoutException as e:
+            self.error = e
+            self.log.error("页面加载超时，可能用户不存在或网络问题")
+            return []
+        except Exception as e:
+            self.error = e
+            self.log.exception("爬取过程中出现错误: %s", e)
+            return []
+        finally:
+            self._close_run()
+            self._record_browser_usage()
+            if pipeline is not None:
+                pipeline.close(cancel=True)
+                self.metrics.count('parse_ms', int(pipeline.parse_seconds * 1000))
+    
+    def _begin_run(self, username: str, resume: bool, since_last_run: bool):
+        """
+        准备一次爬取（与浏览器无关，同步和异步引擎共用）：增量爬取的起点、检查点、
+        流式输出、推文库和本次的去重状态
+        """
+        # 保存用户名，用于后续文件命名
+        self.username = username
+        self.log = ContextAdapter(logger, {'username': username})
+        self.tweets_collected = 0
+        self.store_added = 0
+        self.reached_last_run = False
+        self.error = None
+        self._newest_stored = ('', '')
+        self._watermark = None
+        if since_last_run:
+            self._watermark = load_watermark(self.checkpoint_dir, self.data_dir, username) or self._store_watermark(username)
+            if self._watermark:
+                self.log.info("增量爬取：上次保存的最新推文时间为 %s", self._watermark['newest_timestamp'])
+            else:
+                self.log.info("增量爬取：没有找到该用户的历史数据，进行完整爬取")
+        self._resuming = self._start_checkpoint(username, resume)
+        if self.stream_formats:
+            self.open_stream_sinks(self.checkpoint.output_files if self._resuming else None)
+            self.checkpoint.output_files = list(self.stream_files)
+        if self.store is not None:
+            self.sinks.append(StoreSink(self.store, username, self.stream_buffer_size))
+        
+        # 用于去重的集合（推文 ID 或 timestamp+text 的 64 位摘要）
+        self._seen_tweets = set()
+        self._older_run = 0  # 增量爬取时连续遇到的不晚于上次最新推文的推文数（不含置顶和转推）
+        self._no_new_rounds = 0  # 连续没有新推文的轮数
+        self.scan_stats = {'elements_scanned': 0, 'elements_skipped': 0, 'elements_extracted': 0}
+        self.current_round = 0
+        self.wait_records = []
+        
+        self.log.info("开始爬取用户 @%s 的推文...", username)
+    
+    def _process_page_tweets(self, page_tweets, max_tweets: int) -> tuple:
+        """
+        去重并保存本轮提取到的推文，增量爬取到达上次的最新推文时置 reached_last_run
+        
+        Returns:
+            (本轮新收集的推文数, 检查点中已收集过的推文数)
+        """
+        new_tweets = 0
+        known_tweets = 0
+        watermark = self._watermark
+        with self.metrics.timer('process'):
+            for tweet_data in page_tweets:
+                if self.tweets_collected >= max_tweets:
+                    break
                 
-                prev_elements_count = len(tweet_elements)
-                self.scroll_page(3)
-                scroll_attempts += 1
+                if tweet_data and tweet_data.text.strip():
+                    self.metrics.count('tweets_seen')
+                    # 有推文 ID 时（网络捕获模式，或 DOM 提取时从推文链接取出）用 ID，否则使用 timestamp + text
+                    # 作为唯一标识（与推文库的键一致）；去重集合只保存它的 64 位摘要，不保存正文
+                    tweet_id = tweet_data.tweet_id or f"{tweet_data.timestamp}_{tweet_data.text}"
+                    digest = key_hash(tweet_id)
                 
-                # 滚动后等待新内容加载
-                print("⏳ 等待新推文加载...")
-                self.random_delay(3, 5)
+                    # 增量爬取：到达上次保存的最新推文即停止。置顶推文和转推（时间为原推文的发布时间）
+                    # 可能早于它却排在新推文前面，所以需要遇到该推文本身，或连续遇到
+                    # WATERMARK_OLDER_RUN 条不晚于它的其他推文（该推文已被删除时）
+                    if watermark:
+                        if self._is_before_watermark(tweet_data, tweet_id, watermark):
+                            if not tweet_data.social_context:
+                                self._older_run += 1
+                            if (key_digest(tweet_id) == watermark['newest_key']
+                                    or self._older_run >= WATERMARK_OLDER_RUN):
+                                self.reached_last_run = True
+                                break
+                            continue
+                        if not tweet_data.social_context:
+                            self._older_run = 0
                 
-                # 检查是否真的加载了新元素
-                new_tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')
-                if len(new_tweet_elements) > prev_elements_count:
-                    print(f"✓ 页面元素增加: {prev_elements_count} -> {len(new_tweet_elements)}")
-                else:
-                    print(f"⚠️  页面元素未增加，仍为 {len(new_tweet_elements)} 个")
+                    # 检查是否已经收集过这条推文
+                    if digest not in self._seen_tweets:
+                        self._seen_tweets.add(digest)
+                        if self._resuming and digest in self.checkpoint:
+                            known_tweets += 1
+                            self.metrics.count('tweets_duplicate')
+                            continue
+                        self._store_tweet(tweet_data, tweet_id, digest)
+                        new_tweets += 1
+                        self.metrics.count('tweets_collected')
+                        if self.log.isEnabledFor(logging.DEBUG):
+                            self.log.debug("  ✓ 新推文 #%d: %s...", self.tweets_collected, tweet_data.text[:50])
+                    
+                        # 更新进度
+                        if self.progress_callback:
+                            self.progress_callback(self.tweets_collected, max_tweets,
+                                                   f"正在爬取推文...已收集 {self.tweets_collected}/{max_tweets} 条")
+                    else:
+                        self.metrics.count('tweets_duplicate')
+        return new_tweets, known_tweets
+    
+    def _end_round(self, rounds: int, new_tweets: int, max_tweets: int):
+        """每轮结束：把流式输出的缓冲写入磁盘，再写检查点（检查点不会超前于输出文件），更新进度"""
+        self.log.info("第 %d 轮收集到 %d 条新推文，已收集 %d/%d 条", rounds, new_tweets, self.tweets_collected, max_tweets,
+                      extra={'round': rounds, 'new_tweets': new_tweets, 'collected': self.tweets_collected})
+        with self.metrics.timer('save'):
+            for sink in self.sinks:
+                sink.flush()
+            if self.checkpoint_interval and rounds % self.checkpoint_interval == 0:
+                self._save_checkpoint()
+        if self.progress_callback:
+            self.progress_callback(
+                self.tweets_collected, max_tweets,
+                f"正在爬取推文...已收集 {self.tweets_collected}/{max_tweets} 条"
+                f"（累计提取 {self.scan_stats['elements_extracted']} 个元素，"
+                f"跳过 {self.scan_stats['elements_skipped']} 个已处理元素）"
+            )
+    
+    def _next_round_mode(self, new_tweets: int, known_tweets: int, max_tweets: int) -> Optional[bool]:
+        """
+        决定是否继续滚动
+        
+        Returns:
+            None 表示停止（到达上次的最新推文、达到目标数量或连续 3 轮没有新推文）；
+            否则返回下一次滚动是否快进（断点续爬时本轮全是已收集过的推文）
+        """
+        if self.reached_last_run:
+            self.log.info("✅ 已到达上次保存的最新推文，本次共收集 %d 条新推文", self.tweets_collected)
+            return None
+        
+        # 如果已达到目标数量，退出
+        if self.tweets_collected >= max_tweets:
+            self.log.info("✅ 已达到目标数量 %d 条！", max_tweets)
+            return None
+        
+        # 断点续爬时，本轮全是已收集过的推文：快速滚过，不计入无新推文次数
+        if new_tweets == 0 and known_tweets > 0:
+            self.log.info("⏩ 本轮 %d 条推文已在检查点中，继续向下滚动", known_tweets)
+            return True
+        # 如果连续多次滚动都没有新推文，可能已经到底了
+        if new_tweets == 0:
+            self._no_new_rounds += 1
+            self.log.warning("⚠️  本轮无新推文（连续 %d 次）", self._no_new_rounds)
+            if self._no_new_rounds >= 3:
+                self.log.warning("❌ 连续3次滚动都没有新推文，可能已经到达页面底部")
+                return None
+        else:
+            self._no_new_rounds = 0  # 重置计数器
+        return False
+    
+    def _complete_run(self, cancelled: bool, max_tweets: int) -> List[Tweet]:
+        """爬取循环正常结束：更新检查点和增量爬取起点，按需排序，返回内存中的推文"""
+        self.checkpoint.completed = not cancelled and self.tweets_collected >= max_tweets
+        if not cancelled and self._newest_stored[0]:
+            # 正常结束时记录最新推文，供下次增量爬取（取消时中间可能有缺口，不更新）
+            self._save_watermark(self._watermark)
+        
+        # 按时间戳排序（从新到旧）
+        if self.sort_results:
+            self.log.debug("正在按时间排序推文...")
+            self.tweets_data.sort(key=lambda x: x.timestamp, reverse=True)
+        
+        self.log.info("爬取完成！共收集到 %d 条推文", self.tweets_collected)
+        return self.tweets_data
+    
+    def _close_run(self):
+        """取消或出错时已收集的推文也会写入流式输出文件，检查点随之更新"""
+        with self.metrics.timer('save'):
+            self.close_stream_sinks()
+            if self.checkpoint_interval:
+                self._save_checkpoint()
+        self.metrics.counters.update(self.scan_stats)
+    
+    def _record_browser_usage(self):
+        """记录本次爬取页面的资源用量（对比 full / lean 配置档的下载量和内存）"""
+        self._set_browser_usage(resource_usage(self.driver) if self.driver else {})
+    
+    def _set_browser_usage(self, usage: Dict):
+        self.browser_usage = usage
+        if usage:
+            self.metrics.browser = dict(usage, profile=self.driver_profile)
+            self.metrics.count('browser_transfer_bytes', int(usage.get('transfer_bytes', 0)))
+            self.metrics.count('browser_requests', int(usage.get('requests', 0)))
+    
+    def _log_scroll_start(self, max_tweets: int):
+        self.log.debug("📜 开始滚动加载更多推文...")
+        if self.progress_callback:
+            self.progress_callback(self.tweets_collected, max_tweets,
+                                   f"正在滚动页面加载更多推文...已收集 {self.tweets_collected}/{max_tweets} 条")
+    
+    def _scroll_for_more(self, settle: bool) -> int:
+        """
+        滚动加载更多推文
+        
+        Args:
+            settle: 滚动后是否等待新内容稳定（断点续爬快进时不等待）
             
-            # 按时间戳排序（从新到旧）
-            print("\n正在按时间排序推文...")
-            self.tweets_data.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        Returns:
+            滚动后页面上的推文元素数
+        """
+        with self.metrics.timer('scroll'):
+            self.scroll_page(3)
             
-            print(f"爬取完成！共收集到 {len(self.tweets_data)} 条推文")
-            return self.tweets_data
+            # 滚动后等待新内容加载（adaptive 模式下滚动时已等到新内容，这里只保留抖动下限）
+            if settle:
+                self.log.debug("⏳ 等待新推文加载...")
+                self.wait('settle', 3, 5)
             
-        except TimeoutException:
-            print("页面加载超时，可能用户不存在或网络问题")
-            return []
-        except Exception as e:
-            print(f"爬取过程中出现错误: {e}")
-            return []
+            # 检查是否真的加载了新元素
+            new_elements_count = self.driver.execute_script(TWEET_COUNT_SCRIPT)
+        round_wait = sum(r['seconds'] for r in self.wait_records if r['round'] == self.current_round)
+        self.log.debug("本轮等待共 %.2f 秒", round_wait)
+        return new_elements_count
+    
+    def _start_checkpoint(self, username: str, resume: bool) -> bool:
+        """
+        准备本次爬取的检查点
+        
+        Returns:
+            是否从已有的检查点继续
+        """
+        self.checkpoint = None
+        if resume and not self._has_durable_output():
+            self.log.warning("⚠️  断点续爬需要流式输出或推文库（已收集的推文需要保存在磁盘上），本次从头开始")
+        elif resume:
+            checkpoint = ScrapeCheckpoint.load(self.checkpoint_dir, username)
+            if checkpoint is None:
+                self.log.info("未找到检查点，从头开始爬取")
+            elif checkpoint.completed:
+                self.log.info("上次爬取已完成，从头开始爬取")
+            else:
+                self.log.info("从检查点继续：已收集 %d 条推文，最早到 %s", checkpoint.collected, checkpoint.oldest_timestamp or '未知')
+                self.checkpoint = checkpoint
+                self.tweets_collected = checkpoint.collected
+                return True
+        self.checkpoint = ScrapeCheckpoint.for_user(self.checkpoint_dir, username)
+        return False
+    
+    def _has_durable_output(self) -> bool:
+        """推文是否边爬取边写入磁盘（流式输出文件或推文库）"""
+        return bool(self.stream_formats) or self.store is not None
+    
+    def _save_checkpoint(self):
+        """写入检查点；只在推文边爬取边写入磁盘时写，检查点才有意义"""
+        if not self._has_durable_output() or self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.save()
+        except OSError as e:
+            self.log.warning("写入检查点失败: %s", e)
+    
+    def _is_before_watermark(self, tweet_data: Tweet, key: str, watermark: Dict) -> bool:
+        """推文是否不晚于上次保存的最新推文"""
+        timestamp = tweet_data.timestamp
+        if timestamp:
+            return timestamp <= watermark['newest_timestamp']
+        return key_digest(key) == watermark['newest_key']
+    
+    def _store_watermark(self, username: str) -> Optional[Dict]:
+        """从推文库中取账号最新的推文作为增量爬取的起点"""
+        if self.store is None:
+            return None
+        tweet = self.store.latest_tweet(username)
+        if not tweet or not tweet.get('timestamp'):
+            return None
+        key = tweet.get('tweet_id') or f"{tweet['timestamp']}_{tweet['text']}"
+        return {'newest_timestamp': tweet['timestamp'], 'newest_key': key_digest(key)}
+    
+    def _save_watermark(self, previous: Optional[Dict]):
+        """记录已保存的最新推文（不早于上次记录的才更新）"""
+        timestamp, key = self._newest_stored
+        if previous and timestamp <= previous['newest_timestamp']:
+            return
+        try:
+            save_watermark(self.checkpoint_dir, self.username, timestamp, key)
+        except OSError as e:
+            self.log.warning("记录最新推文失败: %s", e)
+    
+    def _store_tweet(self, tweet_data: Tweet, key: str, digest: int):
+        """保存一条去重后的新推文：写入流式输出，按需保留在内存中，记入检查点"""
+        self.tweets_collected += 1
+        timestamp = tweet_data.timestamp
+        if timestamp > self._newest_stored[0]:
+            self._newest_stored = (timestamp, key)
+        self.checkpoint.add(digest, tweet_data)
+        if self.keep_in_memory:
+            self.tweets_data.append(tweet_data)
+        for sink in self.sinks:
+            sink.write(tweet_data)
+        if self.tweet_callback:
+            self.tweet_callback(tweet_data.to_dict())
+    
+    def open_stream_sinks(self, resume_files: Optional[List[str]] = None):
+        """
+        按 stream_formats 在 data 目录创建流式输出文件
+        
+        Args:
+            resume_files: 断点续爬时上次的输出文件，格式一致且仍存在时继续追加
+        """
+        self.close_stream_sinks()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        username_part = self.username if self.username else "tweets"
+        # DOM 提取也保留推文 ID，导入推文库时与网络捕获模式的键一致
+        fieldnames = CSV_FIELDNAMES + (EXTRA_FIELDS if self.network_capture else ['tweet_id'])
+        previous = {os.path.splitext(path)[1][1:]: path for path in resume_files or [] if os.path.exists(path)}
+        self.stream_files = []
+        for fmt in self.stream_formats:
+            filepath = previous.get(fmt) or os.path.join(self.data_dir, f"{username_part}_{timestamp}.{fmt}")
+            if fmt == 'jsonl':
+                self.sinks.append(JsonLinesSink(filepath, self.stream_buffer_size))
+            elif fmt == 'csv':
+                self.sinks.append(CsvSink(filepath, fieldnames, self.stream_buffer_size))
+            else:
+                raise ValueError(f"不支持的流式输出格式: {fmt}")
+            self.stream_files.append(filepath)
+            self.log.info("流式输出到: %s", filepath)
+    
+    def close_stream_sinks(self):
+        """关闭流式输出（写入剩余缓冲），按需对输出文件排序"""
+        if not self.sinks:
+            return
+        for sink in self.sinks:
+            sink.close()
+            if isinstance(sink, StoreSink):
+                self.store_added = sink.added
+                self.log.info("已写入推文库，其中 %d 条为库中原来没有的推文", sink.added)
+        self.sinks = []
+        for filepath in self.stream_files:
+            if self.sort_stream_output:
+                sort_output_file(filepath)
+            record_export(filepath)
+    
+    def _extract_dom_tweets(self, processed_element_ids: set):
+        """
+        从 DOM 提取新增推文节点 - 配置了 HTML 解析器时优先解析页面快照，其次批量提取，最后逐元素提取
+        
+        Args:
+            processed_element_ids: 已处理的推文（HTML 快照路径记录推文链接，逐元素路径记录 WebElement id）
+        
+        Returns:
+            (推文数据可迭代对象, 页面上的推文元素总数)
+        """
+        scanned_before = self.scan_stats['elements_scanned']
+        if self.html_parser:
+            page_tweets = self.extract_tweets_from_html(processed_element_ids)
+            if page_tweets is not None:
+                return page_tweets, self.scan_stats['elements_scanned'] - scanned_before
+        
+        if self.batch_extract:
+            page_tweets = self.extract_tweets_batch(only_new=True)
+            if page_tweets is not None:
+                return page_tweets, self.scan_stats['elements_scanned'] - scanned_before
+        
+        tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')
+        new_elements = [el for el in tweet_elements if el.id not in processed_element_ids]
+        self.scan_stats['elements_scanned'] += len(tweet_elements)
+        self.scan_stats['elements_skipped'] += len(tweet_elements) - len(new_elements)
+        return self._extract_new_elements(new_elements, processed_element_ids), len(tweet_elements)
+    
+    def _extract_new_elements(self, elements, processed_element_ids: set):
+        """逐元素提取（回退路径），按需提取并记录已处理的元素"""
+        for element in elements:
+            processed_element_ids.add(element.id)
+            self.scan_stats['elements_extracted'] += 1
+            with self.metrics.timer('extract'):
+                tweet_data = self.extract_tweet_data(element)
+            yield tweet_data
     
     def save_to_json(self, filename: str = None):
         """保存数据为JSON格式"""
@@ -435,16 +1170,18 @@ class TwitterScraper:
         # 保存到 data 目录
         filepath = os.path.join(self.data_dir, filename)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.tweets_data, f, ensure_ascii=False, indent=2)
+        with self.metrics.timer('save'):
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.tweets_data, f, ensure_ascii=False, indent=2, default=json_default)
+            record_export(filepath, self.tweets_data)
         
-        print(f"数据已保存到: {filepath}")
+        self.log.info("数据已保存到: %s", filepath)
         return filepath
     
     def save_to_csv(self, filename: str = None):
         """保存数据为CSV格式"""
         if not self.tweets_data:
-            print("没有数据可保存")
+            self.log.warning("没有数据可保存")
             return None
             
         if not filename:
@@ -456,28 +1193,41 @@ class TwitterScraper:
         # 保存到 data 目录
         filepath = os.path.join(self.data_dir, filename)
         
-        fieldnames = ['text', 'timestamp', 'time_display', 'likes', 'retweets', 'replies', 'scraped_at']
+        fieldnames = list(CSV_FIELDNAMES)
+        # 网络捕获模式的额外字段（推文 ID、作者等）存在时追加到末尾
+        fieldnames += [field for field in EXTRA_FIELDS if any(field in tweet for tweet in self.tweets_data)]
         
         # 使用 utf-8-sig 编码，添加 BOM 标记，让 Excel 能正确识别 UTF-8 编码
-        with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for tweet in self.tweets_data:
-                writer.writerow(tweet)
-        
-        print(f"数据已保存到: {filepath}")
-        print("提示: CSV 文件使用 UTF-8 BOM 编码，可在 Excel 中正常显示中文")
+        with self.metrics.timer('save'):
+            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                for tweet in self.tweets_data:
+                    writer.writerow(tweet)
+            record_export(filepath, self.tweets_data)
+        
+        self.log.info("数据已保存到: %s", filepath)
+        self.log.debug("提示: CSV 文件使用 UTF-8 BOM 编码，可在 Excel 中正常显示中文")
         return filepath
     
     def close(self):
-        """关闭浏览器"""
+        """关闭浏览器（使用驱动池时归还驱动）"""
         if self.driver:
-            self.driver.quit()
-            print("浏览器已关闭")
+            if self.driver_pool:
+                self.driver_pool.release(self.driver)
+                self.log.debug("浏览器驱动已归还驱动池")
+            else:
+                self.driver.quit()
+                self.log.info("浏览器已关闭")
+            self.driver = None
 
 
 def main():
     """主函数"""
+    from config import get_config
+    config = get_config()
+    configure_logging(config['log_level'], config['log_format'])
+    
     print("=== X（推特）推文爬虫程序 ===")
     print()
     
@@ -517,6 +1267,8 @@ def main():
             if save_format in ['csv', 'both']:
                 scraper.save_to_csv()
             
+            print("\n各阶段耗时:")
+            print(scraper.metrics.summary())
             print("\n爬取任务完成！")
         else:
             print("没有爬取到任何推文，请检查用户名是否正确或网络连接")